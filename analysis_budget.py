@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Orçamento das análises por IA (tokens, dólares estimados e segundos), por execução e por dia
+Perfis que ficam sem orçamento são adiados para o próximo ciclo, na ordem de prioridade em que chegaram
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUDGET_PATH = "analysis_budget.json"
+
+# Preço estimado em US$ por milhão de tokens (prompt, resposta)
+MODEL_PRICES = {
+    "anthropic/claude-3-haiku": (0.25, 1.25),
+    "anthropic/claude-3.5-sonnet": (3.0, 15.0),
+}
+DEFAULT_PRICE = (3.0, 15.0)
+
+# Variáveis de ambiente lidas por from_env (limite vazio ou ausente = sem limite)
+BUDGET_ENV_VARS = {
+    "run_tokens": "ANALYSIS_BUDGET_RUN_TOKENS",
+    "run_dollars": "ANALYSIS_BUDGET_RUN_DOLLARS",
+    "run_seconds": "ANALYSIS_BUDGET_RUN_SECONDS",
+    "day_tokens": "ANALYSIS_BUDGET_DAY_TOKENS",
+    "day_dollars": "ANALYSIS_BUDGET_DAY_DOLLARS",
+    "day_seconds": "ANALYSIS_BUDGET_DAY_SECONDS",
+}
+
+class BudgetExceededError(Exception):
+    """
+    Chamada recusada porque algum orçamento acabou
+    """
+
+class AnalysisBudget:
+    def __init__(self, run_tokens: Optional[int] = None, run_dollars: Optional[float] = None,
+                 run_seconds: Optional[float] = None, day_tokens: Optional[int] = None,
+                 day_dollars: Optional[float] = None, day_seconds: Optional[float] = None,
+                 path: str = DEFAULT_BUDGET_PATH, prices: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_deferred_days: float = 7):
+        """
+        Cria o orçamento (limites None não são aplicados)
+
+        Args:
+            run_tokens / run_dollars / run_seconds: Limites de uma execução (ver start_run)
+            day_tokens / day_dollars / day_seconds: Limites do dia, somando todas as execuções
+            path: Arquivo JSON com o consumo do dia e a fila de perfis adiados (None para não persistir)
+            prices: Preços por modelo em US$ por milhão de tokens (padrão: MODEL_PRICES)
+            max_deferred_days: Perfis adiados há mais tempo que isso saem da fila (ex: voltaram a seguir)
+        """
+        self.limits = {
+            "run": {"tokens": run_tokens, "dollars": run_dollars, "seconds": run_seconds},
+            "day": {"tokens": day_tokens, "dollars": day_dollars, "seconds": day_seconds},
+        }
+        self.path = path
+        self.prices = dict(MODEL_PRICES, **(prices or {}))
+        self.max_deferred_seconds = max_deferred_days * 24 * 3600
+
+        self.run = self._empty_usage()
+        self.run_started: Optional[float] = None
+        # Consumo estimado das chamadas em andamento (ver reserve)
+        self.reserved = self._empty_usage()
+        self.day = date.today().isoformat()
+        self.day_usage = self._empty_usage()
+        # Usernames adiados -> quando foram adiados pela primeira vez (ordem de inserção = prioridade)
+        self.deferred: Dict[str, float] = {}
+
+        self._lock = threading.Lock()
+        # Quem espera uma reserva é acordado quando alguma reserva é devolvida (ver wait_reserve)
+        self._released = threading.Condition(self._lock)
+        self._async_waiters: List = []
+        self.logger = logging.getLogger(__name__)
+        self._load()
+
+    @classmethod
+    def from_env(cls, path: str = DEFAULT_BUDGET_PATH) -> Optional["AnalysisBudget"]:
+        """
+        Cria o orçamento a partir das variáveis ANALYSIS_BUDGET_*; None se nenhum limite estiver configurado
+        """
+        limits = {}
+        for name, variable in BUDGET_ENV_VARS.items():
+            value = os.getenv(variable, "").strip()
+            if value:
+                limits[name] = float(value)
+        return cls(path=path, **limits) if limits else None
+
+    @staticmethod
+    def _empty_usage() -> Dict[str, float]:
+        return {"tokens": 0, "dollars": 0.0, "seconds": 0.0}
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Não foi possível ler o orçamento salvo: {e}")
+            return
+
+        if state.get("day") == self.day:
+            self.day_usage.update(state.get("usage", {}))
+        oldest = time.time() - self.max_deferred_seconds
+        for username, deferred_at in state.get("deferred", []):
+            if deferred_at >= oldest:
+                self.deferred[username] = deferred_at
+
+    def _save(self):
+        if not self.path:
+            return
+
+        state = {"day": self.day, "usage": self.day_usage, "deferred": list(self.deferred.items())}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    def _roll_day(self):
+        """
+        Zera o consumo diário na virada do dia (chamar com o lock)
+        """
+        today = date.today().isoformat()
+        if today != self.day:
+            self.day = today
+            self.day_usage = self._empty_usage()
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """
+        Custo estimado (US$) de uma chamada
+        """
+        prompt_price, completion_price = self.prices.get(model, DEFAULT_PRICE)
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+    def start_run(self):
+        """
+        Começa uma execução: zera o consumo da execução e inicia o relógio
+        """
+        with self._lock:
+            self._roll_day()
+            self.run = self._empty_usage()
+            self.run_started = time.monotonic()
+
+    def finish_run(self):
+        """
+        Encerra a execução: soma o tempo gasto ao dia e salva o consumo
+        """
+        with self._lock:
+            if self.run_started is not None:
+                elapsed = time.monotonic() - self.run_started
+                self.run["seconds"] = elapsed
+                self.day_usage["seconds"] += elapsed
+                self.run_started = None
+            self._save()
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int):
+        """
+        Soma os tokens e o custo de uma chamada ao consumo da execução e do dia
+        """
+        dollars = self.cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            self._roll_day()
+            for usage in (self.run, self.day_usage):
+                usage["tokens"] += prompt_tokens + completion_tokens
+                usage["dollars"] += dollars
+            # Fora de uma execução não há finish_run para salvar depois
+            if self.run_started is None:
+                self._save()
+
+    def _usage(self, scope: str) -> Dict[str, float]:
+        """
+        Consumo atual de "run" ou "day", incluindo o tempo da execução em andamento (chamar com o lock)
+        """
+        usage = dict(self.run if scope == "run" else self.day_usage)
+        if self.run_started is not None:
+            elapsed = time.monotonic() - self.run_started
+            usage["seconds"] = elapsed if scope == "run" else usage["seconds"] + elapsed
+        return usage
+
+    def _exceeded(self, extra: Optional[Dict[str, float]] = None) -> Optional[str]:
+        """
+        Primeiro limite que o consumo (mais extra) atinge, ou None (chamar com o lock)
+        """
+        self._roll_day()
+        for scope, limits in self.limits.items():
+            usage = self._usage(scope)
+            for resource, limit in limits.items():
+                if limit is None:
+                    continue
+                if usage[resource] >= limit or usage[resource] + (extra or {}).get(resource, 0) > limit:
+                    label = "execução" if scope == "run" else "dia"
+                    return f"limite de {resource} por {label} atingido ({usage[resource]:.2f}/{limit:g})"
+        return None
+
+    def exceeded(self) -> Optional[str]:
+        """
+        Descrição do primeiro limite atingido, ou None se ainda há orçamento
+        """
+        with self._lock:
+            return self._exceeded()
+
+    def check(self):
+        """
+        Levanta BudgetExceededError se algum limite foi atingido
+        """
+        reason = self.exceeded()
+        if reason is not None:
+            raise BudgetExceededError(reason)
+
+    def reserve(self, model: str, prompt_tokens: int, max_completion_tokens: int) -> Optional[Dict[str, float]]:
+        """
+        Reserva o consumo máximo de uma chamada antes de fazê-la, para que chamadas simultâneas não estourem o limite
+
+        Returns:
+            A reserva (devolver com release depois da chamada; o consumo real entra por record),
+            ou None se a chamada só cabe depois que as chamadas em andamento terminarem
+
+        Raises:
+            BudgetExceededError se a chamada não cabe no que sobra do orçamento
+        """
+        reservation = self._reservation(model, prompt_tokens, max_completion_tokens)
+        with self._lock:
+            return reservation if self._try_reserve(reservation) else None
+
+    def _reservation(self, model: str, prompt_tokens: int, max_completion_tokens: int) -> Dict[str, float]:
+        return {"tokens": prompt_tokens + max_completion_tokens,
+                "dollars": self.cost(model, prompt_tokens, max_completion_tokens)}
+
+    def _try_reserve(self, reservation: Dict[str, float]) -> bool:
+        """
+        Soma a reserva às chamadas em andamento se ela couber (chamar com o lock)
+        """
+        reason = self._exceeded(reservation)
+        if reason is not None:
+            raise BudgetExceededError(reason)
+        if any(self.reserved[resource] for resource in reservation) and \
+                self._exceeded({resource: amount + self.reserved[resource] for resource, amount in reservation.items()}):
+            return False
+        for resource, amount in reservation.items():
+            self.reserved[resource] += amount
+        return True
+
+    def wait_reserve(self, model: str, prompt_tokens: int, max_completion_tokens: int) -> Dict[str, float]:
+        """
+        Como reserve, mas espera as chamadas em andamento devolverem suas reservas em vez de retornar None
+        
+        Raises:
+            BudgetExceededError se a chamada não cabe no que sobra do orçamento
+        """
+        reservation = self._reservation(model, prompt_tokens, max_completion_tokens)
+        with self._released:
+            while not self._try_reserve(reservation):
+                self._released.wait()
+        return reservation
+
+    async def reserve_async(self, model: str, prompt_tokens: int, max_completion_tokens: int) -> Dict[str, float]:
+        """
+        Versão assíncrona de wait_reserve (não bloqueia o event loop)
+        """
+        reservation = self._reservation(model, prompt_tokens, max_completion_tokens)
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._try_reserve(reservation):
+                    return reservation
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, reservation: Dict[str, float]):
+        """
+        Devolve uma reserva feita com reserve e acorda quem espera
+        """
+        with self._released:
+            for resource, amount in reservation.items():
+                self.reserved[resource] = max(0.0, self.reserved[resource] - amount)
+            waiters, self._async_waiters = self._async_waiters, []
+            self._released.notify_all()
+
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(lambda w=waiter: w.done() or w.set_result(None))
+
+    def defer(self, usernames: Iterable[str]):
+        """
+        Coloca perfis na fila do próximo ciclo (quem já estava na fila mantém a posição)
+        """
+        now = time.time()
+        with self._lock:
+            for username in usernames:
+                self.deferred.setdefault(username.lower(), now)
+            self._save()
+
+    def resolve(self, usernames: Iterable[str]):
+        """
+        Tira da fila os perfis que já foram analisados
+        """
+        with self._lock:
+            removed = [self.deferred.pop(username.lower(), None) for username in usernames]
+            if any(profile is not None for profile in removed):
+                self._save()
+
+    def pending(self) -> List[str]:
+        """
+        Usernames adiados, em ordem de prioridade (os adiados há mais tempo primeiro)
+        """
+        with self._lock:
+            return list(self.deferred)
+
+    def get_stats(self) -> Dict:
+        """
+        Consumo e limites da execução e do dia, e tamanho da fila de adiados
+        """
+        with self._lock:
+            return {
+                "run": {k: round(v, 4) for k, v in self._usage("run").items()},
+                "day": {k: round(v, 4) for k, v in self._usage("day").items()},
+                "limits": {scope: dict(limits) for scope, limits in self.limits.items()},
+                "deferred": len(self.deferred)
+            }
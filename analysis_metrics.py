@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Métricas leves para a análise de imunidade (histogramas de latência com buckets fixos)
+"""
+
+import bisect
+import threading
+from collections import deque
+from typing import Dict
+
+class LatencyHistogram:
+    # Limites superiores dos buckets em milissegundos (o último bucket é "acima de 30s")
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+    def __init__(self, window: int = 200):
+        """
+        Histograma de latências com custo O(1) por observação e memória constante
+
+        Args:
+            window: Quantas latências recentes guardar para percentis exatos (ver recent_percentile)
+        """
+        self.recent = deque(maxlen=window)
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """
+        Registra uma latência (em segundos)
+        """
+        ms = seconds * 1000.0
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            self.recent.append(ms)
+
+    def percentile(self, p: float) -> float:
+        """
+        Percentil aproximado (limite superior do bucket), em milissegundos
+        """
+        if self.count == 0:
+            return 0.0
+
+        target = p / 100.0 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(float(self.BUCKETS_MS[i]), self.max_ms) if i < len(self.BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def recent_percentile(self, p: float) -> float:
+        """
+        Percentil exato das últimas latências (ms), para decisões em tempo real
+        """
+        with self._lock:
+            values = sorted(self.recent)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(p / 100.0 * len(values)))]
+
+    def summary(self) -> Dict:
+        """
+        Resumo com contagem, média, p50/p95/p99 e máximo (ms)
+        """
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 2)
+        }
+
+    def __str__(self) -> str:
+        s = self.summary()
+        return (f"n={s['count']} média={s['avg_ms']:.1f}ms p50≤{s['p50_ms']:.0f}ms "
+                f"p95≤{s['p95_ms']:.0f}ms p99≤{s['p99_ms']:.0f}ms máx={s['max_ms']:.0f}ms")
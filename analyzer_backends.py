@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Registro de backends compatíveis com a API da OpenAI (OpenRouter, llama.cpp/vLLM próprio, servidor mock)
+Cada backend tem seu limite de concorrência, peso, rate limiter e circuit breaker; o analisador distribui as chamadas entre eles
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from openai import OpenAI, AsyncOpenAI
+
+from analysis_metrics import LatencyHistogram
+from circuit_breaker import CLOSED, CircuitBreaker
+from rate_limiter import AdaptiveRateLimiter
+
+DEFAULT_BACKENDS_PATH = "analyzer_backends.json"
+
+class AnalyzerBackend:
+    def __init__(self, name: str, base_url: str, api_key: str = "", weight: float = 1.0, max_concurrency: int = 8,
+                 models: Optional[Dict[str, str]] = None, timeout: float = 30.0,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, circuit_breaker: Optional[CircuitBreaker] = None):
+        """
+        Descreve um endpoint compatível com a OpenAI
+
+        Args:
+            name: Nome do backend (logs e estatísticas)
+            base_url: URL base da API (ex: https://openrouter.ai/api/v1, http://localhost:8000/v1)
+            api_key: Chave da API (servidores locais costumam aceitar qualquer valor)
+            weight: Peso na distribuição das chamadas
+            max_concurrency: Chamadas simultâneas permitidas neste backend
+            models: Tradução de nomes de modelo (ex: {"*": "llama-3.1-8b"} usa o mesmo modelo para tudo)
+            timeout: Tempo máximo de cada chamada (segundos)
+        """
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key or "sem-chave"
+        self.weight = max(0.01, float(weight))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.models = dict(models or {})
+        self.timeout = timeout
+
+        # Retentativas ficam a cargo do analisador (max_retries=0 no cliente)
+        self.client = OpenAI(base_url=base_url, api_key=self.api_key, max_retries=0, timeout=timeout)
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+
+        self.in_flight = 0
+        self.current_weight = 0.0
+        self.stats = {"requests": 0, "failures": 0}
+        self.latency = LatencyHistogram()
+
+        # Clientes assíncronos ficam presos ao event loop em que foram criados
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_loop = None
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "AnalyzerBackend":
+        """
+        Cria um backend a partir de um dict (api_key_env lê a chave de uma variável de ambiente)
+        """
+        api_key = config.get("api_key") or os.getenv(config.get("api_key_env", ""), "")
+        return cls(
+            name=config["name"],
+            base_url=config["base_url"],
+            api_key=api_key,
+            weight=config.get("weight", 1.0),
+            max_concurrency=config.get("max_concurrency", 8),
+            models=config.get("models"),
+            timeout=config.get("timeout", 30.0),
+            rate_limiter=AdaptiveRateLimiter(**config["rate_limit"]) if config.get("rate_limit") else None
+        )
+
+    def request_args(self, kwargs: Dict) -> Dict:
+        """
+        Parâmetros da chamada com o nome do modelo traduzido para este backend
+        """
+        model = kwargs.get("model", "")
+        mapped = self.models.get(model, self.models.get("*", model))
+        return {**kwargs, "model": mapped} if mapped != model else kwargs
+
+    def async_client(self) -> AsyncOpenAI:
+        """
+        Cliente assíncrono do event loop atual (criado na primeira chamada do loop)
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = AsyncOpenAI(base_url=self.base_url, api_key=self.api_key, max_retries=0,
+                                             timeout=self.timeout)
+            self._async_loop = loop
+        return self._async_client
+
+    async def aclose(self):
+        """
+        Fecha o cliente assíncrono do event loop atual
+        """
+        client, self._async_client, self._async_loop = self._async_client, None, None
+        if client is not None:
+            await client.close()
+
+class BackendRegistry:
+    def __init__(self, backends: Iterable[AnalyzerBackend]):
+        """
+        Distribui chamadas entre backends por round-robin ponderado, respeitando a concorrência de cada um
+
+        Backends com o circuito fechado têm preferência; os demais só recebem chamadas de teste.
+        """
+        self.backends = list(backends)
+        if not self.backends:
+            raise ValueError("É preciso ao menos um backend")
+
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._async_waiters: List = []
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def max_concurrency(self) -> int:
+        return sum(backend.max_concurrency for backend in self.backends)
+
+    def _try_acquire(self, exclude: Iterable[AnalyzerBackend]) -> Optional[AnalyzerBackend]:
+        """
+        Escolhe um backend com vaga (chamar com o lock); None se todos estiverem cheios
+        """
+        free = [b for b in self.backends if b not in exclude and b.in_flight < b.max_concurrency]
+        if not free:
+            return None
+
+        healthy = [b for b in free if b.circuit_breaker.state == CLOSED]
+        candidates = healthy or free
+
+        # Round-robin ponderado suave (distribuição proporcional aos pesos, sem rajadas)
+        total = sum(b.weight for b in candidates)
+        for b in candidates:
+            b.current_weight += b.weight
+        chosen = max(candidates, key=lambda b: b.current_weight)
+        chosen.current_weight -= total
+
+        chosen.in_flight += 1
+        chosen.stats["requests"] += 1
+        return chosen
+
+    def _all_excluded(self, exclude: Iterable[AnalyzerBackend]) -> bool:
+        excluded = set(exclude)
+        return all(b in excluded for b in self.backends)
+
+    def acquire(self, exclude: Iterable[AnalyzerBackend] = ()) -> Optional[AnalyzerBackend]:
+        """
+        Reserva uma vaga em algum backend, esperando se todos estiverem cheios (None se todos foram excluídos)
+        """
+        exclude = list(exclude)
+        with self._released:
+            while not self._all_excluded(exclude):
+                backend = self._try_acquire(exclude)
+                if backend is not None:
+                    return backend
+                self._released.wait()
+        return None
+
+    def try_acquire(self, exclude: Iterable[AnalyzerBackend] = ()) -> Optional[AnalyzerBackend]:
+        """
+        Reserva uma vaga sem esperar (None se não houver)
+        """
+        with self._lock:
+            return self._try_acquire(list(exclude))
+
+    async def acquire_async(self, exclude: Iterable[AnalyzerBackend] = ()) -> Optional[AnalyzerBackend]:
+        """
+        Versão assíncrona de acquire (não bloqueia o event loop)
+        """
+        exclude = list(exclude)
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._all_excluded(exclude):
+                    return None
+                backend = self._try_acquire(exclude)
+                if backend is not None:
+                    return backend
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, backend: AnalyzerBackend):
+        """
+        Libera a vaga reservada e acorda quem espera
+        """
+        with self._released:
+            backend.in_flight -= 1
+            waiters, self._async_waiters = self._async_waiters, []
+            self._released.notify_all()
+
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(lambda w=waiter: w.done() or w.set_result(None))
+
+    async def aclose(self):
+        """
+        Fecha os clientes assíncronos do event loop atual
+        """
+        for backend in self.backends:
+            await backend.aclose()
+
+    def get_stats(self) -> Dict:
+        """
+        Chamadas, falhas, estado do circuito e latência por backend
+        """
+        return {
+            backend.name: {
+                **backend.stats,
+                "circuit": backend.circuit_breaker.state,
+                "latency_ms": backend.latency.summary()
+            }
+            for backend in self.backends
+        }
+
+def load_backends(path: str = DEFAULT_BACKENDS_PATH) -> List[AnalyzerBackend]:
+    """
+    Lê a lista de backends de um arquivo JSON; lista vazia se o arquivo não existir
+    """
+    if not path or not os.path.exists(path):
+        return []
+
+    with open(path, "r", encoding="utf-8") as f:
+        return [AnalyzerBackend.from_config(config) for config in json.load(f)]
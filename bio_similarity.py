@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Índice MinHash/LSH de bios para reaproveitar a análise de perfis com bio quase idêntica
+(boilerplate de empresa, "PhD student @ X", fazendas de bots com o mesmo texto)
+"""
+
+import re
+import threading
+import unicodedata
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+NON_WORD_PATTERN = re.compile(r"[^\w\s]+")
+
+# Primo de Mersenne 2^31 - 1: a * x + b cabe em uint64 com x < 2^31
+MERSENNE_PRIME = (1 << 31) - 1
+
+def normalize_bio(text: str) -> str:
+    """
+    Normaliza uma bio para comparação: minúsculas, sem acentos, URLs, pontuação e emojis
+    """
+    if not text:
+        return ""
+
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = URL_PATTERN.sub(" ", text)
+    text = NON_WORD_PATTERN.sub(" ", text)
+    return " ".join(text.split())
+
+class BioSimilarityIndex:
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 32, shingle_size: int = 5,
+                 min_words: int = 4, max_entries: int = 100000, seed: int = 1):
+        """
+        Cria um índice vazio
+
+        Args:
+            threshold: Similaridade de Jaccard (estimada) mínima para considerar duas bios quase idênticas
+            num_perm: Número de funções de hash da assinatura MinHash
+            bands: Bandas do LSH (num_perm precisa ser múltiplo de bands)
+            shingle_size: Tamanho dos shingles de caracteres
+            min_words: Bios mais curtas que isso não entram no índice (pouco texto para comparar)
+            max_entries: Limite de bios indexadas
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm precisa ser múltiplo de bands")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.max_entries = max_entries
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+        self._signatures: List[np.ndarray] = []
+        self._payloads: List[Any] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Assinatura MinHash de uma bio (None se a bio for curta demais para comparar)
+        """
+        normalized = normalize_bio(text)
+        if len(normalized.split()) < self.min_words:
+            return None
+
+        size = self.shingle_size
+        shingles = {normalized[i:i + size] for i in range(max(1, len(normalized) - size + 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) & MERSENNE_PRIME for s in shingles),
+                             dtype=np.uint64, count=len(shingles))
+
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, text: str, payload: Any, signature: Optional[np.ndarray] = None) -> bool:
+        """
+        Indexa uma bio com um payload qualquer (ex: o resultado da análise)
+
+        Returns:
+            False se a bio não foi indexada (curta demais ou índice cheio)
+        """
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return False
+
+        with self._lock:
+            if len(self._signatures) >= self.max_entries:
+                return False
+
+            entry_id = len(self._signatures)
+            self._signatures.append(signature)
+            self._payloads.append(payload)
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, []).append(entry_id)
+        return True
+
+    def query(self, text: str, signature: Optional[np.ndarray] = None) -> Optional[Tuple[float, Any]]:
+        """
+        Procura a bio indexada mais parecida
+
+        Returns:
+            (similaridade estimada, payload) se alguma passar do threshold; senão None
+        """
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return None
+
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+
+            best = None
+            for entry_id in candidates:
+                similarity = float(np.mean(self._signatures[entry_id] == signature))
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, self._payloads[entry_id])
+        return best
+
+    def clear(self):
+        """
+        Remove todas as bios indexadas
+        """
+        with self._lock:
+            self._signatures.clear()
+            self._payloads.clear()
+            self._buckets = [{} for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
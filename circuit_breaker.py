@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker para as chamadas à IA
+Depois de falhas seguidas, para de chamar o OpenRouter por um tempo e deixa a análise local assumir
+"""
+
+import logging
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """
+    Chamada recusada porque o circuito está aberto
+    """
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0, max_reset_timeout: float = 600.0):
+        """
+        Cria o circuit breaker (começa fechado)
+
+        Args:
+            failure_threshold: Falhas consecutivas para abrir o circuito
+            reset_timeout: Segundos aberto antes de deixar passar uma chamada de teste (half-open)
+            max_reset_timeout: Limite do reset_timeout, que dobra a cada teste que falha
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+
+        self.stats = {"opened": 0, "rejected": 0, "probes": 0}
+
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def allow_request(self) -> bool:
+        """
+        True se a chamada pode seguir; com o circuito half-open só uma chamada de teste passa por vez
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self.logger.info("🔌 Circuito half-open: testando se a IA voltou")
+
+            # Um teste que nunca voltou (tarefa cancelada) não pode travar o circuito
+            now = time.monotonic()
+            if self.state == HALF_OPEN and (not self._probe_in_flight or now - self._probe_started_at >= self.reset_timeout):
+                self._probe_in_flight = True
+                self._probe_started_at = now
+                self.stats["probes"] += 1
+                return True
+
+            self.stats["rejected"] += 1
+            return False
+
+    def check(self):
+        """
+        Levanta CircuitOpenError se a chamada não pode seguir
+        """
+        if not self.allow_request():
+            raise CircuitOpenError("Circuito aberto: IA indisponível, usando análise local")
+
+    def record_success(self):
+        """
+        Fecha o circuito e zera as falhas
+        """
+        with self._lock:
+            if self.state != CLOSED:
+                self.logger.info("🔌 Circuito fechado: IA respondendo de novo")
+            self.state = CLOSED
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """
+        Conta uma falha; abre o circuito ao atingir o limite ou se o teste half-open falhar
+        """
+        with self._lock:
+            self.failures += 1
+
+            if self.state == HALF_OPEN:
+                # Teste falhou: reabrir esperando mais tempo
+                self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self.stats["opened"] += 1
+        self.logger.warning(f"🔌 Circuito aberto após {self.failures} falhas seguidas; "
+                            f"análise local por {self.reset_timeout:.0f}s")
+
+    @property
+    def is_closed(self) -> bool:
+        return self.state == CLOSED
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Snapshot persistente da lista de following, indexado pelo id estável do usuário (rest_id)
+Cada ciclo lê o topo da lista só até encontrar uma sequência de usuários já conhecidos (follows novos) e depois
+avança algumas páginas a partir de um cursor profundo salvo, cobrindo as contas antigas ao longo dos ciclos
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_SNAPSHOT_PATH = "following_snapshot.json"
+
+# Busca uma página da timeline: cursor (None = topo) -> (usuários, próximo cursor ou None no fim)
+PageFetcher = Callable[[Optional[str]], Tuple[List[Dict], Optional[str]]]
+
+class FollowingSnapshot:
+    def __init__(self, path: Optional[str] = DEFAULT_SNAPSHOT_PATH, known_run: int = 20,
+                 max_head_pages: int = 10, deep_pages: int = 5):
+        """
+        Carrega (ou cria) o snapshot
+
+        Args:
+            path: Arquivo JSON do snapshot (None para manter só em memória)
+            known_run: Usuários já conhecidos seguidos que encerram a leitura do topo
+            max_head_pages: Páginas máximas lidas do topo por ciclo (a primeira sincronização continua pelo cursor profundo)
+            deep_pages: Páginas lidas por ciclo a partir do cursor profundo
+        """
+        self.path = path
+        self.known_run = known_run
+        self.max_head_pages = max_head_pages
+        self.deep_pages = deep_pages
+
+        # user_id -> dados do usuário + first_seen/last_seen
+        self.users: Dict[str, Dict] = {}
+        self.deep_cursor: Optional[str] = None
+        # Início da varredura atual (topo + páginas profundas até o fim); None se não há varredura em andamento
+        self.sweep_started_at: Optional[float] = None
+        self.sweeps_completed = 0
+
+        self.stats = {"head_pages": 0, "deep_pages": 0, "new": 0, "known": 0, "removed": 0}
+        self.logger = logging.getLogger(__name__)
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Não foi possível ler o snapshot de following: {e}")
+            return
+
+        self.users = state.get("users", {})
+        self.deep_cursor = state.get("deep_cursor")
+        self.sweep_started_at = state.get("sweep_started_at")
+        self.sweeps_completed = state.get("sweeps_completed", 0)
+
+    def save(self):
+        """
+        Grava o snapshot (arquivo temporário + rename, para não corromper em uma interrupção)
+        """
+        if not self.path:
+            return
+
+        state = {
+            "users": self.users,
+            "deep_cursor": self.deep_cursor,
+            "sweep_started_at": self.sweep_started_at,
+            "sweeps_completed": self.sweeps_completed
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self.users
+
+    def merge(self, users: Iterable[Dict], seen_at: Optional[float] = None) -> List[Dict]:
+        """
+        Atualiza o snapshot com usuários observados agora
+
+        Returns:
+            Usuários que ainda não estavam no snapshot
+        """
+        seen_at = seen_at or time.time()
+        new_users = []
+
+        for user in users:
+            record = self.users.get(user['user_id'])
+            if record is None:
+                record = {'first_seen': seen_at}
+                new_users.append(user)
+            record.update(user)
+            record['last_seen'] = seen_at
+            self.users[user['user_id']] = record
+
+        self.stats["new"] += len(new_users)
+        return new_users
+
+    def remove(self, usernames: Iterable[str]):
+        """
+        Tira do snapshot usuários que deixaram de ser seguidos (ex: unfollow feito pelo bot)
+        """
+        usernames = {username.lower() for username in usernames}
+        removed = [user_id for user_id, record in self.users.items() if record.get('username') in usernames]
+        for user_id in removed:
+            del self.users[user_id]
+        self.stats["removed"] += len(removed)
+
+    def find(self, usernames: Iterable[str]) -> List[Dict]:
+        """
+        Registros do snapshot com esses usernames, na ordem pedida (ausentes são ignorados)
+        """
+        by_username = {record.get('username'): record for record in self.users.values()}
+        records = [by_username.get(username.lower()) for username in usernames]
+        return [{k: v for k, v in record.items() if k not in ('first_seen', 'last_seen')}
+                for record in records if record is not None]
+
+    def _finish_sweep(self):
+        """
+        Fim da lista alcançado: quem não apareceu desde o início da varredura não é mais seguido
+        """
+        if self.sweep_started_at is not None:
+            stale = [user_id for user_id, record in self.users.items()
+                     if record.get('last_seen', 0) < self.sweep_started_at]
+            for user_id in stale:
+                del self.users[user_id]
+            self.stats["removed"] += len(stale)
+            if stale:
+                self.logger.info(f"🧹 {len(stale)} contas saíram do following desde a última varredura")
+
+        self.sweeps_completed += 1
+        self.deep_cursor = None
+        self.sweep_started_at = None
+
+    def sync(self, fetch_page: PageFetcher, max_users: Optional[int] = None) -> List[Dict]:
+        """
+        Sincroniza um ciclo: topo até uma sequência de conhecidos, depois páginas a partir do cursor profundo
+
+        Args:
+            fetch_page: Função que busca uma página da timeline pelo cursor
+            max_users: Para de ler páginas profundas quando o ciclo já observou tantos não-seguidores
+
+        Returns:
+            Usuários observados neste ciclo (novos do topo + páginas profundas), com follows_you atualizado
+        """
+        cycle_started = time.time()
+        observed: Dict[str, Dict] = {}
+
+        def enough() -> bool:
+            return max_users is not None and sum(1 for u in observed.values() if not u['follows_you']) >= max_users
+
+        # Nova varredura começa junto com a leitura do topo deste ciclo
+        if self.deep_cursor is None:
+            self.sweep_started_at = cycle_started
+
+        # 1. Topo: follows recentes, até known_run conhecidos seguidos
+        cursor = None
+        known_streak = 0
+        head_end = None
+        for _ in range(self.max_head_pages):
+            users, next_cursor = fetch_page(cursor)
+            self.stats["head_pages"] += 1
+
+            for user in users:
+                known_streak = known_streak + 1 if user['user_id'] in self.users else 0
+                if user['user_id'] not in self.users:
+                    observed[user['user_id']] = user
+                elif known_streak >= self.known_run:
+                    break
+            self.stats["known"] += sum(1 for user in users if user['user_id'] in self.users)
+            self.merge(users, cycle_started)
+
+            head_end = next_cursor
+            if known_streak >= self.known_run or next_cursor is None or enough():
+                break
+            cursor = next_cursor
+
+        # A lista inteira coube na leitura do topo: varredura completa
+        if head_end is None:
+            self._finish_sweep()
+            self.save()
+            return list(observed.values())
+
+        # Varredura nova (ou topo ainda não lido até os conhecidos): as páginas profundas continuam de onde o topo parou
+        if self.deep_cursor is None:
+            self.deep_cursor = head_end
+
+        # 2. Páginas profundas: contas antigas, algumas páginas por ciclo
+        for _ in range(self.deep_pages):
+            if enough():
+                break
+            users, next_cursor = fetch_page(self.deep_cursor)
+            self.stats["deep_pages"] += 1
+            self.merge(users, cycle_started)
+            observed.update((user['user_id'], user) for user in users)
+
+            if next_cursor is None or next_cursor == self.deep_cursor:
+                self._finish_sweep()
+                break
+            self.deep_cursor = next_cursor
+            # Salvar a cada página: uma interrupção não perde o avanço do cursor
+            self.save()
+
+        self.save()
+        return list(observed.values())
+
+    def get_stats(self) -> Dict:
+        """
+        Tamanho do snapshot, progresso da varredura e contadores da sincronização
+        """
+        return {
+            "users": len(self.users),
+            "non_followers": sum(1 for record in self.users.values() if not record.get('follows_you')),
+            "sweep_in_progress": self.deep_cursor is not None,
+            "sweeps_completed": self.sweeps_completed,
+            **self.stats
+        }
+
+    def log_stats(self):
+        """
+        Registra no log o resumo da sincronização
+        """
+        stats = self.get_stats()
+        sweep = "varredura em andamento" if stats["sweep_in_progress"] else "varredura completa"
+        self.logger.info(f"🗂️ Snapshot de following: {stats['users']} contas ({stats['non_followers']} não-seguidores), "
+                         f"{stats['new']} novas, {stats['removed']} removidas; páginas: {stats['head_pages']} do topo, "
+                         f"{stats['deep_pages']} profundas ({sweep}, {stats['sweeps_completed']} concluídas)")
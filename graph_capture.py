@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Captura das listas de following/followers pelas respostas GraphQL do próprio X (eventos de rede do Chrome DevTools)
+Cada resposta traz o lote inteiro de usuários com rest_id, bio, localização, contagens e followed_by,
+sem depender de seletores do DOM nem de uma ida e volta ao WebDriver por célula
+"""
+
+import json
+import logging
+import re
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# Operações GraphQL das timelines de following/followers
+TIMELINE_OPERATIONS = ("Following", "Followers", "BlueVerifiedFollowers", "VerifiedFollowers")
+GRAPHQL_URL_PATTERN = re.compile(r"/i/api/graphql/[^/]+/(?P<operation>\w+)")
+
+def enable_network_capture(options):
+    """
+    Liga o log de performance (eventos de rede do DevTools) nas opções do Chrome, antes de criar o driver
+    """
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+def _walk(node) -> Iterator[Dict]:
+    """
+    Percorre todos os dicts de um JSON (o formato das timelines muda com frequência)
+    """
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            yield current
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+
+def parse_user(result: Dict) -> Optional[Dict]:
+    """
+    Converte um objeto User do GraphQL no formato de usuário coletado
+    """
+    legacy = result.get("legacy") or {}
+    core = result.get("core") or {}
+    username = core.get("screen_name") or legacy.get("screen_name")
+    if not username:
+        return None
+
+    location = result.get("location")
+    location = location.get("location", "") if isinstance(location, dict) else legacy.get("location", "")
+    relationship = result.get("relationship_perspectives") or {}
+
+    return {
+        'user_id': result.get("rest_id") or username.lower(),
+        'username': username.lower(),
+        'display_name': core.get("name") or legacy.get("name", ""),
+        'bio': (result.get("profile_bio") or {}).get("description") or legacy.get("description", ""),
+        'location': location or "",
+        'followers_count': legacy.get("followers_count", 0),
+        'following_count': legacy.get("friends_count", 0),
+        'verified': bool(result.get("is_blue_verified") or legacy.get("verified")),
+        'follows_you': bool(relationship.get("followed_by", legacy.get("followed_by", False)))
+    }
+
+def parse_timeline_response(payload: Dict) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Extrai os usuários e o cursor da próxima página de uma resposta Following/Followers
+
+    Returns:
+        (usuários na ordem da timeline, cursor "Bottom" ou None no fim da lista)
+    """
+    users = []
+    bottom_cursor = None
+
+    for node in _walk(payload):
+        # Só as entradas da timeline (User aninhados, como afiliações, não são membros da lista)
+        if node.get("itemType") == "TimelineUser" or node.get("__typename") == "TimelineUser":
+            result = (node.get("user_results") or {}).get("result") or {}
+            user = parse_user(result) if result.get("__typename", "User") == "User" else None
+            if user:
+                users.append(user)
+        elif node.get("cursorType") == "Bottom" and node.get("value"):
+            bottom_cursor = node["value"]
+
+    # O X devolve um cursor mesmo na última página: sem usuários, não há próxima
+    return users, bottom_cursor if users else None
+
+class GraphQLCapture:
+    def __init__(self, driver, operations: Tuple[str, ...] = TIMELINE_OPERATIONS):
+        """
+        Acompanha as respostas GraphQL das timelines no log de performance do driver
+
+        O driver precisa ter sido criado com enable_network_capture nas opções.
+
+        Args:
+            driver: WebDriver do Chrome
+            operations: Operações GraphQL a capturar
+        """
+        self.driver = driver
+        self.operations = set(operations)
+        self.last_cursor: Optional[str] = None
+        # Última requisição vista por operação (URL e cabeçalhos), usada como modelo pela exportação paginada
+        self.templates: Dict[str, Dict] = {}
+
+        self._pending: Dict[str, str] = {}
+        self._seen_ids: Set[str] = set()
+        self.stats = {"responses": 0, "users": 0, "errors": 0}
+        self.logger = logging.getLogger(__name__)
+
+        self.driver.execute_cdp_cmd("Network.enable", {})
+
+    def _events(self) -> Iterator[Dict]:
+        for entry in self.driver.get_log("performance"):
+            try:
+                yield json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+
+    def poll(self) -> List[Dict]:
+        """
+        Usuários novos das respostas que terminaram de carregar desde a última chamada (sem repetir rest_id)
+        """
+        users = []
+
+        for event in self._events():
+            method = event.get("method")
+            params = event.get("params", {})
+
+            if method == "Network.requestWillBeSent":
+                request = params.get("request", {})
+                match = GRAPHQL_URL_PATTERN.search(request.get("url", ""))
+                if match and match.group("operation") in self.operations:
+                    self.templates[match.group("operation")] = {"url": request["url"],
+                                                                "headers": request.get("headers", {})}
+
+            elif method == "Network.responseReceived":
+                match = GRAPHQL_URL_PATTERN.search(params.get("response", {}).get("url", ""))
+                if match and match.group("operation") in self.operations:
+                    self._pending[params["requestId"]] = match.group("operation")
+
+            elif method == "Network.loadingFinished" and params.get("requestId") in self._pending:
+                request_id = params["requestId"]
+                self._pending.pop(request_id)
+                users.extend(self._read_response(request_id))
+
+            elif method == "Network.loadingFailed":
+                self._pending.pop(params.get("requestId"), None)
+
+        return users
+
+    def _read_response(self, request_id: str) -> List[Dict]:
+        try:
+            body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            payload = json.loads(body.get("body", ""))
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.logger.debug(f"Resposta GraphQL ilegível ({request_id}): {e}")
+            return []
+
+        page_users, cursor = parse_timeline_response(payload)
+        self.stats["responses"] += 1
+        if cursor:
+            self.last_cursor = cursor
+
+        new_users = []
+        for user in page_users:
+            if user['user_id'] not in self._seen_ids:
+                self._seen_ids.add(user['user_id'])
+                new_users.append(user)
+        self.stats["users"] += len(new_users)
+        return new_users
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Exportação paginada das listas de following/followers de dentro da página logada
+Em vez de rolar a lista virtualizada, cada página da timeline GraphQL é pedida com fetch no contexto da página
+(cookies da sessão), seguindo o cursor "Bottom" até o fim; o cursor é salvo a cada página para retomar depois
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from graph_capture import GraphQLCapture, parse_timeline_response
+
+DEFAULT_EXPORT_STATE_PATH = "graph_export_state.json"
+
+# Busca uma página da timeline na própria página: mesma URL da requisição original, trocando cursor e count
+FETCH_PAGE_SCRIPT = """
+const [url, headers, cursor, count] = arguments;
+const done = arguments[arguments.length - 1];
+const target = new URL(url, location.origin);
+const variables = JSON.parse(target.searchParams.get('variables') || '{}');
+variables.count = count;
+if (cursor) variables.cursor = cursor; else delete variables.cursor;
+target.searchParams.set('variables', JSON.stringify(variables));
+
+const requestHeaders = Object.assign({}, headers);
+const csrf = document.cookie.match(/(?:^|;\\s*)ct0=([^;]+)/);
+if (csrf) requestHeaders['x-csrf-token'] = csrf[1];
+
+fetch(target.toString(), { headers: requestHeaders, credentials: 'include' })
+    .then(response => response.text().then(body => done({
+        status: response.status, body: body, reset: response.headers.get('x-rate-limit-reset')
+    })))
+    .catch(error => done({ status: 0, body: '', error: String(error) }));
+"""
+
+class GraphExportError(Exception):
+    """
+    Página da timeline recusada pelo servidor (modelo de requisição inválido, sessão expirada etc.)
+    """
+
+def _template_key(operation: str, template: Dict) -> str:
+    """
+    Chave do estado salvo: operação + userId da lista (a mesma operação pode ser exportada para outras contas)
+    """
+    query = parse_qs(urlparse(template["url"]).query)
+    try:
+        user_id = json.loads(query.get("variables", ["{}"])[0]).get("userId", "")
+    except ValueError:
+        user_id = ""
+    return f"{operation}:{user_id}"
+
+class GraphExporter:
+    def __init__(self, driver, operation: str = "Following", state_path: Optional[str] = DEFAULT_EXPORT_STATE_PATH,
+                 output_path: Optional[str] = None, page_size: int = 100, delay: float = 1.0,
+                 max_retries: int = 3, max_rate_limit_wait: float = 900):
+        """
+        Prepara a exportação de uma timeline (Following, Followers...) na página atual do driver
+
+        Args:
+            driver: WebDriver já logado, numa página do X (o fetch usa os cookies da sessão)
+            operation: Operação GraphQL a paginar
+            state_path: JSON com o modelo de requisição e o cursor de cada exportação (None para não persistir)
+            output_path: JSONL com os usuários exportados (padrão: graph_export_<operação>.jsonl)
+            page_size: Usuários pedidos por página
+            delay: Pausa (segundos) entre páginas
+            max_retries: Tentativas por página em erros de rede e 5xx
+            max_rate_limit_wait: Espera máxima (segundos) por um 429 antes de desistir
+        """
+        self.driver = driver
+        self.operation = operation
+        self.state_path = state_path
+        self.output_path = output_path or f"graph_export_{operation.lower()}.jsonl"
+        self.page_size = page_size
+        self.delay = delay
+        self.max_retries = max_retries
+        self.max_rate_limit_wait = max_rate_limit_wait
+
+        self.template: Optional[Dict] = None
+        self.cursor: Optional[str] = None
+        self.done = False
+        self._seen_ids = set()
+        self.stats = {"pages": 0, "users": 0, "retries": 0, "rate_limited": 0, "seconds": 0.0, "resumed": False}
+        self.logger = logging.getLogger(__name__)
+
+        self.driver.set_script_timeout(60)
+        self._load_state()
+
+    def _read_states(self) -> Dict[str, Dict]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Não foi possível ler o estado da exportação: {e}")
+            return {}
+
+    def _load_state(self):
+        """
+        Retoma a última exportação desta operação que não chegou ao fim
+        """
+        for key, state in self._read_states().items():
+            if key.split(":")[0] == self.operation and not state.get("done"):
+                self.template = state["template"]
+                self.cursor = state.get("cursor")
+                self.stats["resumed"] = self.cursor is not None
+                break
+
+    def _save_state(self):
+        if not self.state_path or not self.template:
+            return
+
+        states = self._read_states()
+        states[_template_key(self.operation, self.template)] = {
+            "template": self.template,
+            "cursor": self.cursor,
+            "done": self.done,
+            "updated_at": datetime.now().isoformat()
+        }
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump(states, f, ensure_ascii=False, indent=2)
+
+    def set_template(self, template: Dict):
+        """
+        Define a requisição modelo (URL e cabeçalhos de uma página que a própria página do X pediu)
+
+        Se for a mesma lista da exportação salva, o cursor é mantido e a exportação continua de onde parou.
+        """
+        # Só os cabeçalhos da aplicação; os do navegador (cookie, referer, sec-*) o fetch preenche sozinho
+        headers = {name: value for name, value in template.get("headers", {}).items()
+                   if name.lower() == "authorization" or
+                   (name.lower().startswith("x-") and name.lower() != "x-csrf-token")}
+        template = {"url": template["url"], "headers": headers}
+
+        if self.template and _template_key(self.operation, self.template) != _template_key(self.operation, template):
+            self.cursor = None
+            self.stats["resumed"] = False
+        self.template = template
+
+    def learn_template(self, capture: GraphQLCapture, timeout: float = 15.0):
+        """
+        Espera a página do X pedir a primeira página da timeline e usa essa requisição como modelo
+        """
+        deadline = time.monotonic() + timeout
+        while self.operation not in capture.templates:
+            if time.monotonic() >= deadline:
+                if self.template:
+                    self.logger.warning("⚠️ Requisição da timeline não vista; usando o modelo salvo")
+                    return
+                raise GraphExportError(f"Nenhuma requisição {self.operation} vista em {timeout:.0f}s "
+                                       f"(abra a página da lista com a captura de rede ativa)")
+            capture.poll()
+            time.sleep(0.25)
+        self.set_template(capture.templates[self.operation])
+
+    def _fetch_page(self, cursor: Optional[str]) -> Dict:
+        """
+        Busca uma página com retentativas: 429 espera o reset informado pelo servidor, rede e 5xx com backoff
+        """
+        attempt = 0
+        while True:
+            response = self.driver.execute_async_script(
+                FETCH_PAGE_SCRIPT, self.template["url"], self.template["headers"], cursor, self.page_size
+            )
+            status = response.get("status", 0)
+
+            if status == 200:
+                try:
+                    return json.loads(response.get("body") or "{}")
+                except ValueError:
+                    error = "resposta não é JSON"
+            elif status == 429:
+                self.stats["rate_limited"] += 1
+                reset = response.get("reset")
+                wait = float(reset) - time.time() if reset else 60.0
+                wait = max(1.0, wait)
+                if wait > self.max_rate_limit_wait:
+                    raise GraphExportError(f"Limite de requisições: reset em {wait:.0f}s")
+                self.logger.warning(f"⏳ Limite de requisições atingido, aguardando {wait:.0f}s...")
+                time.sleep(wait)
+                continue
+            elif status == 0 or status >= 500:
+                error = response.get("error") or f"HTTP {status}"
+            else:
+                raise GraphExportError(f"HTTP {status} na página da timeline: {(response.get('body') or '')[:200]}")
+
+            attempt += 1
+            self.stats["retries"] += 1
+            if attempt > self.max_retries:
+                raise GraphExportError(f"Página da timeline falhou {attempt} vezes: {error}")
+            self.logger.warning(f"⚠️ Erro na página da timeline ({error}), tentativa {attempt}/{self.max_retries}")
+            time.sleep(2 ** attempt)
+
+    def fetch_users(self, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Uma página da timeline a partir de cursor (None = topo), sem tocar no estado salvo
+
+        Returns:
+            (usuários da página, cursor da próxima página ou None no fim da lista)
+        """
+        if not self.template:
+            raise GraphExportError("Modelo de requisição não definido (ver learn_template)")
+        return parse_timeline_response(self._fetch_page(cursor))
+
+    def _append_users(self, users: List[Dict]):
+        if not self.output_path or not users:
+            return
+        with open(self.output_path, "a", encoding="utf-8") as f:
+            for user in users:
+                f.write(json.dumps(user, ensure_ascii=False) + "\n")
+
+    def _load_exported_ids(self):
+        """
+        Ids já gravados (continuação do cursor) ou arquivo zerado (exportação nova, do topo)
+        """
+        if self.cursor is None:
+            self._seen_ids.clear()
+            if self.output_path:
+                open(self.output_path, "w", encoding="utf-8").close()
+            return
+        if not self.output_path:
+            return
+        if os.path.exists(self.output_path):
+            with open(self.output_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._seen_ids.add(json.loads(line)["user_id"])
+                    except (KeyError, ValueError):
+                        continue
+
+    def iter_pages(self, max_pages: Optional[int] = None) -> Iterator[List[Dict]]:
+        """
+        Percorre a timeline a partir do cursor salvo, devolvendo os usuários novos de cada página
+
+        O cursor é salvo depois de cada página gravada: se a exportação for interrompida, a próxima
+        continua da página seguinte. Ao chegar ao fim, a próxima exportação recomeça do topo.
+        """
+        if not self.template:
+            raise GraphExportError("Modelo de requisição não definido (ver learn_template)")
+
+        if self.stats["resumed"]:
+            self.logger.info(f"↩️ Retomando exportação de {self.operation} do cursor salvo")
+        self._load_exported_ids()
+        self.done = False
+        pages = 0
+
+        while max_pages is None or pages < max_pages:
+            started = time.perf_counter()
+            page_users, next_cursor = self.fetch_users(self.cursor)
+
+            new_users = [user for user in page_users if user['user_id'] not in self._seen_ids]
+            self._seen_ids.update(user['user_id'] for user in new_users)
+            self._append_users(new_users)
+
+            pages += 1
+            self.stats["pages"] += 1
+            self.stats["users"] += len(new_users)
+            self.stats["seconds"] += time.perf_counter() - started
+
+            # Fim da lista (ou cursor repetido): a próxima exportação começa do topo
+            self.done = next_cursor is None or next_cursor == self.cursor
+            self.cursor = None if self.done else next_cursor
+            self._save_state()
+
+            yield new_users
+            if self.done:
+                break
+            time.sleep(self.delay)
+
+    def export(self, max_users: Optional[int] = None) -> List[Dict]:
+        """
+        Exporta a timeline inteira (ou até max_users novos) e devolve os usuários
+        """
+        users = []
+        for page_users in self.iter_pages():
+            users.extend(page_users)
+            if max_users is not None and len(users) >= max_users:
+                break
+        return users
+
+    def log_stats(self):
+        """
+        Registra no log o resumo da exportação
+        """
+        pages = self.stats["pages"]
+        average = self.stats["seconds"] / pages if pages else 0.0
+        status = "completa" if self.done else "parcial (cursor salvo)"
+        self.logger.info(f"📤 Exportação {self.operation} {status}: {self.stats['users']} usuários em {pages} páginas "
+                         f"({average:.2f}s/página), {self.stats['retries']} retentativas, "
+                         f"{self.stats['rate_limited']} limites de requisição")
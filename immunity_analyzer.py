@@ -3,54 +3,33 @@
 Analisador de Imunidade usando IA para proteger desenvolvedores, pesquisadores e profissionais de tech
 """
 
+import asyncio
+import json
+import hashlib
 import logging
-from openai import OpenAI
-from typing import Dict
+import os
+import threading
+import time
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from analysis_budget import AnalysisBudget, BudgetExceededError
+from analysis_metrics import LatencyHistogram
+from analyzer_backends import DEFAULT_BACKENDS_PATH, AnalyzerBackend, BackendRegistry, load_backends
+from bio_similarity import BioSimilarityIndex
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from immunity_cache import ImmunityCache
+from keyword_matcher import KeywordMatcher, STRONG_TECH_KEYWORDS, TECH_KEYWORDS, load_keyword_file
+from local_classifier import DEFAULT_MODEL_PATH, LocalImmunityClassifier
+from prompt_builder import PromptBuilder, estimate_tokens
+from rate_limiter import AdaptiveRateLimiter
 
-class ImmunityAnalyzer:
-    def __init__(self, openrouter_api_key: str):
-        """
-        Inicializa o analisador de imunidade usando OpenRouter
-        """
-        self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=openrouter_api_key,
-        )
-        self.immunity_cache = {}  # Cache para evitar análises repetidas
-        
-        # Configurar logging
-        self.logger = logging.getLogger(__name__)
-
-    def analyze_user_immunity(self, username: str, display_name: str, description: str, location: str = "") -> Dict:
-        """
-        Analisa se um usuário deve ser imune ao unfollow baseado em seu perfil
-        
-        Args:
-            username: Nome de usuário (@username)
-            display_name: Nome de exibição
-            description: Bio/descrição do perfil
-            location: Localização (opcional)
-            
-        Returns:
-            Dict com category, immunity_status, confidence, reasoning
-        """
-        # Verificar cache primeiro
-        cache_key = f"{username}:{description[:50]}"
-        if cache_key in self.immunity_cache:
-            return self.immunity_cache[cache_key]
-        
-        try:
-            # Prompt para análise de imunidade
-            prompt = f"""
-Analise este perfil do Twitter/X e determine se a pessoa deve ser IMUNE ao unfollow automático.
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+ANALYSIS_MODEL = "anthropic/claude-3.5-sonnet"
+# Modelo barato e rápido consultado primeiro; ANALYSIS_MODEL só para os casos duvidosos
+FAST_MODEL = "anthropic/claude-3-haiku"
+SYSTEM_PROMPT = "Você é um especialista em análise de perfis tech. Seja conservador e proteja desenvolvedores, pesquisadores e profissionais de tecnologia."
 
-PERFIL:
-- Username: @{username}
-- Nome: {display_name}
-- Bio: {description}
-- Localização: {location}
-
-CRITÉRIOS DE IMUNIDADE (pessoas que devem ser PROTEGIDAS):
+IMMUNITY_CRITERIA = """CRITÉRIOS DE IMUNIDADE (pessoas que devem ser PROTEGIDAS):
 
 1. DESENVOLVEDORES/ENGENHEIROS:
    - Software engineers, developers, programmers
@@ -79,8 +58,9 @@ CRITÉRIOS DE IMUNIDADE (pessoas que devem ser PROTEGIDAS):
    - CTOs, VPs of Engineering
    - Tech founders, CEOs de startups tech
    - Tech influencers reconhecidos
+"""
 
-RESPONDA EM JSON:
+SINGLE_RESPONSE_FORMAT = """RESPONDA EM JSON:
 {
   "category": "ENGINEER|RESEARCHER|ACADEMIC|TECH_WORKER|TECH_LEADER|OTHER",
   "immunity_status": "immune|not_immune", 
@@ -91,111 +71,1494 @@ RESPONDA EM JSON:
 Seja CONSERVADOR - em caso de dúvida, marque como IMUNE.
 """
 
-            response = self.client.chat.completions.create(
-                model="anthropic/claude-3.5-sonnet",
-                messages=[
-                    {"role": "system", "content": "Você é um especialista em análise de perfis tech. Seja conservador e proteja desenvolvedores, pesquisadores e profissionais de tecnologia."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.1
-            )
-            
-            # Extrair resposta
-            content = response.choices[0].message.content.strip()
-            
-            # Tentar parsear JSON
-            import json
+BATCH_RESPONSE_FORMAT = """RESPONDA APENAS COM UM ARRAY JSON, com um objeto para CADA perfil:
+[
+  {
+    "username": "username sem @",
+    "category": "ENGINEER|RESEARCHER|ACADEMIC|TECH_WORKER|TECH_LEADER|OTHER",
+    "immunity_status": "immune|not_immune",
+    "confidence": 0.0-1.0,
+    "reasoning": "explicação breve"
+  }
+]
+
+Seja CONSERVADOR - em caso de dúvida, marque como IMUNE.
+"""
+
+# Modo compacto: só rótulo, com chaves curtas (poucos tokens de saída); a explicação vem sob demanda via explain()
+COMPACT_SINGLE_FORMAT = """RESPONDA APENAS COM JSON MÍNIMO, sem explicação:
+{"c": "ENGINEER|RESEARCHER|ACADEMIC|TECH_WORKER|TECH_LEADER|OTHER", "i": 1 se imune ou 0 se não, "p": confiança 0.0-1.0}
+
+Seja CONSERVADOR - em caso de dúvida, marque como IMUNE.
+"""
+
+COMPACT_BATCH_FORMAT = """RESPONDA APENAS COM UM ARRAY JSON MÍNIMO, um objeto para CADA perfil, sem explicação:
+[{"u": "username sem @", "c": "ENGINEER|RESEARCHER|ACADEMIC|TECH_WORKER|TECH_LEADER|OTHER", "i": 1 se imune ou 0 se não, "p": confiança 0.0-1.0}]
+
+Seja CONSERVADOR - em caso de dúvida, marque como IMUNE.
+"""
+
+# Formatos de resposta e max_tokens (por requisição individual / por perfil de um lote) de cada modo
+RESPONSE_MODES = {
+    "full": {"single": SINGLE_RESPONSE_FORMAT, "batch": BATCH_RESPONSE_FORMAT, "max_tokens": 200, "tokens_per_profile": 120},
+    "compact": {"single": COMPACT_SINGLE_FORMAT, "batch": COMPACT_BATCH_FORMAT, "max_tokens": 40, "tokens_per_profile": 30},
+}
+
+REQUIRED_FIELDS = ["category", "immunity_status", "confidence"]
+
+# Confiança abaixo da qual as linhas salvas em CSV recebem a explicação no modo compacto (ver explain_rows)
+DEFAULT_EXPLAIN_BELOW = 0.75
+
+# Categorias que indicam perfil tech (devem vir com immune); OTHER deve vir com not_immune
+TECH_CATEGORIES = {"ENGINEER", "RESEARCHER", "ACADEMIC", "TECH_WORKER", "TECH_LEADER"}
+MODEL_CATEGORIES = TECH_CATEGORIES | {"OTHER"}
+
+# Muda quando o prompt muda; junto com os modelos, o modo de resposta e o orçamento da bio, invalida o cache persistente
+PROMPT_VERSION = hashlib.sha1("".join(
+    [SYSTEM_PROMPT, IMMUNITY_CRITERIA] + [mode[kind] for mode in RESPONSE_MODES.values() for kind in ("single", "batch")]
+).encode("utf-8")).hexdigest()[:12]
+
+# Camadas locais da cascata, na ordem em que são consultadas
+DEFAULT_CASCADE_TIERS = ["allowlist", "denylist", "keywords", "similar", "classifier"]
+
+# Resultados marcados com estes tiers não vieram de uma resposta da IA: não vão para o cache nem para
+# o índice de similaridade, e bios quase idênticas são analisadas por conta própria
+UNRELIABLE_TIERS = {"error", "failover", "deferred"}
+
+def load_username_list(path: str) -> Set[str]:
+    """
+    Lê um arquivo com um username por linha (linhas vazias e # são ignoradas)
+    """
+    if not path or not os.path.exists(path):
+        return set()
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        return {
+            line.strip().lstrip('@').lower()
+            for line in f
+            if line.strip() and not line.strip().startswith('#')
+        }
+
+class ImmunityAnalyzer:
+    def __init__(self, openrouter_api_key: str, max_concurrency: int = 8, batch_size: int = 20,
+                 cache_path: str = "immunity_cache.db", cache_ttl_days: float = 30, cache_max_entries: int = 50000,
+                 allowlist: Optional[Iterable[str]] = None, denylist: Optional[Iterable[str]] = None,
+                 cascade_tiers: Optional[List[str]] = None, extra_keywords: Optional[Iterable[str]] = None,
+                 classifier_path: str = DEFAULT_MODEL_PATH, classifier_threshold: float = 0.9,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, max_retries: int = 4,
+                 similarity_threshold: float = 0.8, similarity_penalty: float = 0.15,
+                 fast_model: Optional[str] = FAST_MODEL, strong_model: str = ANALYSIS_MODEL,
+                 escalation_threshold: float = 0.75, request_timeout: float = 30.0,
+                 circuit_breaker: Optional[CircuitBreaker] = None, response_mode: str = "compact",
+                 hedge_requests: bool = False, hedge_max_ratio: float = 0.05, hedge_min_samples: int = 20,
+                 bio_token_budget: int = 100, backends: Optional[List[AnalyzerBackend]] = None,
+                 backends_path: str = DEFAULT_BACKENDS_PATH, budget: Optional[AnalysisBudget] = None):
+        """
+        Inicializa o analisador de imunidade usando OpenRouter (ou outros backends compatíveis com a OpenAI)
+
+        Args:
+            openrouter_api_key: Chave da API do OpenRouter (backend padrão)
+            max_concurrency: Máximo de requisições simultâneas no backend padrão
+            batch_size: Perfis enviados por requisição (1 desativa o modo em lote)
+            cache_path: Arquivo SQLite do cache de análises (":memory:" para não persistir)
+            cache_ttl_days: Validade das análises em cache
+            cache_max_entries: Tamanho máximo do cache (remove as menos usadas)
+            allowlist: Usernames sempre imunes (padrão: immunity_allowlist.txt, se existir)
+            denylist: Usernames nunca imunes (padrão: immunity_denylist.txt, se existir)
+            cascade_tiers: Camadas locais consultadas antes da IA (padrão: allowlist, denylist, keywords, similar, classifier)
+            extra_keywords: Termos técnicos adicionais (padrão: tech_keywords.txt, se existir)
+            classifier_path: Modelo do classificador local (ver local_classifier.py); ignorado se não existir
+            classifier_threshold: Confiança mínima para o classificador decidir sem a IA
+            rate_limiter: Limitador do backend padrão, compartilhado pelas chamadas síncronas e assíncronas
+            max_retries: Tentativas extras após 429, timeout ou erro 5xx
+            similarity_threshold: Similaridade mínima (Jaccard estimado) para reaproveitar a análise de uma bio quase idêntica
+            similarity_penalty: Quanto descontar da confiança de uma análise reaproveitada
+            fast_model: Modelo barato consultado primeiro (None desativa o roteamento)
+            strong_model: Modelo usado quando a resposta do fast_model é duvidosa
+            escalation_threshold: Confiança mínima do fast_model para não escalar
+            request_timeout: Tempo máximo (segundos) de cada chamada à IA
+            circuit_breaker: Circuit breaker do backend padrão; com todos os circuitos abertos, os perfis vão para a análise local
+            response_mode: "compact" (só rótulo; reasoning sob demanda com explain) ou "full" (com reasoning)
+            hedge_requests: No modo assíncrono, duplica a chamada que passar do p95 observado (vale a primeira resposta)
+            hedge_max_ratio: Fração máxima das requisições que podem ser duplicadas
+            hedge_min_samples: Latências observadas (por modelo) antes de começar a duplicar
+            bio_token_budget: Tokens máximos da bio no prompt (bios maiores são cortadas)
+            backends: Endpoints compatíveis com a OpenAI entre os quais as chamadas são distribuídas
+            backends_path: Arquivo JSON com os backends, usado se backends não for informado (ver analyzer_backends_example.json)
+            budget: Limites de tokens/dólares/segundos por execução e por dia (padrão: variáveis ANALYSIS_BUDGET_*, se houver)
+        """
+        # Configurar logging
+        self.logger = logging.getLogger(__name__)
+        
+        self.openrouter_api_key = openrouter_api_key
+        
+        # Backends da IA: arquivo de configuração ou só o OpenRouter
+        if backends is None:
+            backends = load_backends(backends_path) or [AnalyzerBackend(
+                name="openrouter",
+                base_url=OPENROUTER_BASE_URL,
+                api_key=openrouter_api_key,
+                max_concurrency=max_concurrency,
+                timeout=request_timeout,
+                rate_limiter=rate_limiter,
+                circuit_breaker=circuit_breaker
+            )]
+        self.backends = BackendRegistry(backends)
+        self.max_retries = max(0, max_retries)
+        self.max_concurrency = self.backends.max_concurrency
+        self.batch_size = max(1, batch_size)
+        
+        # Roteamento: modelo rápido primeiro, modelo forte só para respostas duvidosas
+        self.fast_model = fast_model if fast_model != strong_model else None
+        self.strong_model = strong_model
+        self.escalation_threshold = escalation_threshold
+        
+        if response_mode not in RESPONSE_MODES:
+            raise ValueError(f"response_mode inválido: {response_mode} (use {', '.join(RESPONSE_MODES)})")
+        self.response_mode = response_mode
+        self.response_format = RESPONSE_MODES[response_mode]
+        self.prompt_builder = PromptBuilder(SYSTEM_PROMPT, IMMUNITY_CRITERIA, self.response_format["single"],
+                                            self.response_format["batch"], bio_token_budget=bio_token_budget)
+        # Perfis vistos nesta sessão, para explain(username) sem repassar os dados
+        self._seen_profiles: Dict[str, Tuple[str, str, str, str]] = {}
+        self.model_stats: Dict[str, Dict] = {}
+        self.analysis_seconds = 0.0
+        self.routing_stats = {"routed": 0, "escalations": 0}
+        
+        # Requisições duplicadas (hedging) para cortar a cauda de latência
+        self.hedge_requests = hedge_requests
+        self.hedge_max_ratio = hedge_max_ratio
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_stats = {"requests": 0, "hedged": 0, "wins": 0}
+        
+        # Orçamento: sem ele, os perfis que ainda precisam da IA ficam para o próximo ciclo
+        self.budget = budget if budget is not None else AnalysisBudget.from_env()
+        
+        # Cache persistente para evitar análises repetidas entre ciclos
+        self.immunity_cache = ImmunityCache(
+            path=cache_path,
+            version=f"{strong_model}:{self.fast_model}:{PROMPT_VERSION}:{response_mode}:{bio_token_budget}",
+            ttl_seconds=cache_ttl_days * 24 * 3600,
+            max_entries=cache_max_entries
+        )
+        
+        # Cascata de classificação: camadas locais antes da IA
+        self.allowlist = {u.lstrip('@').lower() for u in allowlist} if allowlist is not None else load_username_list('immunity_allowlist.txt')
+        self.denylist = {u.lstrip('@').lower() for u in denylist} if denylist is not None else load_username_list('immunity_denylist.txt')
+        self.cascade_tiers = list(cascade_tiers) if cascade_tiers is not None else list(DEFAULT_CASCADE_TIERS)
+        self.tier_hits = {tier: 0 for tier in self.cascade_tiers + ["cache", "inflight", "llm", "failover", "deferred", "error"]}
+        
+        # Latência de acertos do cache versus chamadas à IA
+        self.latency = {"cache_hit": LatencyHistogram(), "llm": LatencyHistogram()}
+        
+        # Bios quase idênticas reaproveitam a análise já feita pela IA (MinHash/LSH)
+        self.bio_index = BioSimilarityIndex(threshold=similarity_threshold)
+        self.similarity_penalty = similarity_penalty
+        self._indexed_fingerprints: Set[str] = set()
+        
+        # Análises em andamento, para juntar requisições idênticas (single-flight)
+        self._inflight_lock = threading.Lock()
+        self._inflight_sync: Dict[str, Dict] = {}
+        self._inflight_async: Dict[str, asyncio.Future] = {}
+        
+        # Classificador local treinado com análises anteriores (opcional)
+        self.classifier = None
+        self.classifier_threshold = classifier_threshold
+        if classifier_path and os.path.exists(classifier_path):
             try:
-                result = json.loads(content)
-            except:
-                # Fallback se JSON inválido
-                result = {
-                    "category": "OTHER",
-                    "immunity_status": "not_immune",
-                    "confidence": 0.5,
-                    "reasoning": "Erro no parsing da resposta da IA"
+                self.classifier = LocalImmunityClassifier.load(classifier_path)
+            except Exception as e:
+                self.logger.warning(f"Não foi possível carregar o classificador local: {e}")
+        
+        # Matchers de palavras-chave compilados uma única vez
+        if extra_keywords is None:
+            extra_keywords = load_keyword_file('tech_keywords.txt')
+        self.tech_matcher = KeywordMatcher(TECH_KEYWORDS + list(extra_keywords))
+        self.strong_tech_matcher = KeywordMatcher(STRONG_TECH_KEYWORDS)
+
+    def _record_tier(self, tier: str, count: int = 1):
+        """
+        Contabiliza decisões tomadas por uma camada da cascata
+        """
+        self.tier_hits[tier] = self.tier_hits.get(tier, 0) + count
+
+    def _local_decision(self, username: str, display_name: str, description: str) -> Optional[Tuple[str, Dict]]:
+        """
+        Tenta decidir um perfil sem a IA; retorna (camada, resultado) ou None se ambíguo
+        """
+        username_key = username.lstrip('@').lower()
+        
+        for tier in self.cascade_tiers:
+            if tier == "allowlist" and username_key in self.allowlist:
+                return tier, {
+                    "category": "ALLOWLIST",
+                    "immunity_status": "immune",
+                    "confidence": 1.0,
+                    "reasoning": "Usuário na lista de imunidade"
                 }
             
-            # Validar campos obrigatórios
-            if not all(key in result for key in ["category", "immunity_status", "confidence"]):
-                result = {
-                    "category": "OTHER",
-                    "immunity_status": "not_immune", 
-                    "confidence": 0.5,
-                    "reasoning": "Resposta incompleta da IA"
+            if tier == "denylist" and username_key in self.denylist:
+                return tier, {
+                    "category": "DENYLIST",
+                    "immunity_status": "not_immune",
+                    "confidence": 1.0,
+                    "reasoning": "Usuário na lista de bloqueio"
                 }
             
-            # Garantir que confidence está no range correto
-            result["confidence"] = max(0.0, min(1.0, float(result.get("confidence", 0.5))))
+            if tier == "keywords":
+                hits = self.strong_tech_matcher.find_all(f"{display_name} {description}")
+                if hits:
+                    return tier, {
+                        "category": "TECH_RELATED",
+                        "immunity_status": "immune",
+                        "confidence": 0.85,
+                        "reasoning": f"Palavras-chave técnicas fortes detectadas: {', '.join(hits)}"
+                    }
+        
+        return None
+
+    def _resolve_locally(self, username: str, display_name: str, description: str, location: str = "") -> Optional[Dict]:
+        """
+        Consulta as camadas locais e o cache; retorna None quando o perfil precisa da IA
+        """
+        return self._resolve_many([{
+            'username': username,
+            'display_name': display_name,
+            'bio': description,
+            'location': location
+        }])[0]
+
+    def _resolve_many(self, profiles: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Versão em lote de _resolve_locally
+        
+        Listas e palavras-chave são avaliadas por perfil, depois o cache; a busca por bios quase
+        idênticas e o classificador local (vetorizado) rodam sobre os perfis que sobraram.
+        """
+        results: List[Optional[Dict]] = []
+        remaining = []
+        
+        for index, profile in enumerate(profiles):
+            username, display_name, description, location = self._profile_fields(profile)
+            self._seen_profiles[username.lstrip('@').lower()] = (username, display_name, description, location)
             
-            # Cache do resultado
-            self.immunity_cache[cache_key] = result
+            decision = self._local_decision(username, display_name, description)
+            if decision is not None:
+                tier, result = decision
+                self._record_tier(tier)
+                results.append(result)
+                continue
             
-            return result
+            cached = self._cache_get(username, display_name, description, location)
+            if cached is not None:
+                self._record_tier("cache")
+                self._index_bio(username, display_name, description, location, cached)
+            else:
+                remaining.append(index)
+            results.append(cached)
+        
+        # Só depois do cache, para que as análises em cache desta lista já estejam no índice
+        if remaining and "similar" in self.cascade_tiers:
+            still_remaining = []
+            for index in remaining:
+                similar = self._find_similar(profiles[index].get('bio', ''))
+                if similar is not None:
+                    self._record_tier("similar")
+                    results[index] = similar
+                else:
+                    still_remaining.append(index)
+            remaining = still_remaining
+        
+        if remaining and self.classifier is not None and "classifier" in self.cascade_tiers:
+            predictions = self.classifier.classify([profiles[i] for i in remaining], self.classifier_threshold)
+            for index, prediction in zip(remaining, predictions):
+                if prediction is not None:
+                    self._record_tier("classifier")
+                    results[index] = prediction
+        
+        return results
+
+    def get_tier_stats(self) -> Dict:
+        """
+        Decisões por camada da cascata, fração resolvida sem chamar a IA e fração desviada pelo circuit breaker
+        
+        Perfis analisados localmente porque a IA estava fora (failover) não contam como chamadas economizadas.
+        """
+        total = sum(self.tier_hits.values())
+        failover = self.tier_hits.get("failover", 0)
+        local = total - failover - sum(self.tier_hits.get(tier, 0) for tier in ("llm", "deferred", "error"))
+        
+        return {
+            "tier_hits": dict(self.tier_hits),
+            "total": total,
+            "llm_calls_saved_ratio": (local / total) if total else 0.0,
+            "failover_ratio": (failover / total) if total else 0.0
+        }
+
+    def _cache_get(self, username: str, display_name: str, description: str, location: str = "") -> Optional[Dict]:
+        """
+        Busca a análise de um perfil no cache
+        """
+        started = time.perf_counter()
+        cached = self.immunity_cache.get(ImmunityCache.fingerprint(username, display_name, description, location))
+        if cached is not None:
+            self.latency["cache_hit"].observe(time.perf_counter() - started)
+        return cached
+
+    def _cache_set(self, username: str, display_name: str, description: str, location: str, result: Dict):
+        """
+        Grava a análise de um perfil no cache
+        """
+        if result.get("tier") in UNRELIABLE_TIERS:
+            return
+        self.immunity_cache.set(ImmunityCache.fingerprint(username, display_name, description, location), username, result)
+        self._index_bio(username, display_name, description, location, result)
+
+    def _index_bio(self, username: str, display_name: str, description: str, location: str, result: Dict):
+        """
+        Adiciona a bio de um perfil analisado pela IA ao índice de similaridade
+        """
+        if result.get("tier") in UNRELIABLE_TIERS:
+            return
+        
+        fingerprint = ImmunityCache.fingerprint(username, display_name, description, location)
+        if fingerprint in self._indexed_fingerprints:
+            return
+        if self.bio_index.add(description, (username, result)):
+            self._indexed_fingerprints.add(fingerprint)
+
+    def _reuse_result(self, result: Dict, source_username: str, similarity: float) -> Dict:
+        """
+        Adapta a análise de outro perfil com bio quase idêntica, com desconto na confiança
+        """
+        try:
+            confidence = float(result.get("confidence", 0.5))
+        except (TypeError, ValueError):
+            confidence = 0.5
+        
+        return {
+            **result,
+            "confidence": round(max(0.0, confidence - self.similarity_penalty), 3),
+            "reasoning": f"Bio quase idêntica à de @{source_username} (similaridade {similarity:.2f}): {result.get('reasoning', '')}",
+            "tier": "similar"
+        }
+
+    def _find_similar(self, description: str) -> Optional[Dict]:
+        """
+        Reaproveita a análise de uma bio quase idêntica já analisada; None se não houver
+        """
+        match = self.bio_index.query(description)
+        if match is None:
+            return None
+        
+        similarity, (source_username, result) = match
+        return self._reuse_result(result, source_username, similarity)
+
+    def _build_messages(self, username: str, display_name: str, description: str, location: str = "") -> List[Dict]:
+        """
+        Monta as mensagens enviadas ao modelo
+        """
+        return self.prompt_builder.single_messages(username, display_name, description, location)
+
+    def _strip_code_fence(self, content: str) -> str:
+        """
+        Remove blocos ```json ... ``` que alguns modelos adicionam em volta do JSON
+        """
+        content = content.strip()
+        if content.startswith("```"):
+            content = content.split("\n", 1)[1] if "\n" in content else ""
+            content = content.rsplit("```", 1)[0]
+        return content.strip()
+
+    def _parse_response(self, content: str) -> Dict:
+        """
+        Converte a resposta do modelo em resultado validado
+        """
+        # Tentar parsear JSON
+        try:
+            result = self._expand_compact(json.loads(self._strip_code_fence(content)))
+        except:
+            # Fallback se JSON inválido
+            result = {
+                "category": "OTHER",
+                "immunity_status": "not_immune",
+                "confidence": 0.5,
+                "reasoning": "Erro no parsing da resposta da IA"
+            }
+        
+        # Validar campos obrigatórios (status fora de immune/not_immune não chega aos filtros de unfollow)
+        if not isinstance(result, dict) or not all(key in result for key in REQUIRED_FIELDS) or \
+                result["immunity_status"] not in ("immune", "not_immune"):
+            result = {
+                "category": "OTHER",
+                "immunity_status": "not_immune", 
+                "confidence": 0.5,
+                "reasoning": "Resposta incompleta da IA"
+            }
+        
+        # Garantir que confidence é número e está no range correto
+        try:
+            confidence = float(result.get("confidence", 0.5))
+        except (TypeError, ValueError):
+            confidence = 0.5
+        result["confidence"] = max(0.0, min(1.0, confidence))
+        result.setdefault("reasoning", "")
+        
+        return result
+
+    def _expand_compact(self, entry):
+        """
+        Converte uma resposta compacta ({"u", "c", "i", "p"}) para as chaves completas; outras passam intactas
+        """
+        if not isinstance(entry, dict) or "c" not in entry or "category" in entry:
+            return entry
+        
+        expanded = {"category": entry["c"], "reasoning": ""}
+        if "u" in entry:
+            expanded["username"] = entry["u"]
+        if "i" in entry:
+            expanded["immunity_status"] = "immune" if str(entry["i"]).lower() in ("1", "true", "immune") else "not_immune"
+        if "p" in entry:
+            expanded["confidence"] = entry["p"]
+        return expanded
+
+    def _error_result(self, username: str, error: Exception) -> Dict:
+        """
+        Resultado conservador usado quando a análise falha
+        """
+        self.logger.error(f"Erro na análise de IA para @{username}: {error}")
+        self._record_tier("error")
+        
+        return {
+            "category": "UNKNOWN",
+            "immunity_status": "immune",  # Conservador: proteger em caso de erro
+            "confidence": 0.3,
+            "reasoning": f"Erro na análise: {str(error)}",
+            "tier": "error"
+        }
+
+    def _profile_fields(self, profile: Dict) -> Tuple[str, str, str, str]:
+        """
+        Extrai (username, display_name, description, location) de um dict de perfil
+        """
+        return (
+            profile['username'],
+            profile.get('display_name') or profile['username'],
+            profile.get('bio', ''),
+            profile.get('location', '')
+        )
+
+    def _parse_batch_response(self, content: str, profiles: List[Dict]) -> Dict[str, Dict]:
+        """
+        Converte a resposta de um lote em {username: resultado}, descartando entradas inválidas
+        """
+        try:
+            entries = json.loads(self._strip_code_fence(content))
+        except:
+            self.logger.warning("Resposta do lote não é JSON válido")
+            return {}
+        
+        if isinstance(entries, dict):
+            entries = entries.get("results", [])
+        if not isinstance(entries, list):
+            return {}
+        
+        expected = {profile['username'].lower() for profile in profiles}
+        parsed = {}
+        
+        for entry in entries:
+            entry = self._expand_compact(entry)
+            if not isinstance(entry, dict):
+                continue
             
-        except Exception as e:
-            self.logger.error(f"Erro na análise de IA para @{username}: {e}")
-            
-            # Fallback conservador em caso de erro
-            fallback_result = {
-                "category": "UNKNOWN",
-                "immunity_status": "immune",  # Conservador: proteger em caso de erro
-                "confidence": 0.3,
-                "reasoning": f"Erro na análise: {str(e)}"
+            username = str(entry.get("username", "")).lstrip("@").lower()
+            if username not in expected or username in parsed:
+                continue
+            if not all(key in entry for key in REQUIRED_FIELDS):
+                continue
+            if entry["immunity_status"] not in ("immune", "not_immune"):
+                continue
+            
+            try:
+                confidence = max(0.0, min(1.0, float(entry["confidence"])))
+            except (TypeError, ValueError):
+                continue
+            
+            parsed[username] = {
+                "category": entry["category"],
+                "immunity_status": entry["immunity_status"],
+                "confidence": confidence,
+                "reasoning": entry.get("reasoning", "")
+            }
+        
+        return parsed
+
+    def _batch_request_args(self, profiles: List[Dict], model: str) -> Dict:
+        """
+        Parâmetros da requisição de um lote
+        """
+        return {
+            "model": model,
+            "messages": self.prompt_builder.batch_messages(profiles),
+            "max_tokens": self.response_format["tokens_per_profile"] * len(profiles) + 50,
+            "temperature": 0.1
+        }
+
+    def _profiles_to_escalate(self, profiles: List[Dict], parsed: Dict[str, Dict]) -> List[Dict]:
+        """
+        Perfis de um lote sem resposta válida ou com resposta duvidosa
+        """
+        return [
+            profile for profile in profiles
+            if profile['username'].lower() not in parsed or self._needs_escalation(parsed[profile['username'].lower()])
+        ]
+
+    def _chunks(self, items: List, size: int) -> List[List]:
+        """
+        Divide uma lista em pedaços de até size elementos
+        """
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def _model_route(self) -> List[str]:
+        """
+        Modelos na ordem em que são consultados
+        """
+        return [self.fast_model, self.strong_model] if self.fast_model else [self.strong_model]
+
+    def _needs_escalation(self, result: Dict) -> bool:
+        """
+        True se a resposta do modelo rápido é duvidosa: confiança baixa, categoria desconhecida
+        ou categoria que contradiz o status (ex: OTHER marcado como imune)
+        """
+        category = str(result.get("category", "")).upper()
+        if result.get("confidence", 0.0) < self.escalation_threshold or category not in MODEL_CATEGORIES:
+            return True
+        return (category in TECH_CATEGORIES) != (result.get("immunity_status") == "immune")
+
+    def _record_model_call(self, model: str, elapsed: float, response, messages: List[Dict]):
+        """
+        Contabiliza latência e tokens de uma chamada por modelo
+        
+        Sem o campo usage na resposta, os tokens são estimados a partir do texto (estimated_calls).
+        """
+        stats = self.model_stats.setdefault(model, {
+            "calls": 0, "estimated_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency": LatencyHistogram()
+        })
+        stats["calls"] += 1
+        stats["latency"].observe(elapsed)
+        
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        else:
+            stats["estimated_calls"] += 1
+            prompt_tokens = sum(estimate_tokens(message.get("content", "")) for message in messages)
+            try:
+                completion_tokens = estimate_tokens(response.choices[0].message.content or "")
+            except (AttributeError, IndexError):
+                completion_tokens = 0
+        
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        if self.budget is not None:
+            self.budget.record(model, prompt_tokens, completion_tokens)
+
+    def get_token_stats(self) -> Dict:
+        """
+        Totais de tokens da execução (todos os modelos) e vazão em tokens/s durante a análise
+        """
+        prompt_tokens = sum(stats["prompt_tokens"] for stats in self.model_stats.values())
+        completion_tokens = sum(stats["completion_tokens"] for stats in self.model_stats.values())
+        total_tokens = prompt_tokens + completion_tokens
+        
+        return {
+            "calls": sum(stats["calls"] for stats in self.model_stats.values()),
+            "estimated_calls": sum(stats["estimated_calls"] for stats in self.model_stats.values()),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": total_tokens,
+            "analysis_seconds": round(self.analysis_seconds, 2),
+            "tokens_per_second": round(total_tokens / self.analysis_seconds, 1) if self.analysis_seconds > 0 else 0.0
+        }
+
+    def log_token_stats(self):
+        """
+        Registra no log o resumo de tokens da execução
+        """
+        stats = self.get_token_stats()
+        estimated = f" ({stats['estimated_calls']} estimadas)" if stats["estimated_calls"] else ""
+        self.logger.info(f"🔢 Tokens: {stats['prompt_tokens']} de prompt + {stats['completion_tokens']} de resposta "
+                         f"em {stats['calls']} chamadas{estimated}; {stats['tokens_per_second']:.0f} tokens/s "
+                         f"em {stats['analysis_seconds']:.1f}s de análise")
+
+    def get_routing_stats(self) -> Dict:
+        """
+        Latência e tokens por modelo e por backend e taxa de escalonamento para o modelo forte
+        """
+        routed = self.routing_stats["routed"]
+        return {
+            "backends": self.backends.get_stats(),
+            "hedging": dict(self.hedge_stats),
+            "routed": routed,
+            "escalations": self.routing_stats["escalations"],
+            "escalation_rate": round(self.routing_stats["escalations"] / routed, 3) if routed else 0.0,
+            "models": {
+                model: {
+                    "calls": stats["calls"],
+                    "prompt_tokens": stats["prompt_tokens"],
+                    "completion_tokens": stats["completion_tokens"],
+                    "latency_ms": stats["latency"].summary()
+                }
+                for model, stats in self.model_stats.items()
             }
+        }
+
+    def log_routing_stats(self):
+        """
+        Registra no log o resumo do roteamento entre modelos
+        """
+        stats = self.get_routing_stats()
+        if self.fast_model:
+            self.logger.info(f"🧭 Roteamento: {stats['routed']} perfis no modelo rápido, "
+                             f"{stats['escalations']} escalados ({stats['escalation_rate']:.0%})")
+        for model, model_stats in stats["models"].items():
+            self.logger.info(f"   {model}: {model_stats['calls']} chamadas, "
+                             f"{model_stats['prompt_tokens']}+{model_stats['completion_tokens']} tokens, "
+                             f"{self.model_stats[model]['latency']}")
+        if self.hedge_requests:
+            hedge = self.hedge_stats
+            self.logger.info(f"🏁 Hedging: {hedge['hedged']} duplicatas em {hedge['requests']} requisições, "
+                             f"{hedge['wins']} chegaram antes da original")
+        if len(self.backends.backends) > 1:
+            for name, backend_stats in stats["backends"].items():
+                self.logger.info(f"   🖧 {name}: {backend_stats['requests']} chamadas, {backend_stats['failures']} falhas, "
+                                 f"circuito {backend_stats['circuit']}")
+        opened = sum(backend.circuit_breaker.stats["opened"] for backend in self.backends.backends)
+        if opened:
+            self.logger.warning(f"🔌 Circuito aberto {opened}x; "
+                                f"{self.tier_hits.get('failover', 0)} perfis analisados localmente")
+
+    def _is_outage(self, error: Exception) -> bool:
+        """
+        True para falhas do serviço (rede, timeout, 5xx, chave inválida ou sem crédito), não do perfil
+        """
+        if isinstance(error, (APIConnectionError, APITimeoutError)):
+            return True
+        return isinstance(error, APIStatusError) and (error.status_code >= 500 or error.status_code in (401, 402, 403, 429))
+
+    def _record_circuit_outcome(self, backend: AnalyzerBackend, error: Exception, final: bool):
+        """
+        Informa o circuit breaker do backend sobre uma chamada que falhou
+        
+        429 só conta quando as retentativas acabam (o rate limiter já cuida das rajadas);
+        erros que não são de indisponibilidade mostram que a API está respondendo.
+        """
+        if not self._is_outage(error):
+            backend.circuit_breaker.record_success()
+            return
+        
+        backend.stats["failures"] += 1
+        if final or not isinstance(error, RateLimitError):
+            backend.circuit_breaker.record_failure()
+
+    def _failover_result(self, username: str, display_name: str, description: str, location: str = "") -> Dict:
+        """
+        Análise local usada com o circuito aberto: classificador local (se houver) ou palavras-chave
+        """
+        self._record_tier("failover")
+        
+        if self.classifier is not None:
+            profile = {'display_name': display_name, 'bio': description, 'location': location}
+            # Threshold 0.5: com a IA fora, o classificador decide todos os perfis
+            result = self.classifier.classify([profile], 0.5)[0]
+            if result is not None:
+                return {**result, "tier": "failover"}
+        
+        return {**self.analyze_simple_immunity(username, display_name, description), "tier": "failover"}
+
+    def _deferred_result(self, error: BudgetExceededError) -> Dict:
+        """
+        Resultado provisório (imune, sem cache) de um perfil que ficou sem orçamento
+        """
+        self._record_tier("deferred")
+        return {
+            'category': 'DEFERRED',
+            'immunity_status': 'immune',  # Conservador até a análise acontecer
+            'confidence': 0.0,
+            'reasoning': f'Análise adiada para o próximo ciclo: {error}',
+            'tier': 'deferred'
+        }
+
+    def _retry_delay(self, backend: AnalyzerBackend, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Tempo de espera antes de tentar de novo, ou None se o erro não deve ser repetido
+        """
+        if attempt >= self.max_retries:
+            return None
+        
+        if isinstance(error, RateLimitError):
+            # A pausa do Retry-After vale para todas as requisições do backend (via rate limiter)
+            backend.rate_limiter.on_rate_limited(error.response.headers)
+            return backend.rate_limiter.backoff_delay(attempt) / 2
+        
+        if isinstance(error, (APIConnectionError, APITimeoutError)):
+            return backend.rate_limiter.backoff_delay(attempt)
+        
+        if isinstance(error, APIStatusError) and error.status_code >= 500:
+            return backend.rate_limiter.backoff_delay(attempt)
+        
+        return None
+
+    def _acquire_backend(self) -> AnalyzerBackend:
+        """
+        Reserva um backend com vaga e circuito liberado; CircuitOpenError se todos estiverem indisponíveis
+        """
+        unavailable = []
+        while True:
+            backend = self.backends.acquire(exclude=unavailable)
+            if backend is None:
+                raise CircuitOpenError("Todos os backends indisponíveis, usando análise local")
+            if backend.circuit_breaker.allow_request():
+                return backend
+            self.backends.release(backend)
+            unavailable.append(backend)
+
+    async def _acquire_backend_async(self) -> AnalyzerBackend:
+        """
+        Versão assíncrona de _acquire_backend
+        """
+        unavailable = []
+        while True:
+            backend = await self.backends.acquire_async(exclude=unavailable)
+            if backend is None:
+                raise CircuitOpenError("Todos os backends indisponíveis, usando análise local")
+            if backend.circuit_breaker.allow_request():
+                return backend
+            self.backends.release(backend)
+            unavailable.append(backend)
+
+    def _record_completion(self, backend: AnalyzerBackend, kwargs: Dict, raw, elapsed: float):
+        """
+        Contabiliza uma chamada bem-sucedida e retorna a resposta já parseada
+        """
+        backend.rate_limiter.on_success(raw.headers)
+        backend.circuit_breaker.record_success()
+        backend.latency.observe(elapsed)
+        
+        response = raw.parse()
+        self.latency["llm"].observe(elapsed)
+        self._record_model_call(kwargs.get("model", ""), elapsed, response, kwargs.get("messages", []))
+        return response
+
+    def _budget_request(self, kwargs: Dict) -> Tuple[str, int, int]:
+        """
+        Modelo, tokens de prompt estimados e máximo de tokens de resposta de uma chamada
+        """
+        prompt_tokens = sum(estimate_tokens(message.get("content", "")) for message in kwargs.get("messages", []))
+        return kwargs.get("model", ""), prompt_tokens, kwargs.get("max_tokens", 0)
+
+    def _reserve_budget(self, kwargs: Dict) -> Optional[Dict]:
+        """
+        Reserva no orçamento o custo máximo da chamada, esperando as chamadas em andamento se preciso
+        
+        Raises:
+            BudgetExceededError se a chamada não cabe no que sobra do orçamento
+        """
+        if self.budget is None:
+            return None
+        return self.budget.wait_reserve(*self._budget_request(kwargs))
+
+    async def _reserve_budget_async(self, kwargs: Dict) -> Optional[Dict]:
+        """
+        Versão assíncrona de _reserve_budget
+        """
+        if self.budget is None:
+            return None
+        return await self.budget.reserve_async(*self._budget_request(kwargs))
+
+    def _create_completion(self, **kwargs):
+        """
+        Chamada síncrona ao modelo com balanceamento entre backends, rate limiting e retentativas
+        """
+        reservation = self._reserve_budget(kwargs)
+        try:
+            return self._completion_attempts(**kwargs)
+        finally:
+            if reservation is not None:
+                self.budget.release(reservation)
+
+    def _completion_attempts(self, **kwargs):
+        """
+        Tentativas de _create_completion (backend, rate limit e retentativas)
+        """
+        attempt = 0
+        while True:
+            backend = self._acquire_backend()
+            try:
+                backend.rate_limiter.acquire()
+                started = time.perf_counter()
+                raw = backend.client.chat.completions.with_raw_response.create(**backend.request_args(kwargs))
+                return self._record_completion(backend, kwargs, raw, time.perf_counter() - started)
+            except Exception as e:
+                error = e
+                delay = self._retry_delay(backend, e, attempt)
+                self._record_circuit_outcome(backend, e, final=delay is None)
+                if delay is None:
+                    raise
+            finally:
+                self.backends.release(backend)
             
-            return fallback_result
+            # A nova tentativa pode ir para outro backend
+            self.logger.warning(f"Tentativa {attempt + 1} em {backend.name} falhou ({error.__class__.__name__}), "
+                                f"nova tentativa em {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
 
-    def is_tech_keyword_present(self, text: str) -> bool:
+    async def _create_completion_async(self, **kwargs):
         """
-        Verifica se há palavras-chave técnicas no texto (fallback simples)
+        Chamada assíncrona ao modelo com os mesmos backends, rate limiters e retentativas
+        """
+        reservation = await self._reserve_budget_async(kwargs)
+        try:
+            return await self._completion_attempts_async(**kwargs)
+        finally:
+            if reservation is not None:
+                self.budget.release(reservation)
+
+    async def _completion_attempts_async(self, **kwargs):
+        """
+        Tentativas de _create_completion_async (backend, rate limit e retentativas)
+        """
+        attempt = 0
+        while True:
+            backend = await self._acquire_backend_async()
+            try:
+                await backend.rate_limiter.acquire_async()
+                started = time.perf_counter()
+                raw, backend_used = await self._hedged_create(backend, kwargs)
+                return self._record_completion(backend_used, kwargs, raw, time.perf_counter() - started)
+            except Exception as e:
+                error = e
+                delay = self._retry_delay(backend, e, attempt)
+                self._record_circuit_outcome(backend, e, final=delay is None)
+                if delay is None:
+                    raise
+            finally:
+                self.backends.release(backend)
+            
+            self.logger.warning(f"Tentativa {attempt + 1} em {backend.name} falhou ({error.__class__.__name__}), "
+                                f"nova tentativa em {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _hedge_delay(self, model: str) -> Optional[float]:
+        """
+        Segundos a esperar antes de duplicar uma chamada (p95 recente do modelo), ou None para não duplicar
+        """
+        if not self.hedge_requests:
+            return None
+        
+        stats = self.model_stats.get(model)
+        if stats is None or stats["latency"].count < self.hedge_min_samples:
+            return None
+        return stats["latency"].recent_percentile(95) / 1000.0
+
+    def _try_acquire_hedge_backend(self, backend: AnalyzerBackend) -> Optional[AnalyzerBackend]:
+        """
+        Reserva sem esperar um backend para a duplicata (outro de preferência), só se o circuito dele deixar passar
+        """
+        for exclude in ([backend], []):
+            candidate = self.backends.try_acquire(exclude=exclude)
+            if candidate is None:
+                continue
+            if candidate.circuit_breaker.allow_request():
+                return candidate
+            self.backends.release(candidate)
+        return None
+
+    async def _hedged_create(self, backend: AnalyzerBackend, kwargs: Dict) -> Tuple[object, AnalyzerBackend]:
+        """
+        Faz a chamada; se passar do p95 sem resposta (e houver cota), envia uma duplicata e usa a primeira que voltar
+        
+        A duplicata vai de preferência para outro backend com vaga e circuito liberado; sem nenhum, não há duplicata.
+        
+        Returns:
+            (resposta bruta, backend que respondeu)
         """
-        if not text:
-            return False
+        self.hedge_stats["requests"] += 1
+        delay = self._hedge_delay(kwargs.get("model", ""))
+        primary = asyncio.ensure_future(backend.async_client().chat.completions.with_raw_response.create(**backend.request_args(kwargs)))
+        tasks = {primary: backend}
+        hedge_backend = None
+        
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                within_cap = self.hedge_stats["hedged"] + 1 <= self.hedge_max_ratio * self.hedge_stats["requests"]
+                if not done and within_cap:
+                    hedge_backend = self._try_acquire_hedge_backend(backend)
+                if hedge_backend is not None:
+                    self.hedge_stats["hedged"] += 1
+                    await hedge_backend.rate_limiter.acquire_async()
+                    hedge = asyncio.ensure_future(
+                        hedge_backend.async_client().chat.completions.with_raw_response.create(**hedge_backend.request_args(kwargs))
+                    )
+                    tasks[hedge] = hedge_backend
             
-        text_lower = text.lower()
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_stats["wins"] += 1
+                        return task.result(), tasks[task]
+                    if task is primary:
+                        error = task.exception()
+                    else:
+                        # A falha da chamada original é contabilizada por quem chamou; a da duplicata em outro backend, aqui
+                        if tasks[task] is not backend:
+                            self._record_circuit_outcome(tasks[task], task.exception(), final=False)
+                        error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            if hedge_backend is not None:
+                self.backends.release(hedge_backend)
+
+    def analyze_user_immunity(self, username: str, display_name: str, description: str, location: str = "") -> Dict:
+        """
+        Analisa se um usuário deve ser imune ao unfollow baseado em seu perfil
         
-        tech_keywords = [
-            # Programming
-            'developer', 'engineer', 'programmer', 'coding', 'software',
-            'frontend', 'backend', 'fullstack', 'devops', 'sre',
+        Args:
+            username: Nome de usuário (@username)
+            display_name: Nome de exibição
+            description: Bio/descrição do perfil
+            location: Localização (opcional)
             
-            # Languages/Tech
-            'python', 'javascript', 'java', 'react', 'node', 'aws',
-            'kubernetes', 'docker', 'tensorflow', 'pytorch',
+        Returns:
+            Dict com category, immunity_status, confidence, reasoning
+        """
+        # Camadas locais e cache primeiro
+        local = self._resolve_locally(username, display_name, description, location)
+        if local is not None:
+            return local
+        
+        # Single-flight: se o mesmo perfil já está sendo analisado em outra thread, espera aquele resultado
+        fingerprint = ImmunityCache.fingerprint(username, display_name, description, location)
+        with self._inflight_lock:
+            flight = self._inflight_sync.get(fingerprint)
+            is_leader = flight is None
+            if is_leader:
+                flight = {"event": threading.Event(), "result": None}
+                self._inflight_sync[fingerprint] = flight
+        
+        if not is_leader:
+            self._record_tier("inflight")
+            flight["event"].wait()
+            return flight["result"] or self.analyze_user_immunity(username, display_name, description, location)
+        
+        try:
+            flight["result"] = self._analyze_with_model(username, display_name, description, location)
+            return flight["result"]
+        finally:
+            with self._inflight_lock:
+                self._inflight_sync.pop(fingerprint, None)
+            flight["event"].set()
+
+    def _analyze_with_model(self, username: str, display_name: str, description: str, location: str = "") -> Dict:
+        """
+        Chamada ao modelo para um único perfil (sem consultar cache ou camadas locais)
+        
+        Começa pelo modelo rápido e escala para o forte se a resposta for duvidosa ou a chamada falhar.
+        """
+        result, error = None, None
+        
+        for position, model in enumerate(self._model_route()):
+            try:
+                response = self._create_completion(
+                    model=model,
+                    messages=self._build_messages(username, display_name, description, location),
+                    max_tokens=self.response_format["max_tokens"],
+                    temperature=0.1
+                )
+                # Resposta malformada também escala para o próximo modelo (vale a resposta anterior, se houver)
+                parsed = self._parse_response(response.choices[0].message.content)
+            except (CircuitOpenError, BudgetExceededError) as e:
+                error = e
+                break
+            except Exception as e:
+                self._record_route(position)
+                error = e
+                continue
             
-            # Roles
-            'cto', 'vp engineering', 'tech lead', 'senior engineer',
-            'staff engineer', 'principal engineer',
+            self._record_route(position)
+            result = parsed
             
-            # AI/ML
-            'machine learning', 'artificial intelligence', 'data scientist',
-            'ml engineer', 'ai researcher', 'deep learning',
+            if not self._needs_escalation(result):
+                break
+        
+        # Se o modelo forte falhar, vale a resposta duvidosa do modelo rápido
+        if isinstance(error, BudgetExceededError) and result is None:
+            return self._deferred_result(error)
+        if isinstance(error, CircuitOpenError) and result is None:
+            return self._failover_result(username, display_name, description, location)
+        if result is None:
+            return self._error_result(username, error)
+        
+        self._record_tier("llm")
+        
+        # Cache do resultado
+        self._cache_set(username, display_name, description, location, result)
+        
+        return result
+
+    def _record_route(self, position: int, count: int = 1):
+        """
+        Conta perfis enviados ao primeiro modelo da rota e os escalados para os seguintes
+        """
+        if not self.fast_model:
+            return
+        self.routing_stats["routed" if position == 0 else "escalations"] += count
+
+    async def analyze_user_immunity_async(self, username: str, display_name: str, description: str,
+                                          location: str = "") -> Dict:
+        """
+        Versão assíncrona de analyze_user_immunity (mesmo cache, mesmos fallbacks e mesmo single-flight de iter_analyses)
+        """
+        local = self._resolve_locally(username, display_name, description, location)
+        if local is not None:
+            return local
+        
+        # Single-flight: se o mesmo perfil já está sendo analisado (aqui ou em iter_analyses), espera aquele resultado
+        fingerprint = ImmunityCache.fingerprint(username, display_name, description, location)
+        flight = self._inflight_async.get(fingerprint)
+        if flight is not None:
+            self._record_tier("inflight")
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+            # A análise original foi interrompida: analisar por conta própria
+            return await self.analyze_user_immunity_async(username, display_name, description, location)
+        
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight_async[fingerprint] = flight
+        try:
+            result = await self._analyze_with_model_async(username, display_name, description, location)
+            flight.set_result(result)
+            return result
+        finally:
+            if self._inflight_async.get(fingerprint) is flight:
+                del self._inflight_async[fingerprint]
+            if not flight.done():
+                flight.cancel()
+
+    async def _analyze_with_model_async(self, username: str, display_name: str, description: str,
+                                        location: str = "") -> Dict:
+        """
+        Versão assíncrona de _analyze_with_model (sem consultar cache ou camadas locais)
+        """
+        result, error = None, None
+        
+        for position, model in enumerate(self._model_route()):
+            try:
+                response = await self._create_completion_async(
+                    model=model,
+                    messages=self._build_messages(username, display_name, description, location),
+                    max_tokens=self.response_format["max_tokens"],
+                    temperature=0.1
+                )
+                parsed = self._parse_response(response.choices[0].message.content)
+            except (CircuitOpenError, BudgetExceededError) as e:
+                error = e
+                break
+            except Exception as e:
+                self._record_route(position)
+                error = e
+                continue
             
-            # Academic
-            'phd', 'professor', 'researcher', 'university', 'stanford',
-            'mit', 'berkeley', 'carnegie mellon',
+            self._record_route(position)
+            result = parsed
             
-            # Companies
-            'google', 'microsoft', 'apple', 'meta', 'amazon', 'netflix',
-            'uber', 'airbnb', 'stripe', 'openai', 'anthropic'
-        ]
+            if not self._needs_escalation(result):
+                break
+        
+        if isinstance(error, BudgetExceededError) and result is None:
+            return self._deferred_result(error)
+        if isinstance(error, CircuitOpenError) and result is None:
+            return self._failover_result(username, display_name, description, location)
+        if result is None:
+            return self._error_result(username, error)
         
-        return any(keyword in text_lower for keyword in tech_keywords)
+        self._record_tier("llm")
+        self._cache_set(username, display_name, description, location, result)
+        
+        return result
+
+    def analyze_batch(self, profiles: List[Dict]) -> List[Dict]:
+        """
+        Analisa vários perfis com uma requisição por lote de batch_size perfis
+        
+        Perfis ausentes ou inválidos na resposta são reanalisados individualmente.
+        
+        Args:
+            profiles: Lista de dicts com username, display_name, bio e location
+            
+        Returns:
+            Lista de resultados na mesma ordem de profiles
+        """
+        results: List[Optional[Dict]] = [None] * len(profiles)
+        pending = []
+        
+        for index, local in enumerate(self._resolve_many(profiles)):
+            if local is not None:
+                results[index] = local
+            else:
+                pending.append(index)
+        
+        for chunk in self._chunks(pending, self.batch_size):
+            chunk_profiles = [profiles[i] for i in chunk]
+            parsed = {}
+            
+            if len(chunk_profiles) > 1:
+                # Lote no modelo rápido; ausentes e respostas duvidosas seguem juntos para o modelo forte
+                to_send = chunk_profiles
+                for position, model in enumerate(self._model_route()):
+                    if not to_send:
+                        break
+                    try:
+                        response = self._create_completion(**self._batch_request_args(to_send, model))
+                        parsed.update(self._parse_batch_response(response.choices[0].message.content, to_send))
+                    except (CircuitOpenError, BudgetExceededError):
+                        break
+                    except Exception as e:
+                        self.logger.warning(f"Erro na análise em lote ({len(to_send)} perfis, {model}): {e}")
+                    self._record_route(position, len(to_send))
+                    to_send = self._profiles_to_escalate(to_send, parsed)
+            
+            for index in chunk:
+                profile = profiles[index]
+                result = parsed.get(profile['username'].lower())
+                
+                if result is None:
+                    # Fallback individual para entradas ausentes ou inválidas (já passaram pelas camadas locais)
+                    results[index] = self._analyze_with_model(*self._profile_fields(profile))
+                    continue
+                
+                self._record_tier("llm")
+                self._cache_set(*self._profile_fields(profile), result)
+                results[index] = result
+        
+        return results
+
+    async def analyze_batch_async(self, profiles: List[Dict]) -> List[Dict]:
+        """
+        Versão assíncrona de analyze_batch para um único lote (sem dividir em pedaços)
+        """
+        results: List[Optional[Dict]] = [None] * len(profiles)
+        pending = []
+        
+        for index, local in enumerate(self._resolve_many(profiles)):
+            if local is not None:
+                results[index] = local
+            else:
+                pending.append(index)
+        
+        for index, result in zip(pending, await self._analyze_batch_with_model_async([profiles[i] for i in pending])):
+            results[index] = result
+        
+        return results
+
+    async def _analyze_batch_with_model_async(self, profiles: List[Dict]) -> List[Dict]:
+        """
+        Chamada ao modelo para um lote de perfis que já passaram pelo cache e pelas camadas locais
+        """
+        results: List[Optional[Dict]] = [None] * len(profiles)
+        parsed = {}
+        
+        if len(profiles) > 1:
+            to_send = profiles
+            for position, model in enumerate(self._model_route()):
+                if not to_send:
+                    break
+                try:
+                    response = await self._create_completion_async(**self._batch_request_args(to_send, model))
+                    parsed.update(self._parse_batch_response(response.choices[0].message.content, to_send))
+                except (CircuitOpenError, BudgetExceededError):
+                    break
+                except Exception as e:
+                    self.logger.warning(f"Erro na análise em lote ({len(to_send)} perfis, {model}): {e}")
+                self._record_route(position, len(to_send))
+                to_send = self._profiles_to_escalate(to_send, parsed)
+        
+        for index, profile in enumerate(profiles):
+            result = parsed.get(profile['username'].lower())
+            
+            if result is None:
+                # Fallback individual para entradas ausentes ou inválidas
+                results[index] = await self._analyze_with_model_async(*self._profile_fields(profile))
+                continue
+            
+            self._record_tier("llm")
+            self._cache_set(*self._profile_fields(profile), result)
+            results[index] = result
+        
+        return results
+
+    async def iter_analyses(self, profiles: List[Dict], max_concurrency: Optional[int] = None) -> AsyncIterator[Tuple[int, Dict]]:
+        """
+        Analisa perfis concorrentemente, produzindo (índice, resultado) conforme terminam
+        
+        Com batch_size > 1 cada requisição leva um lote de perfis (ver analyze_batch).
+        
+        Args:
+            profiles: Lista de dicts com username, display_name, bio e location
+            max_concurrency: Limite de requisições em andamento (padrão: self.max_concurrency)
+        
+        Os clientes assíncronos ficam abertos (outras análises no mesmo loop podem estar usando);
+        quem criou o loop os fecha com backends.aclose() (ver analyze_users_concurrently).
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        
+        async def analyze_one(index: int) -> Dict:
+            try:
+                return await self._analyze_with_model_async(*self._profile_fields(profiles[index]))
+            except Exception as e:
+                return self._error_result(profiles[index]['username'], e)
+        
+        # Só recebe perfis que já passaram pelo cache e pelas camadas locais (uma consulta por perfil).
+        # Uma falha inesperada atinge só o perfil dela: o lote que falhar é refeito perfil a perfil.
+        async def run(indices: List[int]) -> List[Tuple[int, Dict]]:
+            async with semaphore:
+                if len(indices) > 1:
+                    try:
+                        return list(zip(indices, await self._analyze_batch_with_model_async([profiles[i] for i in indices])))
+                    except Exception as e:
+                        self.logger.warning(f"Erro inesperado no lote ({len(indices)} perfis), analisando um a um: {e}")
+                return [(index, await analyze_one(index)) for index in indices]
+        
+        # Decisões locais e do cache saem imediatamente e não ocupam lugar nos lotes
+        pending = []
+        for index, local in enumerate(self._resolve_many(profiles)):
+            if local is not None:
+                yield index, local
+            else:
+                pending.append(index)
+        
+        # Single-flight: perfis idênticos (nesta lista ou em outra análise em andamento)
+        # viram seguidores do primeiro e não geram requisição própria
+        loop = asyncio.get_running_loop()
+        leaders: Dict[str, int] = {}
+        followers: Dict[str, List[int]] = {}
+        fingerprints: Dict[int, str] = {}
+        external: List[Tuple[int, asyncio.Future]] = []
+        
+        # Bios quase idênticas dentro desta lista esperam a análise do primeiro perfil do grupo
+        run_index = BioSimilarityIndex(threshold=self.bio_index.threshold) if "similar" in self.cascade_tiers else None
+        similar_followers: Dict[int, List[Tuple[int, float]]] = {}
+        
+        for index in pending:
+            fingerprint = ImmunityCache.fingerprint(*self._profile_fields(profiles[index]))
+            bio = profiles[index].get('bio', '')
+            similar = run_index.query(bio) if run_index is not None and fingerprint not in leaders else None
+            if fingerprint in leaders:
+                followers[fingerprint].append(index)
+                self._record_tier("inflight")
+            elif similar is not None:
+                similarity, representative = similar
+                similar_followers[representative].append((index, similarity))
+            elif fingerprint in self._inflight_async:
+                external.append((index, self._inflight_async[fingerprint]))
+                self._record_tier("inflight")
+            else:
+                leaders[fingerprint] = index
+                followers[fingerprint] = []
+                fingerprints[index] = fingerprint
+                self._inflight_async[fingerprint] = loop.create_future()
+                if run_index is not None and run_index.add(bio, index):
+                    similar_followers[index] = []
+        
+        async def wait_external(index: int, future: asyncio.Future) -> List[Tuple[int, Dict]]:
+            try:
+                return [(index, await asyncio.shield(future))]
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            # A análise original foi interrompida: analisar por conta própria
+            return await run([index])
+        
+        chunks = self._chunks(list(leaders.values()), self.batch_size)
+        tasks = [asyncio.ensure_future(run(chunk)) for chunk in chunks]
+        tasks += [asyncio.ensure_future(wait_external(index, future)) for index, future in external]
+        # Perfis do grupo cujo representante falhou são analisados por conta própria no final
+        orphans: List[int] = []
+        try:
+            for finished in asyncio.as_completed(tasks):
+                for index, result in await finished:
+                    yield index, result
+                    
+                    fingerprint = fingerprints.get(index)
+                    if fingerprint is None:
+                        continue
+                    future = self._inflight_async.pop(fingerprint, None)
+                    if future is not None and not future.done():
+                        future.set_result(result)
+                    for follower in followers[fingerprint]:
+                        yield follower, result
+                    
+                    for similar_index, similarity in similar_followers.get(index, []):
+                        if result.get("tier") in UNRELIABLE_TIERS:
+                            orphans.append(similar_index)
+                            continue
+                        self._record_tier("similar")
+                        yield similar_index, self._reuse_result(result, profiles[index]['username'], similarity)
+            
+            if orphans:
+                tasks = [asyncio.ensure_future(run(chunk)) for chunk in self._chunks(orphans, self.batch_size)]
+                for finished in asyncio.as_completed(tasks):
+                    for index, result in await finished:
+                        yield index, result
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Liberar seguidores externos de análises que não terminaram
+            for fingerprint in leaders:
+                future = self._inflight_async.pop(fingerprint, None)
+                if future is not None and not future.done():
+                    future.cancel()
+
+    def analyze_users_concurrently(self, profiles: List[Dict], max_concurrency: Optional[int] = None,
+                                   on_result: Optional[Callable[[int, Dict, Dict], None]] = None) -> List[Dict]:
+        """
+        Analisa uma lista de perfis em paralelo e devolve os resultados na ordem de entrada
+        
+        Cada chamada é uma execução do orçamento (se nenhuma estiver aberta); perfis que ficaram sem
+        orçamento (categoria DEFERRED) entram na fila do próximo ciclo (ver prioritize_deferred).
+        
+        Args:
+            profiles: Lista de dicts com username, display_name, bio e location
+            max_concurrency: Limite de requisições em andamento
+            on_result: Callback chamado com (índice, perfil, resultado) assim que cada análise termina
+        """
+        results: List[Optional[Dict]] = [None] * len(profiles)
+        
+        async def collect():
+            try:
+                async for index, result in self.iter_analyses(profiles, max_concurrency):
+                    results[index] = result
+                    if on_result:
+                        on_result(index, profiles[index], result)
+            finally:
+                # O loop é deste método: ninguém mais usa os clientes assíncronos dele
+                await self.backends.aclose()
+        
+        if profiles:
+            started = time.perf_counter()
+            # Quem chama pode abrir uma execução maior (ex: vários lotes) com budget.start_run()
+            owns_run = self.budget is not None and self.budget.run_started is None
+            if owns_run:
+                self.budget.start_run()
+            try:
+                asyncio.run(collect())
+            finally:
+                self.analysis_seconds += time.perf_counter() - started
+                if self.budget is not None:
+                    self._settle_deferred(profiles, results)
+                if owns_run:
+                    self.budget.finish_run()
+        
+        return results
+
+    def _settle_deferred(self, profiles: List[Dict], results: List[Optional[Dict]]):
+        """
+        Atualiza a fila de adiados: entram os perfis sem orçamento, saem os que foram analisados
+        """
+        deferred = [profile['username'] for profile, result in zip(profiles, results)
+                    if result is None or result.get("category") == "DEFERRED"]
+        analyzed = [profile['username'] for profile, result in zip(profiles, results)
+                    if result is not None and result.get("category") != "DEFERRED"]
+        
+        self.budget.resolve(analyzed)
+        if deferred:
+            self.budget.defer(deferred)
+            self.logger.warning(f"💸 Orçamento esgotado: {len(deferred)} perfis adiados para o próximo ciclo "
+                                f"({len(self.budget.deferred)} na fila)")
+
+    def prioritize_deferred(self, items: List, key: Callable = lambda profile: profile['username']) -> List:
+        """
+        Reordena a lista pondo à frente os perfis adiados em ciclos anteriores (na ordem em que foram adiados)
+        
+        Só perfis presentes em items são considerados: quem saiu da lista (ex: voltou a seguir) não é analisado.
+        
+        Args:
+            items: Perfis (ou usernames, com key=lambda u: u)
+            key: Extrai o username de cada item
+        """
+        if self.budget is None or not self.budget.deferred:
+            return items
+        
+        rank = {username: position for position, username in enumerate(self.budget.pending())}
+        carried = sorted((item for item in items if key(item).lower() in rank), key=lambda item: rank[key(item).lower()])
+        if carried:
+            self.logger.info(f"📥 {len(carried)} perfis adiados em ciclos anteriores entram primeiro na análise")
+        return carried + [item for item in items if key(item).lower() not in rank]
+
+    def get_budget_stats(self) -> Optional[Dict]:
+        """
+        Consumo do orçamento na execução e no dia (None sem orçamento configurado)
+        """
+        return self.budget.get_stats() if self.budget is not None else None
+
+    def log_budget_stats(self):
+        """
+        Registra no log o consumo do orçamento
+        """
+        stats = self.get_budget_stats()
+        if stats is None:
+            return
+        for scope, label in (("run", "execução"), ("day", "dia")):
+            usage = stats[scope]
+            self.logger.info(f"💸 Orçamento ({label}): {usage['tokens']:.0f} tokens, US$ {usage['dollars']:.4f}, "
+                             f"{usage['seconds']:.1f}s")
+        if stats["deferred"]:
+            self.logger.info(f"📥 {stats['deferred']} perfis aguardando o próximo ciclo")
+
+    def is_tech_keyword_present(self, text: str) -> bool:
+        """
+        Verifica se há palavras-chave técnicas no texto (fallback simples)
+        """
+        return self.tech_matcher.search(text)
+
+    def find_tech_keywords(self, text: str) -> List[str]:
+        """
+        Retorna as palavras-chave técnicas encontradas no texto
+        """
+        return self.tech_matcher.find_all(text)
+
+    def has_strong_tech_signal(self, text: str) -> bool:
+        """
+        Verifica se há palavras-chave técnicas fortes o bastante para decidir sem a IA
+        """
+        return self.strong_tech_matcher.search(text)
 
     def analyze_simple_immunity(self, username: str, display_name: str, description: str) -> Dict:
         """
         Análise simples baseada em palavras-chave (fallback quando IA não funciona)
         """
-        full_text = f"{display_name} {description}".lower()
+        hits = self.find_tech_keywords(f"{display_name} {description}")
         
-        if self.is_tech_keyword_present(full_text):
+        if hits:
             return {
                 "category": "TECH_RELATED",
                 "immunity_status": "immune",
                 "confidence": 0.7,
-                "reasoning": "Palavras-chave técnicas detectadas"
+                "reasoning": f"Palavras-chave técnicas detectadas: {', '.join(hits)}"
             }
         else:
             return {
@@ -205,6 +1568,64 @@ Seja CONSERVADOR - em caso de dúvida, marque como IMUNE.
                 "reasoning": "Nenhuma palavra-chave técnica detectada"
             }
 
+    def explain(self, username: str, display_name: Optional[str] = None, description: Optional[str] = None,
+                location: str = "", result: Optional[Dict] = None) -> str:
+        """
+        Busca sob demanda a explicação (reasoning) de uma análise feita no modo compacto
+        
+        A explicação fica gravada no cache junto com o resultado, então cada perfil é explicado uma vez só.
+        
+        Args:
+            username: Nome de usuário (@username)
+            display_name / description / location: Dados do perfil; opcionais se o perfil foi analisado nesta sessão
+            result: Análise já feita (padrão: a do cache, ou uma análise nova)
+        """
+        if description is None and display_name is None:
+            fields = self._seen_profiles.get(username.lstrip('@').lower())
+            if fields is None:
+                raise KeyError(f"@{username} não foi analisado nesta sessão; informe os dados do perfil")
+        else:
+            fields = (username, display_name or username, description or "", location or "")
+        
+        if result is None:
+            result = self._cache_get(*fields) or self.analyze_user_immunity(*fields)
+        if result.get("reasoning"):
+            return result["reasoning"]
+        
+        try:
+            response = self._create_completion(
+                model=self.strong_model,
+                messages=self.prompt_builder.explain_messages(result, *fields),
+                max_tokens=150,
+                temperature=0.1
+            )
+        except Exception as e:
+            self.logger.warning(f"Não foi possível explicar a análise de @{username}: {e}")
+            return ""
+        
+        reasoning = (response.choices[0].message.content or "").strip()
+        if reasoning:
+            self._cache_set(*fields, {**result, "reasoning": reasoning})
+        return reasoning
+
+    def explain_rows(self, rows: List[Dict], confidence_below: float) -> int:
+        """
+        Preenche o reasoning vazio (modo compacto) das linhas de análise com confiança abaixo de confidence_below
+        
+        Returns:
+            Quantas linhas foram explicadas
+        """
+        explained = 0
+        for row in rows:
+            if row.get('reasoning') or float(row.get('confidence', 1.0)) >= confidence_below:
+                continue
+            
+            result = {key: row.get(key) for key in REQUIRED_FIELDS}
+            row['reasoning'] = self.explain(row['username'], row.get('display_name') or '', row.get('bio') or '',
+                                            row.get('location') or '', result=result)
+            explained += 1
+        return explained
+
     def clear_cache(self):
         """
         Limpa o cache de análises
@@ -214,9 +1635,26 @@ Seja CONSERVADOR - em caso de dúvida, marque como IMUNE.
 
     def get_cache_stats(self) -> Dict:
         """
-        Retorna estatísticas do cache
+        Retorna estatísticas do cache (contadores e latências, sem listar as entradas)
         """
+        cache_stats = self.immunity_cache.get_stats()
         return {
-            "cache_size": len(self.immunity_cache),
-            "cached_users": list(self.immunity_cache.keys())
+            "cache_size": cache_stats["size"],
+            "hits": cache_stats["hits"],
+            "misses": cache_stats["misses"],
+            "hit_rate": cache_stats["hit_rate"],
+            "evictions": cache_stats["evictions"],
+            "expired": cache_stats["expired"],
+            "latency_ms": {name: histogram.summary() for name, histogram in self.latency.items()}
         }
+
+    def log_cache_stats(self):
+        """
+        Registra no log um resumo do cache e das latências
+        """
+        stats = self.get_cache_stats()
+        self.logger.info(f"💾 Cache: {stats['hits']} acertos / {stats['misses']} falhas "
+                         f"({stats['hit_rate']:.0%}), {stats['cache_size']} entradas, "
+                         f"{stats['evictions']} removidas por LRU, {stats['expired']} expiradas")
+        self.logger.info(f"⏱️ Latência cache: {self.latency['cache_hit']}")
+        self.logger.info(f"⏱️ Latência IA: {self.latency['llm']}")
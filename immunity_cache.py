@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Cache persistente (SQLite) das análises de imunidade
+Evita pagar a IA de novo pelos mesmos perfis entre ciclos
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+class ImmunityCache:
+    def __init__(self, path: str = "immunity_cache.db", version: str = "", ttl_seconds: float = 30 * 24 * 3600,
+                 max_entries: int = 50000):
+        """
+        Abre (ou cria) o cache de análises em um único arquivo SQLite
+
+        Args:
+            path: Caminho do arquivo do banco (":memory:" para cache só em memória)
+            version: Versão do modelo/prompt; entradas de outra versão são descartadas
+            ttl_seconds: Tempo de vida de cada entrada
+            max_entries: Tamanho máximo antes de remover as entradas menos usadas (LRU)
+        """
+        self.path = path
+        self.version = version
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+
+        # Contadores em memória (baratos de consultar, sem varrer o banco)
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0}
+
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS immunity_cache (
+                fingerprint TEXT PRIMARY KEY,
+                username TEXT NOT NULL,
+                version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_immunity_cache_access ON immunity_cache (last_access)")
+
+        self.purge_expired()
+        self._evict_if_needed()
+
+    @staticmethod
+    def fingerprint(username: str, display_name: str, description: str, location: str = "") -> str:
+        """
+        Gera a chave do cache a partir dos campos do perfil que influenciam a análise
+        """
+        parts = [username or "", display_name or "", description or "", location or ""]
+        normalized = "\x1f".join(" ".join(part.split()).lower() for part in parts)
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        """
+        Retorna o resultado em cache ou None se ausente, expirado ou de outra versão
+        """
+        now = time.time()
+
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT version, result, created_at FROM immunity_cache WHERE fingerprint = ?",
+                (fingerprint,)
+            ).fetchone()
+
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            version, result, created_at = row
+            if version != self.version or now - created_at > self.ttl_seconds:
+                self.conn.execute("DELETE FROM immunity_cache WHERE fingerprint = ?", (fingerprint,))
+                self.stats["misses"] += 1
+                self.stats["expired"] += 1
+                return None
+
+            self.conn.execute("UPDATE immunity_cache SET last_access = ? WHERE fingerprint = ?", (now, fingerprint))
+            self.stats["hits"] += 1
+
+        return json.loads(result)
+
+    def set(self, fingerprint: str, username: str, result: Dict):
+        """
+        Grava (ou substitui) o resultado de um perfil
+        """
+        now = time.time()
+
+        try:
+            with self._lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO immunity_cache "
+                    "(fingerprint, username, version, result, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                    (fingerprint, username, self.version, json.dumps(result, ensure_ascii=False), now, now)
+                )
+                self._writes_since_evict += 1
+                self.stats["writes"] += 1
+
+            if self._writes_since_evict >= 100:
+                self._evict_if_needed()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Erro ao gravar cache de @{username}: {e}")
+
+    def purge_expired(self) -> int:
+        """
+        Remove entradas expiradas ou de outra versão
+        """
+        with self._lock:
+            cursor = self.conn.execute(
+                "DELETE FROM immunity_cache WHERE version != ? OR created_at < ?",
+                (self.version, time.time() - self.ttl_seconds)
+            )
+            self.stats["expired"] += max(0, cursor.rowcount)
+        return cursor.rowcount
+
+    def _evict_if_needed(self) -> int:
+        """
+        Remove as entradas acessadas há mais tempo quando o cache passa de max_entries
+        """
+        with self._lock:
+            self._writes_since_evict = 0
+            size = self.conn.execute("SELECT COUNT(*) FROM immunity_cache").fetchone()[0]
+            excess = size - self.max_entries
+            if excess <= 0:
+                return 0
+
+            self.conn.execute(
+                "DELETE FROM immunity_cache WHERE fingerprint IN "
+                "(SELECT fingerprint FROM immunity_cache ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+            self.stats["evictions"] += excess
+
+        self.logger.info(f"Cache de análises: {excess} entradas antigas removidas")
+        return excess
+
+    def get_stats(self) -> Dict:
+        """
+        Contadores de acertos, falhas, remoções por LRU e expirações, mais o tamanho atual
+        """
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0
+        }
+
+    def usernames(self) -> List[str]:
+        """
+        Lista os usernames presentes no cache
+        """
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT username FROM immunity_cache")]
+
+    def clear(self):
+        """
+        Remove todas as entradas
+        """
+        with self._lock:
+            self.conn.execute("DELETE FROM immunity_cache")
+
+    def close(self):
+        """
+        Fecha a conexão com o banco
+        """
+        with self._lock:
+            self.conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM immunity_cache").fetchone()[0]
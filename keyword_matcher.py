@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Matcher de palavras-chave compilado uma única vez (uma regex em forma de trie com limites de palavra)
+"""
+
+import os
+import re
+from typing import Iterable, List
+
+TECH_KEYWORDS = [
+    # Programming
+    'developer', 'engineer', 'programmer', 'coding', 'software',
+    'frontend', 'backend', 'fullstack', 'devops', 'sre',
+    
+    # Languages/Tech
+    'python', 'javascript', 'java', 'react', 'node', 'aws',
+    'kubernetes', 'docker', 'tensorflow', 'pytorch',
+    
+    # Roles
+    'cto', 'vp engineering', 'tech lead', 'senior engineer',
+    'staff engineer', 'principal engineer',
+    
+    # AI/ML
+    'machine learning', 'artificial intelligence', 'data scientist',
+    'ml engineer', 'ai researcher', 'deep learning',
+    
+    # Academic
+    'phd', 'professor', 'researcher', 'university', 'stanford',
+    'mit', 'berkeley', 'carnegie mellon',
+    
+    # Companies
+    'google', 'microsoft', 'apple', 'meta', 'amazon', 'netflix',
+    'uber', 'airbnb', 'stripe', 'openai', 'anthropic'
+]
+
+# Termos que sozinhos já indicam perfil tech (decididos sem chamar a IA)
+STRONG_TECH_KEYWORDS = [
+    'software engineer', 'software developer', 'developer', 'programmer',
+    'frontend', 'backend', 'fullstack', 'full stack', 'devops',
+    'machine learning', 'data scientist', 'ml engineer', 'ai researcher',
+    'deep learning', 'phd', 'professor', 'cto', 'tech lead',
+    'staff engineer', 'principal engineer', 'senior engineer'
+]
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Compila a lista de palavras-chave em uma única regex
+
+        Args:
+            keywords: Termos a procurar (multi-palavra permitido, ex: "machine learning")
+        """
+        normalized = {" ".join(keyword.lower().split()) for keyword in keywords if keyword and keyword.strip()}
+        self.keywords = sorted(normalized)
+
+        if self.keywords:
+            # Alternância fatorada como trie ("data scientist|data engineer" -> "data\s+(?:scientist|engineer)"),
+            # o que evita testar cada termo em cada posição do texto. O texto é minusculizado antes da busca,
+            # que sai mais barato que re.IGNORECASE.
+            # (?<!\w) / (?!\w) em vez de \b para aceitar termos como "c++" ou ".net"
+            self.pattern = re.compile(rf"(?<!\w)(?:{self._trie_pattern(self.keywords)})(?!\w)")
+        else:
+            self.pattern = None
+
+    @staticmethod
+    def _trie_pattern(keywords: List[str]) -> str:
+        """
+        Monta a regex de alternância a partir de uma trie de caracteres
+        """
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        def build(node: dict) -> str:
+            branches = [
+                (r"\s+" if char == ' ' else re.escape(char)) + build(child)
+                for char, child in sorted(node.items())
+                if char != ''
+            ]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            # Termo que termina aqui mas também é prefixo de outro: o resto é opcional (guloso, o mais longo ganha)
+            return f"(?:{body})?" if '' in node else body
+
+        return build(trie)
+
+    @classmethod
+    def from_file(cls, path: str, base_keywords: Iterable[str] = ()) -> "KeywordMatcher":
+        """
+        Cria o matcher com base_keywords mais os termos de um arquivo (um por linha, # para comentários)
+        """
+        return cls(list(base_keywords) + load_keyword_file(path))
+
+    def search(self, text: str) -> bool:
+        """
+        True se algum termo aparece no texto
+        """
+        if not text or self.pattern is None:
+            return False
+        return self.pattern.search(text.lower()) is not None
+
+    def find_all(self, text: str) -> List[str]:
+        """
+        Termos encontrados no texto, sem repetição e na ordem em que aparecem
+        """
+        if not text or self.pattern is None:
+            return []
+
+        hits = []
+        for match in self.pattern.finditer(text.lower()):
+            keyword = " ".join(match.group(0).split())
+            if keyword not in hits:
+                hits.append(keyword)
+        return hits
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+def load_keyword_file(path: str) -> List[str]:
+    """
+    Lê termos de um arquivo texto (um por linha); retorna lista vazia se o arquivo não existir
+    """
+    if not path or not os.path.exists(path):
+        return []
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
@@ -7,6 +7,7 @@ Não requer API do Twitter - funciona apenas com navegador
 import os
 import sys
 from dotenv import load_dotenv
+from immunity_analyzer import DEFAULT_EXPLAIN_BELOW
 from twitter_selenium_only import TwitterSeleniumUnfollower
 
 def choose_browser():
@@ -157,7 +158,10 @@ def main():
         unfollower = TwitterSeleniumUnfollower(
             openrouter_api_key=openrouter_key,
             headless=params['headless'],
-            browser=browser
+            browser=browser,
+            profile_workers=int(os.getenv('PROFILE_WORKERS', '1')),
+            max_profiles_per_minute=float(os.getenv('MAX_PROFILES_PER_MINUTE', '30')),
+            explain_below=float(os.getenv('EXPLAIN_BELOW') or DEFAULT_EXPLAIN_BELOW)
         )
         
         # Executar processo completo
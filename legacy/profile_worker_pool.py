@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Pool de navegadores headless para extrair perfis em paralelo
+Cada worker é um Chrome próprio com os cookies da sessão logada (o diretório de perfil do navegador não pode
+ser aberto por vários processos ao mesmo tempo), alimentado por uma fila de usernames com ritmo por worker
+e um teto global de perfis por minuto
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from rate_limiter import AdaptiveRateLimiter
+from twitter_selenium import TwitterSeleniumScraper
+
+# Campos aceitos por add_cookie (get_cookies devolve outros que o Chrome recusa em alguns casos)
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "expiry")
+
+class ProfileWorkerPool:
+    def __init__(self, cookies: List[Dict], size: int = 3, min_interval: float = 2.0,
+                 max_profiles_per_minute: float = 30.0, browser: str = "chrome"):
+        """
+        Prepara o pool (os navegadores só abrem em start)
+
+        Args:
+            cookies: Cookies da sessão logada (driver.get_cookies() do navegador principal)
+            size: Número de navegadores
+            min_interval: Intervalo mínimo (segundos) entre dois perfis abertos pelo mesmo worker
+            max_profiles_per_minute: Teto de perfis por minuto somando todos os workers
+            browser: "chrome" ou "brave"
+        """
+        self.cookies = [{k: v for k, v in cookie.items() if k in COOKIE_FIELDS} for cookie in cookies]
+        self.size = max(1, size)
+        self.min_interval = min_interval
+        self.max_profiles_per_minute = max_profiles_per_minute
+        self.browser = browser
+
+        self.workers: List[TwitterSeleniumScraper] = []
+        rate = max_profiles_per_minute / 60
+        self.rate_limiter = AdaptiveRateLimiter(rate=rate, burst=1, min_rate=rate, max_rate=rate)
+
+        self.stats = {"profiles": 0, "errors": 0, "seconds": 0.0, "per_worker": []}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def _start_worker(self, index: int, started: List[Optional[TwitterSeleniumScraper]]):
+        scraper = TwitterSeleniumScraper(headless=True, use_existing_profile=False, browser=self.browser)
+        try:
+            if scraper.setup_driver():
+                # Cookies só podem ser definidos estando no domínio
+                scraper.driver.get("https://x.com/robots.txt")
+                for cookie in self.cookies:
+                    try:
+                        scraper.driver.add_cookie(cookie)
+                    except Exception as e:
+                        self.logger.debug(f"Cookie {cookie.get('name')} recusado pelo worker {index}: {e}")
+                started[index] = scraper
+                return
+            self.logger.warning(f"⚠️ Worker {index} não iniciou")
+        except Exception as e:
+            self.logger.warning(f"⚠️ Worker {index} não iniciou: {e}")
+
+        # O navegador pode ter aberto antes da falha
+        try:
+            scraper.close()
+        except Exception:
+            pass
+
+    def start(self) -> int:
+        """
+        Abre os navegadores em paralelo
+
+        Returns:
+            Quantos workers ficaram prontos (0 = usar o navegador principal)
+        """
+        started: List[Optional[TwitterSeleniumScraper]] = [None] * self.size
+        threads = [threading.Thread(target=self._start_worker, args=(index, started), daemon=True)
+                   for index in range(self.size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.workers = [scraper for scraper in started if scraper is not None]
+        self.stats["per_worker"] = [0] * len(self.workers)
+        self.logger.info(f"🧵 {len(self.workers)}/{self.size} navegadores prontos para extrair perfis "
+                         f"(teto de {self.max_profiles_per_minute:g} perfis/min)")
+        return len(self.workers)
+
+    def _run_worker(self, index: int, work: "queue.Queue", results: List[Optional[Dict]],
+                    extract: Callable, on_done: Optional[Callable]):
+        driver = self.workers[index].driver
+        last_started = 0.0
+
+        while True:
+            try:
+                position, username = work.get_nowait()
+            except queue.Empty:
+                return
+
+            # Ritmo por worker + teto global
+            wait = self.min_interval - (time.monotonic() - last_started)
+            if wait > 0:
+                time.sleep(wait)
+            self.rate_limiter.acquire()
+            last_started = time.monotonic()
+
+            try:
+                results[position] = extract(username, driver)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Worker {index} falhou em @{username}: {e}")
+                with self._lock:
+                    self.stats["errors"] += 1
+                results[position] = {'username': username, 'display_name': '', 'bio': '', 'location': '',
+                                     'verified': False}
+
+            with self._lock:
+                self.stats["profiles"] += 1
+                self.stats["per_worker"][index] += 1
+            if on_done:
+                on_done(position, username)
+
+    def extract(self, usernames: List[str], extract: Callable[[str, object], Dict],
+                on_done: Optional[Callable[[int, str], None]] = None) -> List[Dict]:
+        """
+        Extrai os perfis distribuindo a fila entre os workers
+
+        Args:
+            usernames: Perfis a extrair
+            extract: Função (username, driver) -> dados do perfil
+            on_done: Chamada (posição, username) ao terminar cada perfil (progresso)
+
+        Returns:
+            Dados dos perfis, na mesma ordem de usernames
+        """
+        if not self.workers:
+            raise RuntimeError("Pool sem navegadores (ver start)")
+
+        work: "queue.Queue" = queue.Queue()
+        for item in enumerate(usernames):
+            work.put(item)
+        results: List[Optional[Dict]] = [None] * len(usernames)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self._run_worker, args=(index, work, results, extract, on_done), daemon=True)
+                   for index in range(len(self.workers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stats["seconds"] += time.perf_counter() - started
+
+        return results
+
+    def close(self):
+        """
+        Fecha todos os navegadores do pool
+        """
+        for scraper in self.workers:
+            try:
+                scraper.close()
+            except Exception:
+                pass
+        self.workers = []
+
+    def log_stats(self):
+        """
+        Registra no log a vazão da extração
+        """
+        seconds = self.stats["seconds"]
+        per_minute = self.stats["profiles"] / seconds * 60 if seconds else 0.0
+        self.logger.info(f"🧵 Extração paralela: {self.stats['profiles']} perfis em {seconds:.1f}s "
+                         f"({per_minute:.1f}/min), {self.stats['errors']} erros, por worker: {self.stats['per_worker']}")
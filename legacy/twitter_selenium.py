@@ -5,7 +5,7 @@ Automação do Twitter/X usando Selenium para contornar limitações da API
 
 import time
 import logging
-from typing import Set, Dict
+from typing import Set, Dict, List, Optional
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -14,9 +14,13 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
+from scroll_engine import AdaptiveScroller
+from graph_capture import GraphQLCapture, enable_network_capture
+from profile_counts import ProfileCounter, parse_count
 
 class TwitterSeleniumScraper:
-    def __init__(self, headless: bool = False, use_existing_profile: bool = True, browser: str = "chrome"):
+    def __init__(self, headless: bool = False, use_existing_profile: bool = True, browser: str = "chrome",
+                 network_capture: bool = False):
         """
         Inicializa o scraper do Twitter usando Selenium
 
@@ -24,11 +28,13 @@ class TwitterSeleniumScraper:
             headless: Se True, executa o navegador em modo headless (sem interface)
             use_existing_profile: Se True, usa o perfil existente do navegador (já logado)
             browser: "chrome" ou "brave"
+            network_capture: Se True, lê as listas das respostas GraphQL (DevTools) em vez das células do DOM
         """
         self.driver = None
         self.headless = headless
         self.use_existing_profile = use_existing_profile
         self.browser = browser.lower()
+        self.network_capture = network_capture
         self.logged_in = False
         self.username = None
 
@@ -87,6 +93,10 @@ class TwitterSeleniumScraper:
             }
             options.add_experimental_option("prefs", prefs)
 
+            # Eventos de rede do DevTools para a captura das respostas GraphQL
+            if self.network_capture:
+                enable_network_capture(options)
+
             # Usar webdriver-manager para baixar automaticamente o driver
             if self.browser == "brave":
                 # Para Brave, usar ChromeDriver (compatível)
@@ -219,24 +229,26 @@ class TwitterSeleniumScraper:
             self.logger.error(f"❌ Erro ao obter contagem de followers: {e}")
             return 0
     
+    def get_profile_counts(self) -> Dict[str, Optional[int]]:
+        """
+        Lê as contagens de following e followers do perfil com um único carregamento de página
+
+        Returns:
+            {'following': n, 'followers': n}; None para contagens ilegíveis ou abreviadas ("1.2K"),
+            que não servem para detectar mudanças pequenas
+        """
+        counter = ProfileCounter(self.driver, self.username)
+        counts = counter.read()
+        self.username = counter.username or self.username
+        return counts
+
     def _parse_count(self, count_text: str) -> int:
         """
-        Converte texto de contagem (ex: "1.2K", "1,234") para número inteiro
+        Converte texto de contagem (ex: "1.2K", "1,2 mil", "1,234") para número inteiro
         """
-        try:
-            count_text = count_text.replace(",", "").replace(".", "")
-            
-            if "K" in count_text:
-                return int(float(count_text.replace("K", "")) * 1000)
-            elif "M" in count_text:
-                return int(float(count_text.replace("M", "")) * 1000000)
-            else:
-                return int(count_text)
-                
-        except:
-            return 0
+        return parse_count(count_text)
     
-    def get_following_list(self, max_users: int = 6000) -> Set[Dict]:
+    def get_following_list(self, max_users: int = 6000) -> List[Dict]:
         """
         Obtém lista de usuários que você segue
 
@@ -244,65 +256,27 @@ class TwitterSeleniumScraper:
             max_users: Número máximo de usuários para coletar
 
         Returns:
-            Set com dicionários contendo user_id, username, display_name
+            Lista de dicionários contendo user_id, username, display_name
         """
-        following_users = set()
+        following_users = {}
 
         try:
             self.logger.info(f"📋 Coletando lista de usuários que você segue (máx: {max_users})...")
 
             # Navegar para página de following
             self.driver.get(f"https://x.com/{self.username}/following")
-            time.sleep(5)
+            self._wait_for_user_cells()
 
-            # Scroll e coleta de usuários
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            collected_count = 0
-
-            while collected_count < max_users:
-                # Encontrar todos os elementos de usuário na página atual
-                user_elements = self.driver.find_elements(
-                    By.CSS_SELECTOR,
-                    '[data-testid="UserCell"]'
-                )
-
-                for element in user_elements:
-                    if collected_count >= max_users:
-                        break
-
-                    try:
-                        # Extrair informações do usuário
-                        user_info = self._extract_user_info(element)
-                        if user_info and user_info not in following_users:
-                            following_users.add(user_info)
-                            collected_count += 1
-
-                            if collected_count % 50 == 0:
-                                self.logger.info(f"   Coletados {collected_count} usuários...")
-
-                    except Exception as e:
-                        self.logger.debug(f"Erro ao extrair usuário: {e}")
-                        continue
-
-                # Scroll para carregar mais usuários
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-
-                # Verificar se carregou mais conteúdo
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    self.logger.info("📄 Fim da lista alcançado")
-                    break
-                last_height = new_height
+            self._scroll_and_collect(following_users, max_users, "usuários")
 
             self.logger.info(f"✅ Coletados {len(following_users)} usuários que você segue")
-            return following_users
+            return list(following_users.values())
 
         except Exception as e:
             self.logger.error(f"❌ Erro ao coletar lista de following: {e}")
-            return following_users
+            return list(following_users.values())
 
-    def get_followers_list(self, max_users: int = 1000) -> Set[Dict]:
+    def get_followers_list(self, max_users: int = 1000) -> List[Dict]:
         """
         Obtém lista de usuários que te seguem
 
@@ -310,68 +284,108 @@ class TwitterSeleniumScraper:
             max_users: Número máximo de usuários para coletar
 
         Returns:
-            Set com dicionários contendo user_id, username, display_name
+            Lista de dicionários contendo user_id, username, display_name
         """
-        followers_users = set()
+        followers_users = {}
 
         try:
             self.logger.info(f"📋 Coletando lista de seus seguidores (máx: {max_users})...")
 
             # Navegar para página de followers
             self.driver.get(f"https://x.com/{self.username}/verified_followers")
-            time.sleep(5)
+            self._wait_for_user_cells()
 
             # Se não conseguir acessar verified_followers, tentar followers normal
             if "verified_followers" not in self.driver.current_url:
                 self.driver.get(f"https://x.com/{self.username}/followers")
-                time.sleep(5)
-
-            # Scroll e coleta de usuários
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            collected_count = 0
-
-            while collected_count < max_users:
-                # Encontrar todos os elementos de usuário na página atual
-                user_elements = self.driver.find_elements(
-                    By.CSS_SELECTOR,
-                    '[data-testid="UserCell"]'
-                )
-
-                for element in user_elements:
-                    if collected_count >= max_users:
-                        break
-
-                    try:
-                        # Extrair informações do usuário
-                        user_info = self._extract_user_info(element)
-                        if user_info and user_info not in followers_users:
-                            followers_users.add(user_info)
-                            collected_count += 1
-
-                            if collected_count % 50 == 0:
-                                self.logger.info(f"   Coletados {collected_count} seguidores...")
-
-                    except Exception as e:
-                        self.logger.debug(f"Erro ao extrair seguidor: {e}")
-                        continue
-
-                # Scroll para carregar mais usuários
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-
-                # Verificar se carregou mais conteúdo
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    self.logger.info("📄 Fim da lista alcançado")
-                    break
-                last_height = new_height
+                self._wait_for_user_cells()
+
+            self._scroll_and_collect(followers_users, max_users, "seguidores")
 
             self.logger.info(f"✅ Coletados {len(followers_users)} seguidores")
-            return followers_users
+            return list(followers_users.values())
 
         except Exception as e:
             self.logger.error(f"❌ Erro ao coletar lista de followers: {e}")
-            return followers_users
+            return list(followers_users.values())
+
+    def _wait_for_user_cells(self, timeout: float = 10):
+        """
+        Espera a primeira célula de usuário aparecer (em vez de um sleep fixo)
+        """
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="UserCell"]'))
+            )
+        except TimeoutException:
+            self.logger.warning("⚠️ Nenhum usuário carregado na lista")
+
+    def _scroll_and_collect(self, users: Dict[str, Dict], max_users: int, label: str):
+        """
+        Lê as células visíveis e rola com o AdaptiveScroller até max_users ou o fim confirmado da lista
+
+        Args:
+            users: Dict username -> dados, preenchido no lugar (sem duplicatas)
+            label: Nome dos itens nos logs de progresso
+        """
+        if self.network_capture:
+            self._scroll_and_capture(users, max_users, label)
+            return
+
+        scroller = AdaptiveScroller(self.driver)
+
+        while len(users) < max_users and not scroller.at_end:
+            # Encontrar todos os elementos de usuário na página atual
+            for element in self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="UserCell"]'):
+                if len(users) >= max_users:
+                    break
+
+                try:
+                    # Extrair informações do usuário
+                    user_info = self._extract_user_info(element)
+                    if user_info and user_info['username'] not in users:
+                        users[user_info['username']] = user_info
+
+                        if len(users) % 50 == 0:
+                            self.logger.info(f"   Coletados {len(users)} {label}...")
+
+                except Exception as e:
+                    self.logger.debug(f"Erro ao extrair usuário: {e}")
+                    continue
+
+            if len(users) < max_users:
+                scroller.step()
+
+        if scroller.at_end:
+            self.logger.info("📄 Fim da lista alcançado")
+        scroller.log_stats()
+
+    def _scroll_and_capture(self, users: Dict[str, Dict], max_users: int, label: str):
+        """
+        Como _scroll_and_collect, mas lendo lotes de usuários das respostas GraphQL da timeline
+        """
+        capture = GraphQLCapture(self.driver)
+        scroller = AdaptiveScroller(self.driver, step_viewports=3.0)
+
+        # Respostas da navegação inicial já estão no log
+        new_users = capture.poll()
+        while True:
+            for user_info in new_users:
+                if len(users) >= max_users:
+                    break
+                users.setdefault(user_info['username'], user_info)
+
+            if new_users:
+                self.logger.info(f"   Coletados {len(users)} {label}...")
+            if len(users) >= max_users or scroller.at_end:
+                break
+
+            scroller.step()
+            new_users = capture.poll()
+
+        if scroller.at_end:
+            self.logger.info("📄 Fim da lista alcançado")
+        scroller.log_stats()
 
     def _extract_user_info(self, element) -> Dict:
         """
@@ -10,12 +10,16 @@ import logging
 import json
 import csv
 from datetime import datetime
-from typing import Set, Dict, List
+from typing import Set, Dict, List, Optional
 from twitter_selenium import TwitterSeleniumScraper
-from immunity_analyzer import ImmunityAnalyzer
+from profile_worker_pool import ProfileWorkerPool
+from immunity_analyzer import DEFAULT_EXPLAIN_BELOW, ImmunityAnalyzer
+from profile_counts import CycleChangeDetector
 
 class TwitterSeleniumUnfollower:
-    def __init__(self, openrouter_api_key: str, headless: bool = False, browser: str = "chrome"):
+    def __init__(self, openrouter_api_key: str, headless: bool = False, browser: str = "chrome",
+                 profile_workers: int = 1, max_profiles_per_minute: float = 30.0,
+                 explain_below: Optional[float] = DEFAULT_EXPLAIN_BELOW):
         """
         Inicializa o sistema de unfollow usando apenas Selenium
         
@@ -23,10 +27,17 @@ class TwitterSeleniumUnfollower:
             openrouter_api_key: Chave da API do OpenRouter para análise de IA
             headless: Se True, executa navegador sem interface
             browser: "chrome" ou "brave"
+            profile_workers: Navegadores headless extraindo perfis em paralelo (1 = navegador principal, sequencial)
+            max_profiles_per_minute: Teto de perfis abertos por minuto somando todos os workers
+            explain_below: No CSV, busca a explicação (modo compacto) das análises com confiança abaixo disso (None desativa)
         """
         self.openrouter_api_key = openrouter_api_key
         self.headless = headless
         self.browser = browser
+        self.profile_workers = profile_workers
+        self.max_profiles_per_minute = max_profiles_per_minute
+        self.explain_below = explain_below
+        self.profile_pool = None
         self.state_file = 'selenium_unfollow_state.json'
         self.running = False
         
@@ -106,10 +117,15 @@ class TwitterSeleniumUnfollower:
         self.logger.info(f"🎯 Encontrados {len(non_followers)} usuários que não te seguem de volta")
         return non_followers
     
-    def extract_user_profile_data(self, username: str) -> Dict[str, str]:
+    def extract_user_profile_data(self, username: str, driver=None) -> Dict[str, str]:
         """
         Extrai dados completos do perfil de um usuário
+
+        Args:
+            username: Perfil a extrair
+            driver: Navegador a usar (padrão: o do scraper; os workers do pool passam o seu)
         """
+        driver = driver or self.scraper.driver
         profile_data = {
             'username': username,
             'display_name': '',
@@ -122,15 +138,18 @@ class TwitterSeleniumUnfollower:
 
         try:
             profile_url = f"https://x.com/{username}"
-            self.scraper.driver.get(profile_url)
-            time.sleep(3)  # Tempo maior para carregar completamente
+            driver.get(profile_url)
 
-            # Aguardar carregamento da página
+            # Aguardar carregamento da página (cabeçalho do perfil, renderizado junto com bio e localização)
             from selenium.webdriver.support.ui import WebDriverWait
             from selenium.webdriver.support import expected_conditions as EC
             from selenium.webdriver.common.by import By
 
-            wait = WebDriverWait(self.scraper.driver, 10)
+            wait = WebDriverWait(driver, 10)
+            try:
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="UserName"]')))
+            except Exception:
+                pass
 
             # Extrair nome de exibição
             try:
@@ -158,7 +177,7 @@ class TwitterSeleniumUnfollower:
                 ]
                 for selector in bio_selectors:
                     try:
-                        bio_element = self.scraper.driver.find_element(By.XPATH, selector)
+                        bio_element = driver.find_element(By.XPATH, selector)
                         if bio_element and bio_element.text.strip():
                             profile_data['bio'] = bio_element.text.strip()
                             break
@@ -175,7 +194,7 @@ class TwitterSeleniumUnfollower:
                 ]
                 for selector in location_selectors:
                     try:
-                        location_element = self.scraper.driver.find_element(By.XPATH, selector)
+                        location_element = driver.find_element(By.XPATH, selector)
                         if location_element and location_element.text.strip():
                             profile_data['location'] = location_element.text.strip()
                             break
@@ -192,7 +211,7 @@ class TwitterSeleniumUnfollower:
                 ]
                 for selector in verified_selectors:
                     try:
-                        self.scraper.driver.find_element(By.XPATH, selector)
+                        driver.find_element(By.XPATH, selector)
                         profile_data['verified'] = True
                         break
                     except:
@@ -235,7 +254,9 @@ class TwitterSeleniumUnfollower:
         self.logger.info(f"📊 Processamento em lotes de {batch_size} usuários")
 
         analyzed_users = []
-        usernames_list = list(usernames)
+        # Perfis que ficaram sem orçamento no ciclo anterior vão primeiro
+        usernames_list = self.immunity_analyzer.prioritize_deferred(list(usernames), key=lambda username: username)
+        budget = self.immunity_analyzer.budget
 
         # Verificar se existe progresso salvo
         progress_file = 'analysis_progress.json'
@@ -252,62 +273,104 @@ class TwitterSeleniumUnfollower:
             except:
                 pass
 
-        for i in range(start_index, len(usernames_list)):
-            username = usernames_list[i]
-            self.logger.info(f"🔍 Analisando {i+1}/{len(usernames_list)}: @{username}")
+        # Todos os lotes formam uma única execução do orçamento
+        if budget is not None:
+            budget.start_run()
 
-            try:
-                # Extrair dados do perfil
-                profile_data = self.extract_user_profile_data(username)
-
-                # Analisar com IA
-                analysis = self.immunity_analyzer.analyze_user_immunity(
-                    username=username,
-                    display_name=profile_data['display_name'] or username,
-                    description=profile_data['bio'],
-                    location=profile_data['location']
-                )
-
-                user_data = {
-                    'username': username,
-                    'display_name': profile_data['display_name'],
-                    'bio': profile_data['bio'],
-                    'location': profile_data['location'],
-                    'verified': profile_data['verified'],
-                    'category': analysis['category'],
-                    'immunity_status': analysis['immunity_status'],
-                    'confidence': analysis['confidence'],
-                    'reasoning': analysis.get('reasoning', '')
-                }
-                
-                analyzed_users.append(user_data)
+        # Navegadores extras para extrair os perfis em paralelo (sem workers: navegador principal, sequencial)
+        pool = None
+        try:
+            if self.profile_workers > 1 and start_index < len(usernames_list):
+                pool = ProfileWorkerPool(self.scraper.driver.get_cookies(), size=self.profile_workers,
+                                         max_profiles_per_minute=self.max_profiles_per_minute, browser=self.browser)
+                if pool.start():
+                    # Fechado também em cleanup, se a análise for interrompida
+                    self.profile_pool = pool
+                else:
+                    self.logger.warning("⚠️ Nenhum worker iniciou; extraindo perfis com o navegador principal")
+                    pool = None
+
+            for batch_start in range(start_index, len(usernames_list), batch_size):
+                batch = usernames_list[batch_start:batch_start + batch_size]
+                batch_end = batch_start + len(batch)
+
+                # Sem orçamento, nem vale extrair os perfis restantes: ficam para o próximo ciclo
+                reason = budget.exceeded() if budget is not None else None
+                if reason:
+                    remaining = usernames_list[batch_start:]
+                    budget.defer(remaining)
+                    self.logger.warning(f"💸 Orçamento esgotado ({reason}): {len(remaining)} perfis adiados para o próximo ciclo")
+                    break
+
+                # Extrair dados dos perfis do lote
+                if pool is not None:
+                    self.logger.info(f"🔍 Extraindo perfis {batch_start + 1}-{batch_end}/{len(usernames_list)} "
+                                     f"com {len(pool.workers)} navegadores...")
+                    profiles = pool.extract(batch, self.extract_user_profile_data)
+                else:
+                    profiles = []
+                    for i, username in enumerate(batch, batch_start):
+                        self.logger.info(f"🔍 Extraindo perfil {i+1}/{len(usernames_list)}: @{username}")
+                        try:
+                            profile_data = self.extract_user_profile_data(username)
+                        except Exception as e:
+                            self.logger.warning(f"⚠️ Erro ao extrair @{username}: {e}")
+                            profile_data = {'username': username, 'display_name': '', 'bio': '', 'location': '', 'verified': False}
+                        profiles.append(profile_data)
+
+                        # Delay entre perfis para não sobrecarregar o X
+                        time.sleep(2)
+
+                # Analisar o lote com IA em paralelo
+                self.logger.info(f"🤖 Analisando lote {batch_start + 1}-{batch_end} com IA...")
+                try:
+                    analyses = self.immunity_analyzer.analyze_users_concurrently(profiles)
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Erro na análise do lote: {e}")
+                    analyses = [None] * len(profiles)
+
+                for profile_data, analysis in zip(profiles, analyses):
+                    if analysis is None:
+                        # Análise não concluída: conservador, o perfil fica imune até o próximo ciclo
+                        analyzed_users.append({
+                            'username': profile_data['username'],
+                            'display_name': profile_data.get('display_name', ''),
+                            'bio': profile_data.get('bio', ''),
+                            'location': profile_data.get('location', ''),
+                            'verified': profile_data.get('verified', False),
+                            'category': 'ERROR',
+                            'immunity_status': 'immune',
+                            'confidence': 0.0,
+                            'reasoning': 'Erro na análise: análise não concluída',
+                            'tier': 'error'
+                        })
+                        continue
+
+                    analyzed_users.append({
+                        'username': profile_data['username'],
+                        'display_name': profile_data['display_name'],
+                        'bio': profile_data['bio'],
+                        'location': profile_data['location'],
+                        'verified': profile_data['verified'],
+                        'category': analysis['category'],
+                        'immunity_status': analysis['immunity_status'],
+                        'confidence': analysis['confidence'],
+                        'reasoning': analysis.get('reasoning', ''),
+                        'tier': analysis.get('tier', '')
+                    })
 
                 # Salvar progresso a cada lote
-                if save_progress and (i + 1) % batch_size == 0:
-                    self.save_analysis_progress(analyzed_users, i + 1, progress_file)
-                    self.logger.info(f"💾 Progresso salvo: {i + 1}/{len(usernames_list)} usuários processados")
-
-                # Delay entre análises (mais longo para grandes volumes)
-                time.sleep(2)
-
-            except Exception as e:
-                self.logger.warning(f"⚠️ Erro ao analisar @{username}: {e}")
-                # Adicionar com dados mínimos
-                analyzed_users.append({
-                    'username': username,
-                    'display_name': '',
-                    'bio': '',
-                    'location': '',
-                    'verified': False,
-                    'category': 'UNKNOWN',
-                    'immunity_status': 'not_immune',
-                    'confidence': 0.5,
-                    'reasoning': 'Erro na análise'
-                })
-
-                # Salvar progresso mesmo em caso de erro
-                if save_progress and (i + 1) % batch_size == 0:
-                    self.save_analysis_progress(analyzed_users, i + 1, progress_file)
+                if save_progress:
+                    self.save_analysis_progress(analyzed_users, batch_end, progress_file)
+                    self.logger.info(f"💾 Progresso salvo: {batch_end}/{len(usernames_list)} usuários processados")
+        finally:
+            # Mesmo se a análise for interrompida, o tempo gasto entra no orçamento e os navegadores fecham
+            if budget is not None:
+                budget.finish_run()
+            if pool is not None:
+                pool.log_stats()
+                pool.close()
+                self.profile_pool = None
 
         # Salvar progresso final
         if save_progress:
@@ -319,6 +382,11 @@ class TwitterSeleniumUnfollower:
                 pass
 
         self.logger.info(f"✅ Análise concluída: {len(analyzed_users)} usuários processados")
+        tier_stats = self.immunity_analyzer.get_tier_stats()
+        self.logger.info(f"🧮 Decisões por camada: {tier_stats['tier_hits']} "
+                         f"({tier_stats['llm_calls_saved_ratio']:.0%} sem chamar a IA, "
+                         f"{tier_stats['failover_ratio']:.0%} por failover)")
+        self.immunity_analyzer.log_routing_stats()
         return analyzed_users
 
     def save_analysis_progress(self, analyzed_users: List[Dict], last_processed: int, filename: str):
@@ -337,17 +405,24 @@ class TwitterSeleniumUnfollower:
         except Exception as e:
             self.logger.error(f"❌ Erro ao salvar progresso: {e}")
     
-    def save_analysis_to_csv(self, analyzed_users: List[Dict]) -> str:
+    def save_analysis_to_csv(self, analyzed_users: List[Dict], explain_below: Optional[float] = None) -> str:
         """
         Salva análise em arquivo CSV
+        
+        Args:
+            explain_below: Busca a explicação (modo compacto) das linhas com confiança abaixo deste valor
         """
+        if explain_below is not None:
+            explained = self.immunity_analyzer.explain_rows(analyzed_users, explain_below)
+            self.logger.info(f"💬 Explicações buscadas para {explained} usuários limítrofes")
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"selenium_analysis_{timestamp}.csv"
         
         try:
             with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['username', 'bio', 'location', 'category', 'immunity_status', 'confidence', 'reasoning']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                fieldnames = ['username', 'bio', 'location', 'category', 'immunity_status', 'confidence', 'reasoning', 'tier']
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
                 
                 writer.writeheader()
                 for user in analyzed_users:
@@ -423,9 +498,28 @@ class TwitterSeleniumUnfollower:
             self.logger.error(f"❌ Erro ao carregar estado: {e}")
         return {}
     
+    def check_unchanged_cycle(self, max_skip_hours: float = 6.0) -> Optional[str]:
+        """
+        Compara as contagens do perfil com as do último ciclo completo (um carregamento de página)
+
+        Returns:
+            Motivo para pular o ciclo, ou None se há mudança, trabalho pendente ou falta referência
+        """
+        pending_analyses = (self.immunity_analyzer.get_budget_stats() or {}).get('deferred', 0)
+        detector = CycleChangeDetector(self.scraper.get_profile_counts, max_skip_hours)
+        return detector.unchanged_reason(self.load_state(), pending_analyses)
+
+    def record_cycle_counts(self, pending_unfollows: List[str]):
+        """
+        Guarda as contagens do perfil ao fim de um ciclo completo, com os unfollows que ficaram para depois
+        """
+        detector = CycleChangeDetector(self.scraper.get_profile_counts)
+        self.save_state(detector.record(self.load_state(), pending_unfollows))
+
     def run_full_process(self, max_following: int = 5000, max_followers: int = 5000,
                         max_unfollows: int = 20, delay_between: float = 5.0,
-                        safety_mode: bool = True) -> Dict:
+                        safety_mode: bool = True, skip_unchanged: bool = False,
+                        max_skip_hours: float = 6.0) -> Dict:
         """
         Executa o processo completo de unfollow
 
@@ -435,6 +529,9 @@ class TwitterSeleniumUnfollower:
             max_unfollows: Máximo de unfollows por execução
             delay_between: Delay entre unfollows (segundos)
             safety_mode: Se True, aplica verificações de segurança extras
+            skip_unchanged: Se True, pula coleta e análise quando as contagens do perfil não mudaram
+                desde o último ciclo e não há trabalho pendente (ciclos agendados)
+            max_skip_hours: Com skip_unchanged, executa o ciclo completo pelo menos a cada tantas horas
 
         Returns:
             Dicionário com resultados da execução
@@ -471,6 +568,14 @@ class TwitterSeleniumUnfollower:
                 results['message'] = "Falha ao inicializar scraper"
                 return results
 
+            # Nada mudou desde o último ciclo: encerrar antes da coleta
+            if skip_unchanged:
+                skip_reason = self.check_unchanged_cycle(max_skip_hours)
+                if skip_reason:
+                    self.logger.info(f"⏭️ {skip_reason}")
+                    results.update({'success': True, 'message': skip_reason, 'stats': {'skipped': True}})
+                    return results
+
             # 2. Coletar dados
             self.logger.info("📋 ETAPA 1/5: Coletando dados...")
             following, followers = self.collect_data(max_following, max_followers)
@@ -484,6 +589,7 @@ class TwitterSeleniumUnfollower:
             non_followers = self.find_non_followers(following, followers)
 
             if not non_followers:
+                self.record_cycle_counts([])
                 results['message'] = "Todos os usuários te seguem de volta!"
                 results['success'] = True
                 return results
@@ -494,13 +600,14 @@ class TwitterSeleniumUnfollower:
 
             # 5. Salvar análise
             self.logger.info("💾 ETAPA 4/5: Salvando análise...")
-            csv_file = self.save_analysis_to_csv(analyzed_users)
+            csv_file = self.save_analysis_to_csv(analyzed_users, self.explain_below)
             results['csv_file'] = csv_file
 
             # 6. Filtrar usuários imunes
             eligible_users = self.filter_immune_users(analyzed_users)
 
             if not eligible_users:
+                self.record_cycle_counts([])
                 results['message'] = "Todos os não-seguidores são imunes!"
                 results['success'] = True
                 return results
@@ -525,6 +632,8 @@ class TwitterSeleniumUnfollower:
                 'csv_file': csv_file
             }
             self.save_state(state_data)
+            self.record_cycle_counts([username for username in eligible_users
+                                      if username not in unfollow_results['success']])
 
             # Resultados finais
             results.update({
@@ -542,6 +651,9 @@ class TwitterSeleniumUnfollower:
             self.logger.info(f"   Analisados: {len(analyzed_users)}")
             self.logger.info(f"   Elegíveis: {len(eligible_users)}")
             self.logger.info(f"   Unfollows realizados: {unfollow_results['success_count']}")
+            self.immunity_analyzer.log_cache_stats()
+            self.immunity_analyzer.log_token_stats()
+            self.immunity_analyzer.log_budget_stats()
 
             return results
 
@@ -557,6 +669,9 @@ class TwitterSeleniumUnfollower:
         """
         Limpa recursos
         """
+        if self.profile_pool:
+            self.profile_pool.close()
+            self.profile_pool = None
         if self.scraper:
             self.scraper.close()
             self.logger.info("🔒 Recursos liberados")
@@ -11,6 +11,7 @@ import os
 import schedule
 from datetime import datetime
 from dotenv import load_dotenv
+from immunity_analyzer import DEFAULT_EXPLAIN_BELOW
 from twitter_selenium_only import TwitterSeleniumUnfollower
 
 # Carregar variáveis de ambiente
@@ -43,7 +44,10 @@ def run_unfollow_cycle():
         unfollower = TwitterSeleniumUnfollower(
             openrouter_api_key=openrouter_key,
             headless=True,  # Modo headless para execução automática
-            browser="chrome"
+            browser="chrome",
+            profile_workers=int(os.getenv('PROFILE_WORKERS', '1')),
+            max_profiles_per_minute=float(os.getenv('MAX_PROFILES_PER_MINUTE', '30')),
+            explain_below=float(os.getenv('EXPLAIN_BELOW') or DEFAULT_EXPLAIN_BELOW)
         )
 
         # Executar processo com limites para ciclo automático
@@ -51,10 +55,14 @@ def run_unfollow_cycle():
             max_following=1000,  # Processar em lotes menores
             max_followers=1000,
             max_unfollows=20,    # 20 unfollows por ciclo
-            delay_between=3.0    # 3 segundos entre unfollows
+            delay_between=3.0,   # 3 segundos entre unfollows
+            skip_unchanged=True  # Pular o ciclo se as contagens do perfil não mudaram
         )
 
-        if results['success']:
+        if results['success'] and results.get('stats', {}).get('skipped'):
+            logging.info(f"⏭️ Ciclo pulado: {results['message']}")
+            return True
+        elif results['success']:
             logging.info("✅ Ciclo concluído com sucesso")
             if 'unfollow_results' in results.get('stats', {}):
                 unfollow_stats = results['stats']['unfollow_results']
@@ -132,7 +140,10 @@ def main():
             unfollower = TwitterSeleniumUnfollower(
                 openrouter_api_key=openrouter_key,
                 headless=False,  # Interface visível para execução única
-                browser="chrome"
+                browser="chrome",
+                profile_workers=int(os.getenv('PROFILE_WORKERS', '1')),
+                max_profiles_per_minute=float(os.getenv('MAX_PROFILES_PER_MINUTE', '30')),
+                explain_below=float(os.getenv('EXPLAIN_BELOW') or DEFAULT_EXPLAIN_BELOW)
             )
 
             # Executar processo completo
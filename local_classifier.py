@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Classificador local de imunidade treinado com os CSVs de análises anteriores
+TF-IDF com hashing de features + regressão logística, tudo em NumPy (sem rede)
+
+Uso: python local_classifier.py [--output immunity_classifier.npz] [csv ...]
+"""
+
+import argparse
+import csv
+import glob
+import logging
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_MODEL_PATH = "immunity_classifier.npz"
+DEFAULT_CSV_PATTERNS = ["hybrid_analysis_*.csv", "selenium_analysis_*.csv"]
+
+# Linhas que não vieram da IA (erros, listas, heurísticas, adiadas) não servem como rótulo
+IGNORED_CATEGORIES = {"ERROR", "UNKNOWN", "ALLOWLIST", "DENYLIST", "TECH_RELATED", "CLASSIFIER", "DEFERRED"}
+# Coluna tier do CSV: análise local com a IA fora, adiada, com erro ou copiada de uma bio quase idêntica
+IGNORED_TIERS = {"error", "failover", "deferred", "similar"}
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+class LocalImmunityClassifier:
+    def __init__(self, n_features: int = 2 ** 18):
+        """
+        Cria um classificador vazio (use fit ou load)
+
+        Args:
+            n_features: Tamanho do espaço de hashing das features
+        """
+        self.n_features = n_features
+        self.idf = np.ones(n_features, dtype=np.float32)
+        self.weights = np.zeros(n_features, dtype=np.float32)
+        self.bias = 0.0
+        self.trained = False
+        self._hash_memo: Dict[str, int] = {}
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def profile_text(profile: Dict) -> Tuple[str, str]:
+        """
+        Retorna (texto principal, localização) de um dict de perfil
+        """
+        main = f"{profile.get('display_name', '') or ''} {profile.get('bio', '') or ''}"
+        return main, profile.get('location', '') or ''
+
+    def _features(self, main: str, location: str) -> List[int]:
+        """
+        Índices (com repetição) das features de um perfil: palavras, bigramas e tokens de localização
+        """
+        tokens = TOKEN_PATTERN.findall(main.lower())
+        terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        terms += [f"loc:{token}" for token in TOKEN_PATTERN.findall(location.lower())]
+
+        memo = self._hash_memo
+        indices = []
+        for term in terms:
+            index = memo.get(term)
+            if index is None:
+                index = zlib.crc32(term.encode("utf-8")) % self.n_features
+                if len(memo) < 500000:
+                    memo[term] = index
+            indices.append(index)
+        return indices
+
+    def _count_matrix(self, profiles: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Matriz esparsa (CSR: indices, data, indptr) com contagens de termos por perfil
+        """
+        all_indices = []
+        all_counts = []
+        indptr = [0]
+
+        for profile in profiles:
+            unique, counts = np.unique(np.asarray(self._features(*self.profile_text(profile)), dtype=np.int64),
+                                       return_counts=True)
+            all_indices.append(unique)
+            all_counts.append(counts)
+            indptr.append(indptr[-1] + len(unique))
+
+        indices = np.concatenate(all_indices) if all_indices else np.zeros(0, dtype=np.int64)
+        data = np.concatenate(all_counts).astype(np.float32) if all_counts else np.zeros(0, dtype=np.float32)
+        return indices, data, np.asarray(indptr, dtype=np.int64)
+
+    def _tfidf(self, profiles: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Matriz TF-IDF normalizada (L2 por linha)
+        """
+        indices, data, indptr = self._count_matrix(profiles)
+        rows = np.repeat(np.arange(len(profiles)), np.diff(indptr))
+
+        data = (1.0 + np.log(data)) * self.idf[indices]
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(profiles)))
+        norms[norms == 0] = 1.0
+        data = (data / norms[rows]).astype(np.float32)
+        return indices, data, rows
+
+    def predict_proba(self, profiles: List[Dict]) -> np.ndarray:
+        """
+        Probabilidade de cada perfil ser imune (vetorizado para o lote inteiro)
+        """
+        if not profiles:
+            return np.zeros(0, dtype=np.float32)
+
+        indices, data, rows = self._tfidf(profiles)
+        scores = np.bincount(rows, weights=self.weights[indices] * data, minlength=len(profiles)) + self.bias
+        return 1.0 / (1.0 + np.exp(-scores))
+
+    def fit(self, profiles: List[Dict], labels: Iterable[int], epochs: int = 60, learning_rate: float = 0.5,
+            l2: float = 1e-5) -> "LocalImmunityClassifier":
+        """
+        Treina com regressão logística (gradiente descendente com Adagrad, classes balanceadas)
+
+        Args:
+            profiles: Dicts com display_name, bio e location
+            labels: 1 para imune, 0 para não imune
+        """
+        y = np.asarray(list(labels), dtype=np.float32)
+        n = len(profiles)
+        if n == 0 or len(y) != n:
+            raise ValueError("Perfis e rótulos precisam ter o mesmo tamanho (e não podem estar vazios)")
+
+        # IDF calculado antes do TF-IDF
+        indices, _, _ = self._count_matrix(profiles)
+        df = np.bincount(indices, minlength=self.n_features)
+        self.idf = (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        indices, data, rows = self._tfidf(profiles)
+
+        positives = max(1.0, float(y.sum()))
+        negatives = max(1.0, float(n - y.sum()))
+        sample_weight = np.where(y == 1, n / (2.0 * positives), n / (2.0 * negatives)).astype(np.float32)
+
+        weights = np.zeros(self.n_features, dtype=np.float64)
+        bias = 0.0
+        grad_sq = np.full(self.n_features, 1e-8)
+        bias_grad_sq = 1e-8
+
+        for _ in range(epochs):
+            scores = np.bincount(rows, weights=weights[indices] * data, minlength=n) + bias
+            error = (1.0 / (1.0 + np.exp(-scores)) - y) * sample_weight
+
+            grad = np.bincount(indices, weights=data * error[rows], minlength=self.n_features) / n + l2 * weights
+            bias_grad = float(error.mean())
+
+            grad_sq += grad * grad
+            bias_grad_sq += bias_grad * bias_grad
+            weights -= learning_rate * grad / np.sqrt(grad_sq)
+            bias -= learning_rate * bias_grad / np.sqrt(bias_grad_sq)
+
+        self.weights = weights.astype(np.float32)
+        self.bias = float(bias)
+        self.trained = True
+        return self
+
+    def classify(self, profiles: List[Dict], threshold: float = 0.9) -> List[Optional[Dict]]:
+        """
+        Classifica um lote; perfis com confiança abaixo de threshold retornam None (ambíguos)
+        """
+        results: List[Optional[Dict]] = []
+
+        for probability in self.predict_proba(profiles):
+            probability = float(probability)
+            if probability >= threshold:
+                results.append({
+                    "category": "CLASSIFIER",
+                    "immunity_status": "immune",
+                    "confidence": round(probability, 3),
+                    "reasoning": f"Classificador local (p_imune={probability:.2f})"
+                })
+            elif probability <= 1.0 - threshold:
+                results.append({
+                    "category": "CLASSIFIER",
+                    "immunity_status": "not_immune",
+                    "confidence": round(1.0 - probability, 3),
+                    "reasoning": f"Classificador local (p_imune={probability:.2f})"
+                })
+            else:
+                results.append(None)
+
+        return results
+
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        """
+        Salva o modelo em um arquivo .npz
+        """
+        np.savez_compressed(path, n_features=self.n_features, idf=self.idf, weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> "LocalImmunityClassifier":
+        """
+        Carrega um modelo salvo com save
+        """
+        with np.load(path) as model:
+            classifier = cls(n_features=int(model["n_features"]))
+            classifier.idf = model["idf"].astype(np.float32)
+            classifier.weights = model["weights"].astype(np.float32)
+            classifier.bias = float(model["bias"])
+        classifier.trained = True
+        return classifier
+
+def load_training_data(paths: Iterable[str]) -> Tuple[List[Dict], List[int]]:
+    """
+    Lê perfis rotulados pela IA dos CSVs de análise (hybrid_analysis_*.csv / selenium_analysis_*.csv)
+    """
+    profiles: Dict[str, Dict] = {}
+    labels: Dict[str, int] = {}
+
+    for path in paths:
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                status = (row.get('immunity_status') or '').strip()
+                category = (row.get('category') or '').strip().upper()
+                reasoning = (row.get('reasoning') or '').strip()
+                tier = (row.get('tier') or '').strip().lower()
+
+                if status not in ('immune', 'not_immune') or category in IGNORED_CATEGORIES or tier in IGNORED_TIERS:
+                    continue
+                # CSVs sem a coluna tier: erros e análises reaproveitadas se reconhecem pelo reasoning
+                if reasoning.startswith('Erro') or reasoning.startswith('Bio quase idêntica'):
+                    continue
+
+                # Arquivos mais recentes sobrescrevem rótulos antigos do mesmo usuário
+                username = (row.get('username') or '').lower()
+                profiles[username] = {
+                    'display_name': row.get('display_name', ''),
+                    'bio': row.get('bio', ''),
+                    'location': row.get('location', '')
+                }
+                labels[username] = 1 if status == 'immune' else 0
+
+    usernames = list(profiles)
+    return [profiles[u] for u in usernames], [labels[u] for u in usernames]
+
+def main():
+    parser = argparse.ArgumentParser(description="Treina o classificador local de imunidade a partir dos CSVs de análise")
+    parser.add_argument('csv_files', nargs='*', help='CSVs de análise (padrão: hybrid_analysis_*.csv e selenium_analysis_*.csv)')
+    parser.add_argument('--output', default=DEFAULT_MODEL_PATH, help='Arquivo do modelo treinado')
+    parser.add_argument('--holdout', type=float, default=0.2, help='Fração separada para avaliação')
+    args = parser.parse_args()
+
+    paths = args.csv_files or sorted(path for pattern in DEFAULT_CSV_PATTERNS for path in glob.glob(pattern))
+    if not paths:
+        print("❌ Nenhum CSV de análise encontrado")
+        return
+
+    profiles, labels = load_training_data(paths)
+    print(f"📊 {len(profiles)} perfis rotulados em {len(paths)} arquivos ({sum(labels)} imunes)")
+    if len(profiles) < 20:
+        print("❌ Poucos perfis para treinar")
+        return
+
+    # Avaliação em holdout antes do treino final
+    order = np.random.default_rng(42).permutation(len(profiles))
+    cut = int(len(profiles) * (1 - args.holdout))
+    train_idx, test_idx = order[:cut], order[cut:]
+
+    if len(test_idx):
+        model = LocalImmunityClassifier().fit([profiles[i] for i in train_idx], [labels[i] for i in train_idx])
+        probabilities = model.predict_proba([profiles[i] for i in test_idx])
+        expected = np.asarray([labels[i] for i in test_idx])
+        accuracy = float(((probabilities >= 0.5) == expected).mean())
+        confident = (probabilities >= 0.9) | (probabilities <= 0.1)
+        confident_accuracy = float(((probabilities[confident] >= 0.5) == expected[confident]).mean()) if confident.any() else 0.0
+        print(f"🎯 Holdout: acurácia {accuracy:.1%}; {confident.mean():.1%} com confiança ≥ 0.9 "
+              f"(acurácia {confident_accuracy:.1%})")
+
+    model = LocalImmunityClassifier().fit(profiles, labels)
+    model.save(args.output)
+    print(f"💾 Modelo salvo em: {args.output}")
+
+if __name__ == "__main__":
+    main()
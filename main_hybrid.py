@@ -7,6 +7,7 @@ Integra extensão Chrome com análise de IA Python
 import os
 import sys
 from dotenv import load_dotenv
+from immunity_analyzer import DEFAULT_EXPLAIN_BELOW
 from twitter_hybrid_unfollow import TwitterHybridUnfollower
 
 def get_execution_parameters():
@@ -108,7 +109,8 @@ def main():
         print("\n🔧 Inicializando sistema híbrido...")
         unfollower = TwitterHybridUnfollower(
             openrouter_api_key=openrouter_key,
-            headless=params['headless']
+            headless=params['headless'],
+            explain_below=float(os.getenv('EXPLAIN_BELOW') or DEFAULT_EXPLAIN_BELOW)
         )
         
         # Executar processo completo
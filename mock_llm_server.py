@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Servidor mock compatível com /v1/chat/completions da OpenAI, para testar o analisador sem gastar créditos
+Classifica os perfis do prompt pelas palavras-chave técnicas e responde no formato pedido (completo ou compacto, um perfil ou lote)
+
+Uso: python mock_llm_server.py [--port 8099] [--delay 0.2] [--fail-rate 0.1]
+Depois aponte um backend para http://127.0.0.1:8099/v1 (ver analyzer_backends_example.json)
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from keyword_matcher import KeywordMatcher, TECH_KEYWORDS
+
+PROFILE_PATTERN = re.compile(r"- Username: @(?P<username>\S+)\n- Nome: .*\n- Bio: (?P<bio>.*)\n- Localização:")
+
+def classify_profile(matcher: KeywordMatcher, username: str, bio: str) -> Dict:
+    """
+    Classificação simulada de um perfil (técnico se a bio tiver alguma palavra-chave)
+    """
+    keywords = matcher.find_all(bio)
+    if keywords:
+        return {"username": username, "category": "TECH_WORKER", "immunity_status": "immune",
+                "confidence": 0.9, "reasoning": f"Bio menciona {', '.join(keywords[:3])}"}
+    return {"username": username, "category": "OTHER", "immunity_status": "not_immune",
+            "confidence": 0.85, "reasoning": "Bio sem indícios de atuação em tecnologia"}
+
+def render_answer(messages: List[Dict], matcher: KeywordMatcher) -> str:
+    """
+    Resposta do modelo simulado para as mensagens recebidas
+    """
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+    prompt = " ".join(m.get("content", "") for m in messages if m.get("role") != "system")
+
+    if "explique o motivo" in prompt:
+        return "Classificação simulada pelo servidor mock a partir das palavras-chave da bio."
+
+    results = [classify_profile(matcher, m.group("username"), m.group("bio")) for m in PROFILE_PATTERN.finditer(prompt)]
+    if "JSON MÍNIMO" in system:
+        results = [{"u": r["username"], "c": r["category"], "i": int(r["immunity_status"] == "immune"),
+                    "p": r["confidence"]} for r in results]
+        if "ARRAY JSON" not in system:
+            results = [{k: v for k, v in r.items() if k != "u"} for r in results]
+    elif "ARRAY JSON" not in system:
+        results = [{k: v for k, v in r.items() if k != "username"} for r in results]
+
+    if "ARRAY JSON" in system:
+        return json.dumps(results, ensure_ascii=False)
+    return json.dumps(results[0] if results else {}, ensure_ascii=False)
+
+def make_handler(matcher: KeywordMatcher, delay: float, fail_rate: float):
+    class MockCompletionHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": {"message": "Rota não encontrada"}})
+                return
+
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if delay:
+                time.sleep(delay)
+            if random.random() < fail_rate:
+                self._send(503, {"error": {"message": "Falha simulada"}})
+                return
+
+            messages = body.get("messages", [])
+            content = render_answer(messages, matcher)
+            prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+            completion_tokens = len(content) // 4
+            self._send(200, {
+                "id": f"mock-{time.time_ns()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens}
+            })
+
+        def _send(self, status: int, payload: Dict):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockCompletionHandler
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor mock compatível com a API de chat da OpenAI")
+    parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta')
+    parser.add_argument('--port', type=int, default=8099, help='Porta de escuta')
+    parser.add_argument('--delay', type=float, default=0.0, help='Latência simulada por resposta (segundos)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fração de respostas com erro 503')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port),
+                                 make_handler(KeywordMatcher(TECH_KEYWORDS), args.delay, args.fail_rate))
+    print(f"🧪 Servidor mock em http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
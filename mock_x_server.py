@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita as timelines GraphQL de following/followers do X, para testar coleta e exportação sem rede
+Serve páginas geradas de forma determinística (mesmo formato de entradas e cursores do X) e uma página HTML que
+pede a primeira página como o app do X, para a captura de rede aprender a requisição modelo
+
+Uso: python mock_x_server.py [--port 8098] [--users 5000] [--delay 0.2] [--rate-limit-every 0]
+Depois abra http://127.0.0.1:8098/mock/following no navegador controlado pelo Selenium
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from graph_capture import GRAPHQL_URL_PATTERN
+
+MOCK_BEARER = "Bearer mock-token"
+MOCK_CSRF = "mock-csrf"
+MOCK_USER_ID = "1000"
+
+SAMPLE_BIOS = [
+    "Software engineer | Python, Rust e sistemas distribuídos",
+    "Fotógrafa, viajante e apaixonada por café",
+    "PhD student in machine learning @ university",
+    "Memes, futebol e opiniões que ninguém pediu",
+    "DevOps / SRE. Kubernetes during the day, synths at night",
+    "",
+]
+
+# Página HTML mínima: define o cookie ct0 e pede a primeira página da lista como o app do X
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Mock X - {operation}</title></head>
+<body>
+<div data-testid="primaryColumn"><section><div id="timeline"></div></section></div>
+<script>
+document.cookie = "ct0={csrf}; path=/";
+const variables = {{ userId: "{user_id}", count: 20, includePromotedContent: false }};
+const url = "/i/api/graphql/mockQueryId/{operation}?variables=" + encodeURIComponent(JSON.stringify(variables)) +
+            "&features=" + encodeURIComponent(JSON.stringify({{ mock_feature: true }}));
+fetch(url, {{ headers: {{ "authorization": "{bearer}", "x-csrf-token": "{csrf}",
+                         "x-twitter-active-user": "yes", "content-type": "application/json" }} }})
+    .then(r => r.json())
+    .then(data => {{
+        const entries = data.data.user.result.timeline.timeline.instructions[0].entries;
+        const timeline = document.getElementById("timeline");
+        entries.filter(e => e.content.itemContent).forEach(e => {{
+            const user = e.content.itemContent.user_results.result;
+            const cell = document.createElement("div");
+            cell.setAttribute("data-testid", "cellInnerDiv");
+            cell.textContent = "@" + user.core.screen_name;
+            timeline.appendChild(cell);
+        }});
+    }});
+</script>
+</body></html>
+"""
+
+def mock_user(index: int) -> Dict:
+    """
+    Usuário determinístico da posição index (um em cada três segue de volta)
+    """
+    rest_id = str(2000000 + index)
+    return {
+        "__typename": "User",
+        "rest_id": rest_id,
+        "is_blue_verified": index % 7 == 0,
+        "core": {"screen_name": f"mock_user{index:05d}", "name": f"Mock User {index}"},
+        "location": {"location": "Brasil" if index % 2 else ""},
+        "relationship_perspectives": {"following": True, "followed_by": index % 3 == 0},
+        "legacy": {"description": SAMPLE_BIOS[index % len(SAMPLE_BIOS)],
+                   "followers_count": (index * 37) % 5000, "friends_count": (index * 13) % 3000}
+    }
+
+def timeline_page(total: int, offset: int, count: int) -> Dict:
+    """
+    Página da timeline a partir de offset, no formato das respostas Following/Followers do X
+
+    Como no X, a última página ainda traz cursores, mas nenhum usuário.
+    """
+    end = min(total, offset + count)
+    entries = [{
+        "entryId": f"user-{2000000 + index}",
+        "sortIndex": str(10 ** 18 - index),
+        "content": {
+            "entryType": "TimelineTimelineItem",
+            "itemContent": {"itemType": "TimelineUser", "user_results": {"result": mock_user(index)}}
+        }
+    } for index in range(offset, end)]
+    entries.append({"entryId": f"cursor-bottom-{end}",
+                    "content": {"entryType": "TimelineTimelineCursor", "cursorType": "Bottom", "value": f"{end}|mock"}})
+    entries.append({"entryId": f"cursor-top-{offset}",
+                    "content": {"entryType": "TimelineTimelineCursor", "cursorType": "Top", "value": f"-{offset}|mock"}})
+
+    return {"data": {"user": {"result": {"__typename": "User", "timeline": {"timeline": {"instructions": [
+        {"type": "TimelineClearCache"},
+        {"type": "TimelineAddEntries", "entries": entries}
+    ]}}}}}}
+
+def parse_cursor(cursor: Optional[str]) -> int:
+    """
+    Offset codificado no cursor (ausente ou inválido = topo da lista)
+    """
+    try:
+        return max(0, int((cursor or "0|").split("|")[0]))
+    except ValueError:
+        return 0
+
+def make_handler(total_users: int, delay: float, rate_limit_every: int):
+    counter = {"requests": 0}
+    lock = threading.Lock()
+
+    class MockXHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            match = GRAPHQL_URL_PATTERN.search(url.path)
+            if match:
+                self._timeline(match.group("operation"), parse_qs(url.query))
+                return
+
+            parts = [part for part in url.path.split("/") if part]
+            operation = "Followers" if parts and parts[-1] == "followers" else "Following"
+            page = PAGE_TEMPLATE.format(operation=operation, csrf=MOCK_CSRF, user_id=MOCK_USER_ID, bearer=MOCK_BEARER)
+            self._send(200, page.encode("utf-8"), "text/html; charset=utf-8")
+
+        def _timeline(self, operation: str, query: Dict[str, List[str]]):
+            if self.headers.get("authorization") != MOCK_BEARER:
+                self._send_json(401, {"errors": [{"message": "Could not authenticate you"}]})
+                return
+            if self.headers.get("x-csrf-token") != self._cookies().get("ct0"):
+                self._send_json(403, {"errors": [{"message": "CSRF token mismatch"}]})
+                return
+
+            with lock:
+                counter["requests"] += 1
+                limited = rate_limit_every and counter["requests"] % rate_limit_every == 0
+            if limited:
+                self._send_json(429, {"errors": [{"message": "Rate limit exceeded"}]},
+                                {"x-rate-limit-reset": str(int(time.time()) + 1)})
+                return
+
+            try:
+                variables = json.loads(query.get("variables", ["{}"])[0])
+            except ValueError:
+                self._send_json(400, {"errors": [{"message": "Invalid variables"}]})
+                return
+
+            if delay:
+                time.sleep(delay)
+            count = max(1, min(int(variables.get("count", 20)), 100))
+            self._send_json(200, timeline_page(total_users, parse_cursor(variables.get("cursor")), count))
+
+        def _cookies(self) -> Dict[str, str]:
+            cookies = {}
+            for item in self.headers.get("Cookie", "").split(";"):
+                name, _, value = item.strip().partition("=")
+                if name:
+                    cookies[name] = value
+            return cookies
+
+        def _send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+            self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json", headers)
+
+        def _send(self, status: int, data: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockXHandler
+
+def start_server(host: str = "127.0.0.1", port: int = 8098, users: int = 5000, delay: float = 0.0,
+                 rate_limit_every: int = 0) -> Tuple[ThreadingHTTPServer, threading.Thread]:
+    """
+    Sobe o servidor numa thread (para testes automatizados); encerrar com server.shutdown()
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(users, delay, rate_limit_every))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local com timelines de following/followers simuladas")
+    parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta')
+    parser.add_argument('--port', type=int, default=8098, help='Porta de escuta')
+    parser.add_argument('--users', type=int, default=5000, help='Tamanho da lista simulada')
+    parser.add_argument('--delay', type=float, default=0.0, help='Latência simulada por página (segundos)')
+    parser.add_argument('--rate-limit-every', type=int, default=0, help='Responder 429 a cada N páginas (0 = nunca)')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.users, args.delay, args.rate_limit_every))
+    print(f"🧪 Servidor mock do X em http://{args.host}:{args.port}/mock/following ({args.users} usuários)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Contagens de following/followers do perfil logado, lidas com um único carregamento de página
+Os ciclos agendados comparam essas contagens com as do último ciclo completo para pular coleta e análise
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Texto dos contadores do perfil aberto (null enquanto a página não carregou)
+PROFILE_COUNTS_SCRIPT = """return (() => {
+    const count = (selector) => {
+        const span = document.querySelector(selector);
+        return span ? span.textContent.trim() : null;
+    };
+    return {
+        following: count('a[href*="/following"] span.css-1jxf684'),
+        followers: count('a[href*="/verified_followers"] span.css-1jxf684, a[href*="/followers"] span.css-1jxf684')
+    };
+})()"""
+
+# Username da conta logada: link "Perfil" da barra lateral ou, sem ele, o seletor de contas
+LOGGED_IN_USERNAME_SCRIPT = """return (() => {
+    const link = document.querySelector('a[data-testid="AppTabBar_Profile_Link"]');
+    if (link && link.getAttribute('href')) return link.getAttribute('href').split('/').filter(Boolean)[0] || null;
+    const switcher = document.querySelector('[data-testid="SideNav_AccountSwitcher_Button"]');
+    const match = switcher && switcher.textContent.match(/@(\\w{1,15})/);
+    return match ? match[1] : null;
+})()"""
+
+def parse_count(count_text: str) -> int:
+    """
+    Converte texto de contagem (ex: "1.2K", "1,2 mil", "1,234") para número inteiro (0 se ilegível)
+    """
+    try:
+        count_text = count_text.strip().upper().replace(" MIL", "K")
+
+        if count_text.endswith("K") or count_text.endswith("M"):
+            # Abreviado: vírgula ou ponto é o separador decimal
+            multiplier = 1000 if count_text.endswith("K") else 1000000
+            return int(float(count_text[:-1].replace(",", ".")) * multiplier)
+        return int(count_text.replace(",", "").replace(".", ""))
+    except (AttributeError, ValueError):
+        return 0
+
+def is_exact_count(count_text: Optional[str]) -> bool:
+    """
+    True para contagens exatas ("1,234"); abreviadas ("1.2K") não revelam mudanças pequenas
+    """
+    return bool(count_text) and count_text.replace(",", "").replace(".", "").isdigit()
+
+class ProfileCounter:
+    def __init__(self, driver, username: Optional[str] = None, timeout: float = 10.0, poll_interval: float = 0.25):
+        """
+        Lê as contagens do perfil pelo navegador já logado
+
+        Args:
+            driver: WebDriver em uma página do X
+            username: Conta cujas contagens são lidas (padrão: a conta logada, ver read_username)
+            timeout: Tempo máximo (segundos) esperando os contadores aparecerem
+            poll_interval: Intervalo entre as leituras enquanto a página carrega
+        """
+        self.driver = driver
+        self.username = username if username != "unknown" else None
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+
+    def read_username(self) -> Optional[str]:
+        """
+        Username da conta logada, lido da página atual (None fora do X ou sem login)
+        """
+        try:
+            username = self.driver.execute_script(LOGGED_IN_USERNAME_SCRIPT)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Não foi possível identificar a conta logada: {e}")
+            return None
+        return username.lstrip('@').lower() if username else None
+
+    def read(self) -> Dict[str, Optional[int]]:
+        """
+        Abre o perfil e lê as contagens de following e followers
+
+        Returns:
+            {'following': n, 'followers': n}; None para contagens ilegíveis ou abreviadas
+        """
+        counts = {'following': None, 'followers': None}
+        if not self.username:
+            self.username = self.read_username()
+        if not self.username:
+            return counts
+
+        try:
+            self.driver.get(f"https://x.com/{self.username}")
+            deadline = time.monotonic() + self.timeout
+            texts = self.driver.execute_script(PROFILE_COUNTS_SCRIPT) or {}
+            while not texts.get('following') and time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                texts = self.driver.execute_script(PROFILE_COUNTS_SCRIPT) or {}
+        except Exception as e:
+            self.logger.warning(f"⚠️ Contagens do perfil não carregaram: {e}")
+            return counts
+
+        if not texts.get('following'):
+            self.logger.warning(f"⚠️ Contagens do perfil não carregaram em {self.timeout:g}s")
+            return counts
+
+        for name in counts:
+            if is_exact_count(texts.get(name)):
+                counts[name] = parse_count(texts[name])
+
+        self.logger.info(f"📊 Perfil: {counts['following']} following, {counts['followers']} followers")
+        return counts
+
+class CycleChangeDetector:
+    def __init__(self, read_counts: Callable[[], Dict[str, Optional[int]]], max_skip_hours: float = 6.0):
+        """
+        Decide se um ciclo agendado pode ser pulado
+
+        Args:
+            read_counts: Lê as contagens atuais (ex: ProfileCounter.read)
+            max_skip_hours: Executa o ciclo completo pelo menos a cada tantas horas
+        """
+        self.read_counts = read_counts
+        self.max_skip_hours = max_skip_hours
+        self.logger = logging.getLogger(__name__)
+
+    def unchanged_reason(self, state: Dict, pending_analyses: int = 0, now: Optional[datetime] = None) -> Optional[str]:
+        """
+        Compara as contagens atuais com as do último ciclo completo (guardadas por record)
+
+        Args:
+            state: Estado salvo pelo fluxo de unfollow
+            pending_analyses: Perfis adiados pelo orçamento de análise
+
+        Returns:
+            Motivo para pular o ciclo, ou None se há mudança, trabalho pendente ou falta referência
+        """
+        previous = state.get('profile_counts')
+        if not previous or not state.get('counts_recorded_at'):
+            return None
+
+        # Unfollows que não couberam no último ciclo ou perfis sem orçamento de análise: rodar mesmo assim
+        pending_unfollows = len(state.get('pending_unfollows', []))
+        if pending_unfollows or pending_analyses:
+            self.logger.info(f"📋 Trabalho pendente: {pending_unfollows} unfollows, {pending_analyses} análises adiadas")
+            return None
+
+        # Contagens iguais não garantem listas iguais (um follow + um unfollow): ciclo completo de tempos em tempos
+        now = now or datetime.now()
+        age_hours = (now - datetime.fromisoformat(state['counts_recorded_at'])).total_seconds() / 3600
+        if age_hours >= self.max_skip_hours:
+            self.logger.info(f"⏰ Último ciclo completo há {age_hours:.1f}h: executando mesmo sem mudanças")
+            return None
+
+        counts = self.read_counts()
+        if None in counts.values():
+            return None
+        if counts != previous:
+            self.logger.info(f"🔀 Contagens mudaram: {previous} → {counts}")
+            return None
+
+        return (f"Sem mudanças desde o último ciclo ({counts['following']} following, "
+                f"{counts['followers']} followers) e nenhum trabalho pendente")
+
+    def record(self, state: Dict, pending_unfollows: List[str], now: Optional[datetime] = None) -> Dict:
+        """
+        Guarda no estado as contagens do fim de um ciclo completo, com os unfollows que ficaram para depois
+
+        Returns:
+            O próprio state, atualizado
+        """
+        counts = self.read_counts()
+        state['pending_unfollows'] = list(pending_unfollows)
+        if None in counts.values():
+            # Sem contagens exatas não há referência: o próximo ciclo roda inteiro
+            state.pop('profile_counts', None)
+            state.pop('counts_recorded_at', None)
+        else:
+            state['profile_counts'] = dict(counts)
+            state['counts_recorded_at'] = (now or datetime.now()).isoformat()
+        return state
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Montagem dos prompts de análise de imunidade
+A parte fixa (instruções, critérios e formato de resposta) é renderizada uma única vez;
+só os campos do perfil, normalizados e limitados a um orçamento de tokens, mudam a cada chamada
+"""
+
+import math
+import re
+from typing import Dict, List
+
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+# Sequências de emojis/símbolos (incluindo variação e ZWJ) viram um único emoji
+EMOJI_RUN_PATTERN = re.compile(r"[\U0001F000-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF][\U0001F000-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF\uFE0F\u200D]+")
+REPEATED_CHAR_PATTERN = re.compile(r"(\S)\1{3,}")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimativa barata de tokens (~4 bytes UTF-8 por token; emojis e acentos pesam mais)
+    """
+    return math.ceil(len(text.encode("utf-8")) / 4) if text else 0
+
+def normalize_field(text: str, token_budget: int) -> str:
+    """
+    Normaliza um campo do perfil para o prompt e corta no orçamento de tokens
+
+    URLs viram [link], sequências de emojis viram um emoji só, caracteres repetidos
+    ("!!!!!!") são encurtados e espaços/quebras de linha são colapsados.
+    """
+    if not text:
+        return ""
+
+    text = URL_PATTERN.sub("[link]", text)
+    text = EMOJI_RUN_PATTERN.sub(lambda match: match.group(0)[0], text)
+    text = REPEATED_CHAR_PATTERN.sub(r"\1\1\1", text)
+    text = " ".join(text.split())
+
+    max_bytes = token_budget * 4
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+
+    cut = encoded[:max_bytes].decode("utf-8", "ignore")
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut + "…"
+
+class PromptBuilder:
+    def __init__(self, system_prompt: str, criteria: str, single_format: str, batch_format: str,
+                 bio_token_budget: int = 100, name_token_budget: int = 20, location_token_budget: int = 15):
+        """
+        Renderiza as partes fixas dos prompts
+
+        Args:
+            system_prompt: Instrução de sistema
+            criteria: Bloco de critérios de imunidade
+            single_format / batch_format: Formato de resposta para um perfil / para um lote
+            bio_token_budget / name_token_budget / location_token_budget: Tokens máximos de cada campo do perfil
+        """
+        self.bio_token_budget = bio_token_budget
+        self.name_token_budget = name_token_budget
+        self.location_token_budget = location_token_budget
+
+        # Prefixo idêntico em todas as chamadas (aproveita cache de prompt do provedor)
+        self.single_system = f"{system_prompt}\n\n{criteria}\n{single_format}"
+        self.batch_system = f"{system_prompt}\n\n{criteria}\n{batch_format}"
+        self.explain_system = f"{system_prompt}\n\n{criteria}"
+
+    def format_profile(self, username: str, display_name: str, description: str, location: str = "") -> str:
+        """
+        Formata os campos de um perfil (normalizados) para o prompt
+        """
+        return (f"- Username: @{username}\n"
+                f"- Nome: {normalize_field(display_name, self.name_token_budget)}\n"
+                f"- Bio: {normalize_field(description, self.bio_token_budget)}\n"
+                f"- Localização: {normalize_field(location, self.location_token_budget)}")
+
+    def single_messages(self, username: str, display_name: str, description: str, location: str = "") -> List[Dict]:
+        """
+        Mensagens para analisar um perfil
+        """
+        return [
+            {"role": "system", "content": self.single_system},
+            {"role": "user", "content": "Analise este perfil do Twitter/X e determine se a pessoa deve ser IMUNE ao unfollow automático.\n\n"
+                                        f"PERFIL:\n{self.format_profile(username, display_name, description, location)}"}
+        ]
+
+    def batch_messages(self, profiles: List[Dict]) -> List[Dict]:
+        """
+        Mensagens para analisar vários perfis em uma requisição
+        """
+        profile_blocks = "\n\n".join(
+            f"PERFIL {i}:\n" + self.format_profile(
+                profile['username'],
+                profile.get('display_name') or profile['username'],
+                profile.get('bio', ''),
+                profile.get('location', '')
+            )
+            for i, profile in enumerate(profiles, 1)
+        )
+
+        return [
+            {"role": "system", "content": self.batch_system},
+            {"role": "user", "content": f"Analise os {len(profiles)} perfis do Twitter/X abaixo e determine, para cada um, "
+                                        f"se a pessoa deve ser IMUNE ao unfollow automático.\n\n{profile_blocks}"}
+        ]
+
+    def explain_messages(self, result: Dict, username: str, display_name: str, description: str,
+                         location: str = "") -> List[Dict]:
+        """
+        Mensagens para explicar uma classificação já feita
+        """
+        return [
+            {"role": "system", "content": self.explain_system},
+            {"role": "user", "content": f"O perfil abaixo foi classificado como {result.get('category')} "
+                                        f"({result.get('immunity_status')}, confiança {result.get('confidence')}).\n"
+                                        "Em uma ou duas frases, explique o motivo dessa classificação com base nos critérios.\n\n"
+                                        f"PERFIL:\n{self.format_profile(username, display_name, description, location)}\n\n"
+                                        "Responda apenas com a explicação, em texto simples."}
+        ]
+
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Rate limiter adaptativo (token bucket) para as chamadas ao OpenRouter
+Respeita Retry-After, aplica backoff exponencial com jitter e ajusta a taxa conforme os limites observados
+"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Mapping, Optional
+
+class AdaptiveRateLimiter:
+    def __init__(self, rate: float = 5.0, burst: int = 5, min_rate: float = 0.2, max_rate: float = 20.0,
+                 increase_step: float = 0.1, decrease_factor: float = 0.5,
+                 base_backoff: float = 1.0, max_backoff: float = 60.0):
+        """
+        Cria o limitador
+
+        Args:
+            rate: Requisições por segundo iniciais
+            burst: Capacidade do bucket (rajada máxima)
+            min_rate / max_rate: Limites da taxa adaptativa
+            increase_step: Aumento aditivo da taxa a cada sucesso
+            decrease_factor: Fator multiplicativo aplicado à taxa a cada 429
+            base_backoff / max_backoff: Backoff exponencial (segundos) entre tentativas
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+        self.stats = {"acquired": 0, "throttled": 0, "waited_seconds": 0.0}
+
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def _reserve(self) -> float:
+        """
+        Reserva um token e retorna quanto tempo esperar antes de usá-lo
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+            # Tokens negativos representam reservas na fila
+            self.tokens -= 1.0
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            wait = max(wait, self.blocked_until - now)
+
+            self.stats["acquired"] += 1
+            self.stats["waited_seconds"] += wait
+            return wait
+
+    def acquire(self):
+        """
+        Bloqueia até poder fazer a próxima requisição (caminho síncrono)
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """
+        Aguarda até poder fazer a próxima requisição (caminho assíncrono)
+        """
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self, headers: Optional[Mapping[str, str]] = None):
+        """
+        Aumenta a taxa aos poucos e ajusta pelos cabeçalhos de limite, se houver
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+        if headers:
+            self.observe_headers(headers)
+
+    def on_rate_limited(self, headers: Optional[Mapping[str, str]] = None) -> float:
+        """
+        Reduz a taxa após um 429 e pausa todas as requisições pelo Retry-After
+
+        Returns:
+            Segundos de pausa aplicados
+        """
+        retry_after = parse_retry_after(headers.get("retry-after") if headers else None)
+
+        with self._lock:
+            now = time.monotonic()
+            # Vários 429 da mesma rajada (ainda dentro da pausa anterior) reduzem a taxa uma vez só
+            if now >= self.blocked_until:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.tokens = min(self.tokens, 0.0)
+            pause = retry_after if retry_after is not None else self.base_backoff
+            self.blocked_until = max(self.blocked_until, now + pause)
+            self.stats["throttled"] += 1
+
+        self.logger.warning(f"Limite de requisições atingido: pausa de {pause:.1f}s, taxa reduzida para {self.rate:.2f} req/s")
+        if headers:
+            self.observe_headers(headers)
+        return pause
+
+    def observe_headers(self, headers: Mapping[str, str]):
+        """
+        Usa X-RateLimit-Remaining/Reset para não ultrapassar a cota da janela atual
+        """
+        try:
+            remaining = headers.get("x-ratelimit-remaining")
+            reset = headers.get("x-ratelimit-reset")
+            if remaining is None or reset is None:
+                return
+
+            remaining = float(remaining)
+            reset = float(reset)
+            # OpenRouter envia o reset em milissegundos desde a época; outros provedores em segundos
+            if reset > 1e12:
+                reset /= 1000.0
+            window = reset - time.time() if reset > 1e9 else reset
+        except (TypeError, ValueError):
+            return
+
+        with self._lock:
+            if remaining <= 0 and window > 0:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + window)
+            elif window > 0:
+                # Distribuir o restante da cota pelo tempo que falta na janela
+                self.rate = max(self.min_rate, min(self.rate, self.max_rate, remaining / window))
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Backoff exponencial com jitter para a tentativa attempt (0, 1, 2...)
+        """
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
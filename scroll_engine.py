@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Scroll adaptativo para listas virtualizadas do X (following/followers)
+Em vez de dormir um tempo fixo, cada passo espera no próprio navegador até surgirem células novas
+ou a rede ficar ociosa, e o fim da lista só é declarado depois de várias paradas confirmadas
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+CELL_SELECTOR = '[data-testid="cellInnerDiv"]'
+
+# Instala (uma vez por página) o contador de células novas e de requisições em andamento
+PROBE_SCRIPT = """
+if (!window.__adaptiveScroll || window.__adaptiveScroll.selector !== arguments[0]) {
+    const selector = arguments[0];
+    const probe = { selector: selector, cells: 0, inflight: new Map(), nextId: 0,
+                    lastMutation: performance.now(), lastNetwork: performance.now() };
+    const countCells = (node) => {
+        if (node.nodeType !== Node.ELEMENT_NODE) return 0;
+        return node.matches(selector) ? 1 : node.querySelectorAll(selector).length;
+    };
+    probe.observer = new MutationObserver((mutations) => {
+        let added = 0;
+        mutations.forEach(m => m.addedNodes.forEach(node => { added += countCells(node); }));
+        if (added) {
+            probe.cells += added;
+            probe.lastMutation = performance.now();
+        }
+    });
+    probe.observer.observe(document.body, { childList: true, subtree: true });
+
+    // Requisições em andamento (id -> início); conexões longas anteriores ao passo são ignoradas (ver pendingSince)
+    probe.onStart = () => {
+        const id = probe.nextId++;
+        probe.inflight.set(id, performance.now());
+        probe.lastNetwork = performance.now();
+        return id;
+    };
+    probe.onFinish = (id) => {
+        probe.inflight.delete(id);
+        probe.lastNetwork = performance.now();
+    };
+    probe.pendingSince = (since) => {
+        let count = 0;
+        probe.inflight.forEach(start => { if (start >= since) count += 1; });
+        return count;
+    };
+    if (!window.__adaptiveScrollNetwork) {
+        const originalFetch = window.fetch;
+        window.fetch = function () {
+            const probe = window.__adaptiveScroll;
+            const id = probe ? probe.onStart() : null;
+            return originalFetch.apply(this, arguments).finally(() => probe && probe.onFinish(id));
+        };
+        const originalSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function () {
+            const probe = window.__adaptiveScroll;
+            if (probe) {
+                const id = probe.onStart();
+                this.addEventListener('loadend', () => probe.onFinish(id), { once: true });
+            }
+            return originalSend.apply(this, arguments);
+        };
+        window.__adaptiveScrollNetwork = true;
+    }
+
+    if (window.__adaptiveScroll) window.__adaptiveScroll.observer.disconnect();
+    window.__adaptiveScroll = probe;
+}
+"""
+
+# Um passo: rola, espera o resultado no navegador e (opcionalmente) avalia uma expressão de coleta
+STEP_SCRIPT = """
+const [stepViewports, timeoutMs, settleMs, idleMs, nudge, collectExpression] = arguments;
+const done = arguments[arguments.length - 1];
+const probe = window.__adaptiveScroll;
+const startCells = probe.cells;
+const startY = window.scrollY;
+const started = performance.now();
+
+if (nudge) window.scrollBy(0, -window.innerHeight);
+window.scrollBy(0, window.innerHeight * stepViewports * (nudge ? 2 : 1));
+
+const finish = (progress, reason) => {
+    let collected = null;
+    let collectError = null;
+    if (collectExpression) {
+        try { collected = (0, eval)(collectExpression); } catch (e) { collectError = String((e && e.stack) || e); }
+    }
+    done({ progress: progress, reason: reason, newCells: probe.cells - startCells,
+           elapsedMs: performance.now() - started, collected: collected, collectError: collectError });
+};
+
+const check = () => {
+    const now = performance.now();
+    const grew = probe.cells > startCells;
+    const pending = probe.pendingSince(started);
+    const quiet = pending === 0 && now - probe.lastMutation >= settleMs;
+    const atBottom = window.innerHeight + window.scrollY >= document.body.scrollHeight - 2;
+
+    if (grew && quiet) return finish(true, 'cells');
+    // Andou por conteúdo já carregado: nada a esperar
+    if (!atBottom && window.scrollY > startY && quiet && now - started >= settleMs) return finish(true, 'moved');
+    // No fim da página, sem células novas e com a rede ociosa: parada
+    if (atBottom && !grew && pending === 0 && now - Math.max(started, probe.lastNetwork) >= idleMs) return finish(false, 'idle');
+    if (now - started >= timeoutMs) return finish(grew, 'timeout');
+    setTimeout(check, 50);
+};
+check();
+"""
+
+class ScrollCollectError(Exception):
+    """
+    A expressão de coleta de um passo levantou um erro no navegador
+    """
+
+class AdaptiveScroller:
+    def __init__(self, driver, cell_selector: str = CELL_SELECTOR, step_viewports: float = 1.0,
+                 timeout: float = 8.0, settle: float = 0.25, idle: float = 1.0, stall_confirmations: int = 3):
+        """
+        Prepara o scroll adaptativo na página atual do driver
+
+        Args:
+            driver: WebDriver do Selenium já na página da lista
+            cell_selector: Seletor das células da lista
+            step_viewports: Quantas alturas de tela rolar por passo
+            timeout: Espera máxima (segundos) por passo
+            settle: Tempo sem mutações (e sem requisições pendentes) para considerar as células novas prontas
+            idle: Tempo de rede ociosa no fim da página para considerar o passo uma parada
+            stall_confirmations: Paradas seguidas para declarar o fim da lista
+        """
+        self.driver = driver
+        self.cell_selector = cell_selector
+        self.step_viewports = step_viewports
+        self.timeout = timeout
+        self.settle = settle
+        self.idle = idle
+        self.stall_confirmations = max(1, stall_confirmations)
+
+        self.stalls = 0
+        self.stats = {"steps": 0, "stalls": 0, "new_cells": 0, "seconds": 0.0}
+        self.logger = logging.getLogger(__name__)
+
+        self.driver.set_script_timeout(timeout + 10)
+        self._install()
+
+    def _install(self):
+        self.driver.execute_script(PROBE_SCRIPT, self.cell_selector)
+
+    @property
+    def at_end(self) -> bool:
+        """
+        True depois de stall_confirmations paradas seguidas
+        """
+        return self.stalls >= self.stall_confirmations
+
+    def step(self, collect_expression: Optional[str] = None) -> Tuple[Dict, Any]:
+        """
+        Rola um passo e espera células novas, rede ociosa ou o timeout
+
+        Depois de uma parada, o passo seguinte sobe uma tela e desce de novo para forçar o carregamento.
+
+        Args:
+            collect_expression: Expressão JS avaliada no fim do passo, na mesma chamada (ex: esvaziar um buffer)
+
+        Returns:
+            (informações do passo, resultado de collect_expression)
+
+        Raises:
+            ScrollCollectError se collect_expression falhar no navegador (o passo de scroll já foi feito)
+        """
+        started = time.perf_counter()
+        # A página pode ter sido recarregada (SPA): reinstalar o contador se sumiu
+        self._install()
+        result = self.driver.execute_async_script(
+            STEP_SCRIPT, self.step_viewports, self.timeout * 1000, self.settle * 1000, self.idle * 1000,
+            self.stalls > 0, collect_expression
+        )
+
+        self.stats["steps"] += 1
+        self.stats["new_cells"] += result.get("newCells", 0)
+        self.stats["seconds"] += time.perf_counter() - started
+
+        if result.get("progress"):
+            self.stalls = 0
+        else:
+            self.stalls += 1
+            self.stats["stalls"] += 1
+            self.logger.debug(f"Parada {self.stalls}/{self.stall_confirmations} no scroll ({result.get('reason')})")
+
+        if result.get("collectError"):
+            raise ScrollCollectError(f"Erro na expressão de coleta: {result['collectError']}")
+        return result, result.get("collected")
+
+    def log_stats(self):
+        """
+        Registra no log o resumo do scroll
+        """
+        steps = self.stats["steps"]
+        average = self.stats["seconds"] / steps if steps else 0.0
+        self.logger.info(f"📜 Scroll: {steps} passos em {self.stats['seconds']:.1f}s "
+                         f"({average:.2f}s/passo), {self.stats['new_cells']} células novas, {self.stats['stalls']} paradas")
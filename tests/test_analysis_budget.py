@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Testes do orçamento das análises por IA (AnalysisBudget)
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from analysis_budget import AnalysisBudget, BudgetExceededError
+
+MODEL = "anthropic/claude-3-haiku"
+
+def test_cost_uses_model_prices():
+    budget = AnalysisBudget(path=None)
+    assert budget.cost(MODEL, 1_000_000, 1_000_000) == pytest.approx(1.5)
+    assert budget.cost("desconhecido", 1_000_000, 0) == pytest.approx(3.0)
+
+def test_record_counts_against_run_limit():
+    budget = AnalysisBudget(run_tokens=1000, path=None)
+    budget.start_run()
+    budget.record(MODEL, 600, 300)
+    assert budget.exceeded() is None
+
+    budget.record(MODEL, 100, 0)
+    assert "tokens" in budget.exceeded()
+    with pytest.raises(BudgetExceededError):
+        budget.check()
+
+    # Uma execução nova zera o consumo da execução
+    budget.start_run()
+    assert budget.exceeded() is None
+
+def test_reserve_rejects_calls_that_do_not_fit():
+    budget = AnalysisBudget(run_tokens=1000, path=None)
+    budget.start_run()
+    with pytest.raises(BudgetExceededError):
+        budget.reserve(MODEL, 900, 200)
+
+def test_reserve_waits_for_calls_in_flight():
+    budget = AnalysisBudget(run_tokens=1000, path=None)
+    budget.start_run()
+
+    first = budget.reserve(MODEL, 400, 200)
+    assert first is not None
+    # Sozinha caberia, mas não junto com a chamada em andamento
+    assert budget.reserve(MODEL, 400, 200) is None
+
+    budget.release(first)
+    assert budget.reserve(MODEL, 400, 200) is not None
+
+def test_wait_reserve_wakes_up_on_release():
+    budget = AnalysisBudget(run_tokens=1000, path=None)
+    budget.start_run()
+    first = budget.reserve(MODEL, 400, 200)
+    reserved = []
+
+    waiter = threading.Thread(target=lambda: reserved.append(budget.wait_reserve(MODEL, 400, 200)))
+    waiter.start()
+    time.sleep(0.05)
+    assert not reserved
+
+    budget.release(first)
+    waiter.join(timeout=1)
+    assert reserved and budget.reserved["tokens"] == 600
+
+def test_reserve_async_wakes_up_on_release():
+    budget = AnalysisBudget(run_tokens=1000, path=None)
+    budget.start_run()
+    first = budget.reserve(MODEL, 400, 200)
+
+    async def main():
+        waiter = asyncio.ensure_future(budget.reserve_async(MODEL, 400, 200))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        budget.release(first)
+        return await asyncio.wait_for(waiter, timeout=1)
+
+    assert asyncio.run(main())["tokens"] == 600
+
+def test_deferred_queue_keeps_order_and_persists(tmp_path):
+    path = str(tmp_path / "budget.json")
+    budget = AnalysisBudget(path=path)
+    budget.defer(["Ana", "bruno"])
+    budget.defer(["carla", "ana"])
+    assert budget.pending() == ["ana", "bruno", "carla"]
+
+    budget.resolve(["BRUNO"])
+    assert AnalysisBudget(path=path).pending() == ["ana", "carla"]
+
+def test_old_deferred_profiles_are_dropped_on_load(tmp_path):
+    path = tmp_path / "budget.json"
+    old = time.time() - 8 * 24 * 3600
+    path.write_text(json.dumps({"day": "2000-01-01", "usage": {"tokens": 10}, "deferred": [["velho", old], ["novo", time.time()]]}))
+
+    budget = AnalysisBudget(path=str(path), max_deferred_days=7)
+    assert budget.pending() == ["novo"]
+    # Consumo de outro dia não conta
+    assert budget.day_usage["tokens"] == 0
+
+def test_from_env(monkeypatch):
+    for variable in ("ANALYSIS_BUDGET_RUN_TOKENS", "ANALYSIS_BUDGET_RUN_DOLLARS", "ANALYSIS_BUDGET_RUN_SECONDS",
+                     "ANALYSIS_BUDGET_DAY_TOKENS", "ANALYSIS_BUDGET_DAY_DOLLARS", "ANALYSIS_BUDGET_DAY_SECONDS"):
+        monkeypatch.delenv(variable, raising=False)
+    assert AnalysisBudget.from_env(path=None) is None
+
+    monkeypatch.setenv("ANALYSIS_BUDGET_DAY_DOLLARS", "0.5")
+    budget = AnalysisBudget.from_env(path=None)
+    assert budget.limits["day"]["dollars"] == 0.5
+    assert budget.limits["run"]["tokens"] is None
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Testes do circuit breaker das chamadas à IA
+"""
+
+import time
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+def open_breaker(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker(**kwargs)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    return breaker
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.stats["opened"] == 1
+    assert breaker.stats["rejected"] == 2
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = open_breaker(failure_threshold=1, reset_timeout=0.05)
+    time.sleep(0.06)
+
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+    assert breaker.stats["probes"] == 1
+
+    breaker.record_success()
+    assert breaker.is_closed
+    assert breaker.allow_request()
+
+def test_failed_probe_reopens_with_longer_timeout():
+    breaker = open_breaker(failure_threshold=1, reset_timeout=0.05, max_reset_timeout=0.15)
+    time.sleep(0.06)
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.reset_timeout == pytest.approx(0.1)
+    time.sleep(0.06)
+    assert not breaker.allow_request()
+
+    # O timeout dobra a cada teste que falha, até max_reset_timeout, e volta ao normal quando a IA responde
+    time.sleep(0.05)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.reset_timeout == pytest.approx(0.15)
+    time.sleep(0.16)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.reset_timeout == pytest.approx(0.05)
+
+def test_lost_probe_does_not_block_the_circuit():
+    breaker = open_breaker(failure_threshold=1, reset_timeout=0.05)
+    time.sleep(0.06)
+    assert breaker.allow_request()
+
+    # O teste nunca voltou (tarefa cancelada): depois de reset_timeout outro teste pode passar
+    assert not breaker.allow_request()
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert breaker.stats["probes"] == 2
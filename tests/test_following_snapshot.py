@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Testes do snapshot de following (sincronização incremental) com as páginas do mock_x_server
+"""
+
+from following_snapshot import FollowingSnapshot
+from graph_capture import parse_timeline_response
+from mock_x_server import parse_cursor, timeline_page
+
+PAGE_SIZE = 20
+
+def make_fetcher(following: dict):
+    """
+    Timeline com os usuários mock de following["start"] até following["total"] (diminuir start = follows novos no topo)
+    """
+    def fetch_page(cursor):
+        offset = parse_cursor(cursor) if cursor else following["start"]
+        return parse_timeline_response(timeline_page(following["total"], offset, PAGE_SIZE))
+    return fetch_page
+
+def test_first_sync_stops_at_max_users():
+    snapshot = FollowingSnapshot(path=None)
+    observed = snapshot.sync(make_fetcher({"start": 0, "total": 500}), max_users=30)
+
+    # Três páginas do topo (13 + 13 + 14 não-seguidores) e nenhuma profunda
+    assert len(observed) == 60 and len(snapshot) == 60
+    assert sum(1 for user in observed if not user['follows_you']) == 40
+    assert parse_cursor(snapshot.deep_cursor) == 60
+    assert snapshot.stats["deep_pages"] == 0
+
+def test_later_cycle_only_reads_new_follows_from_the_top():
+    following = {"start": 100, "total": 160}
+    snapshot = FollowingSnapshot(path=None, known_run=5, max_head_pages=3)
+    assert len(snapshot.sync(make_fetcher(following))) == 60
+    assert snapshot.sweeps_completed == 1 and snapshot.deep_cursor is None
+
+    # O topo para na primeira página, nos conhecidos; a varredura nova segue pelas páginas profundas
+    following["start"] = 90
+    head_pages, new = snapshot.stats["head_pages"], snapshot.stats["new"]
+    observed = snapshot.sync(make_fetcher(following))
+
+    assert [user['username'] for user in observed[:10]] == [f"mock_user{index:05d}" for index in range(90, 100)]
+    assert snapshot.stats["head_pages"] - head_pages == 1
+    assert snapshot.stats["new"] - new == 10 and len(snapshot) == 70
+
+def test_completed_sweep_removes_unfollowed_accounts():
+    following = {"start": 0, "total": 100}
+    snapshot = FollowingSnapshot(path=None, known_run=5, max_head_pages=1, deep_pages=2)
+    snapshot.sync(make_fetcher(following))
+    snapshot.sync(make_fetcher(following))
+    snapshot.sync(make_fetcher(following))
+    assert snapshot.sweeps_completed == 1 and len(snapshot) == 100
+
+    # Os 10 últimos deixaram de ser seguidos fora do bot; só somem quando a varredura seguinte chega ao fim
+    following["total"] = 90
+    snapshot.sync(make_fetcher(following))
+    assert len(snapshot) == 100
+    while snapshot.sweeps_completed < 2:
+        snapshot.sync(make_fetcher(following))
+
+    assert len(snapshot) == 90 and snapshot.stats["removed"] == 10
+    assert "2000095" not in snapshot and "2000089" in snapshot
+
+def test_find_and_remove_by_username():
+    snapshot = FollowingSnapshot(path=None)
+    snapshot.sync(make_fetcher({"start": 0, "total": 10}))
+
+    found = snapshot.find(["MOCK_USER00004", "ninguem", "mock_user00002"])
+    assert [user['username'] for user in found] == ["mock_user00004", "mock_user00002"]
+    assert "first_seen" not in found[0] and "last_seen" not in found[0]
+    assert found[0]['follows_you'] is False
+
+    snapshot.remove(["Mock_User00004"])
+    assert snapshot.find(["mock_user00004"]) == [] and len(snapshot) == 9
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "following_snapshot.json")
+    snapshot = FollowingSnapshot(path=path)
+    snapshot.sync(make_fetcher({"start": 0, "total": 500}), max_users=10)
+
+    loaded = FollowingSnapshot(path=path)
+    assert loaded.users == snapshot.users
+    assert loaded.deep_cursor == snapshot.deep_cursor
+    assert loaded.sweep_started_at == snapshot.sweep_started_at
+    assert not (tmp_path / "following_snapshot.json.tmp").exists()
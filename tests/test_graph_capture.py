@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Testes da leitura das timelines GraphQL (captura de rede e exportação paginada) com as páginas do mock_x_server
+"""
+
+import json
+
+from graph_capture import GraphQLCapture, parse_timeline_response
+from graph_export import GraphExporter
+from mock_x_server import MOCK_BEARER, mock_user, parse_cursor, timeline_page
+
+TEMPLATE_URL = "/i/api/graphql/mockQueryId/Following?variables=%7B%22userId%22%3A%221000%22%2C%22count%22%3A20%7D"
+
+def test_parse_timeline_page():
+    users, cursor = parse_timeline_response(timeline_page(total=50, offset=0, count=20))
+
+    assert len(users) == 20
+    assert users[0] == {
+        'user_id': '2000000', 'username': 'mock_user00000', 'display_name': 'Mock User 0',
+        'bio': mock_user(0)['legacy']['description'], 'location': '', 'followers_count': 0,
+        'following_count': 0, 'verified': True, 'follows_you': True
+    }
+    assert [u['follows_you'] for u in users[:3]] == [True, False, False]
+    assert users[1]['location'] == "Brasil"
+    assert parse_cursor(cursor) == 20
+
+def test_last_page_has_no_next_cursor():
+    users, cursor = parse_timeline_response(timeline_page(total=50, offset=40, count=20))
+    assert len(users) == 10 and cursor is not None
+
+    # Como no X, depois da última página ainda vem uma página só com cursores
+    users, cursor = parse_timeline_response(timeline_page(total=50, offset=50, count=20))
+    assert users == [] and cursor is None
+
+def test_follow_cursor_through_the_whole_list():
+    collected, cursor = [], None
+    while True:
+        users, cursor = parse_timeline_response(timeline_page(total=95, offset=parse_cursor(cursor), count=20))
+        collected.extend(users)
+        if cursor is None:
+            break
+    assert [u['user_id'] for u in collected] == [str(2000000 + i) for i in range(95)]
+
+class FakeCaptureDriver:
+    """
+    Log de performance com as respostas da timeline (uma página por requestId)
+    """
+    def __init__(self, pages):
+        self.pages = pages
+        self.events = []
+        for request_id in pages:
+            url = f"https://x.com{TEMPLATE_URL}&r={request_id}"
+            self.events += [
+                {"method": "Network.requestWillBeSent",
+                 "params": {"requestId": request_id, "request": {"url": url, "headers": {"authorization": MOCK_BEARER}}}},
+                {"method": "Network.responseReceived", "params": {"requestId": request_id, "response": {"url": url}}},
+                {"method": "Network.loadingFinished", "params": {"requestId": request_id}},
+            ]
+
+    def execute_cdp_cmd(self, command, params):
+        if command == "Network.getResponseBody":
+            return {"body": json.dumps(self.pages[params["requestId"]])}
+        return {}
+
+    def get_log(self, kind):
+        events, self.events = self.events, []
+        return [{"message": json.dumps({"message": event})} for event in events]
+
+def test_capture_deduplicates_users_across_responses():
+    driver = FakeCaptureDriver({"1": timeline_page(100, 0, 20), "2": timeline_page(100, 10, 20)})
+    capture = GraphQLCapture(driver)
+
+    users = capture.poll()
+    assert len(users) == 30
+    assert parse_cursor(capture.last_cursor) == 30
+    assert capture.templates["Following"]["headers"] == {"authorization": MOCK_BEARER}
+    assert capture.poll() == []
+
+class FakeExportDriver:
+    """
+    Responde ao FETCH_PAGE_SCRIPT como o mock_x_server, sem navegador
+    """
+    def __init__(self, total, fail_after=None):
+        self.total = total
+        self.fail_after = fail_after
+        self.requests = 0
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def execute_async_script(self, script, url, headers, cursor, count):
+        self.requests += 1
+        if self.fail_after is not None and self.requests > self.fail_after:
+            return {"status": 401, "body": '{"errors": []}'}
+        return {"status": 200, "body": json.dumps(timeline_page(self.total, parse_cursor(cursor), count))}
+
+def test_export_resumes_from_saved_cursor(tmp_path):
+    state_path = str(tmp_path / "state.json")
+    output_path = str(tmp_path / "following.jsonl")
+    template = {"url": TEMPLATE_URL, "headers": {"authorization": MOCK_BEARER, "cookie": "ct0=x"}}
+
+    first = GraphExporter(FakeExportDriver(250, fail_after=2), state_path=state_path, output_path=output_path,
+                          page_size=100, delay=0)
+    first.set_template(template)
+    pages = first.iter_pages()
+    assert len(next(pages)) == 100
+    assert len(next(pages)) == 100
+    assert not first.done
+
+    second = GraphExporter(FakeExportDriver(250), state_path=state_path, output_path=output_path, page_size=100, delay=0)
+    assert second.stats["resumed"]
+    assert len(second.export()) == 50
+    assert second.done
+
+    with open(output_path, encoding="utf-8") as f:
+        exported = [json.loads(line)["user_id"] for line in f]
+    assert exported == [str(2000000 + i) for i in range(250)]
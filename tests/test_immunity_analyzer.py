@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Testes do ImmunityAnalyzer com as chamadas à IA substituídas por respostas fixas
+"""
+
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("numpy")
+
+from analyzer_backends import AnalyzerBackend
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from immunity_analyzer import ImmunityAnalyzer
+
+PROFILES = [
+    {"username": "ana", "display_name": "Ana", "bio": "Fotógrafa e viajante", "location": ""},
+    {"username": "bruno", "display_name": "Bruno", "bio": "Futebol, memes e churrasco", "location": ""},
+    {"username": "carla", "display_name": "Carla", "bio": "Mãe de pet, leitora e cozinheira", "location": ""},
+]
+
+def make_analyzer(**kwargs) -> ImmunityAnalyzer:
+    backend = AnalyzerBackend(name="mock", base_url="http://127.0.0.1:9/v1")
+    kwargs.setdefault("fast_model", None)
+    kwargs.setdefault("cache_path", ":memory:")
+    return ImmunityAnalyzer("sem-chave", backends=[backend], classifier_path=None,
+                            allowlist=[], denylist=[], extra_keywords=[], budget=None, **kwargs)
+
+def response(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+def answer(messages) -> str:
+    """
+    Todos os perfis do prompt como não imunes (lote) ou um único resultado (perfil individual)
+    """
+    text = "\n".join(message["content"] for message in messages)
+    usernames = re.findall(r"- Username: @(\S+)", text)
+    if len(usernames) > 1:
+        return json.dumps([{"u": u, "c": "OTHER", "i": 0, "p": 0.9} for u in usernames])
+    return json.dumps({"c": "OTHER", "i": 0, "p": 0.9})
+
+def test_batch_path_looks_up_cache_once_per_profile():
+    analyzer = make_analyzer()
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return response(answer(kwargs["messages"]))
+    analyzer._create_completion_async = create
+
+    results = analyzer.analyze_users_concurrently(PROFILES)
+    assert [r["immunity_status"] for r in results] == ["not_immune"] * 3
+    assert len(calls) == 1
+    stats = analyzer.get_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (0, 3)
+
+    # Segundo ciclo: tudo vem do cache, sem chamar a IA
+    analyzer.analyze_users_concurrently(PROFILES)
+    stats = analyzer.get_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (3, 3)
+    assert len(calls) == 1
+
+@pytest.mark.parametrize("failure, tier", [(ValueError("resposta inválida"), "error"),
+                                           (CircuitOpenError("circuito aberto"), "failover")])
+def test_failed_representative_is_not_reused_for_near_duplicates(failure, tier):
+    analyzer = make_analyzer()
+    bio = "Fotógrafa, viajante e apaixonada por café coado e montanhas"
+    profiles = [{"username": "ana", "display_name": "Ana", "bio": bio, "location": ""},
+                {"username": "bia", "display_name": "Bia", "bio": bio, "location": ""}]
+
+    async def create(**kwargs):
+        if "@ana" in "\n".join(message["content"] for message in kwargs["messages"]):
+            raise failure
+        return response(answer(kwargs["messages"]))
+    analyzer._create_completion_async = create
+
+    ana, bia = analyzer.analyze_users_concurrently(profiles)
+    assert ana["tier"] == tier
+    assert "tier" not in bia and bia["category"] == "OTHER"
+    assert analyzer.tier_hits["similar"] == 0
+    assert analyzer.bio_index.query(bio)[1][0] == "bia"
+    assert len(analyzer.immunity_cache) == 1
+
+def test_hedge_skips_backend_with_open_circuit():
+    primary = AnalyzerBackend(name="primary", base_url="http://127.0.0.1:9/v1", max_concurrency=2)
+    broken = AnalyzerBackend(name="broken", base_url="http://127.0.0.1:10/v1", weight=100,
+                             circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    broken.circuit_breaker.record_failure()
+    analyzer = ImmunityAnalyzer("sem-chave", cache_path=":memory:", backends=[primary, broken], classifier_path=None,
+                                budget=None)
+
+    assert analyzer.backends.acquire() is primary
+    assert analyzer._try_acquire_hedge_backend(primary) is primary
+    assert broken.in_flight == 0
+
+    analyzer.backends.release(primary)
+    assert analyzer._try_acquire_hedge_backend(primary) is primary
+    assert analyzer._try_acquire_hedge_backend(primary) is None
+
+def test_iter_analyses_leaves_the_loop_clients_to_the_loop_owner():
+    analyzer = make_analyzer()
+    backend = analyzer.backends.backends[0]
+
+    async def create(**kwargs):
+        return response(answer(kwargs["messages"]))
+    analyzer._create_completion_async = create
+
+    async def two_analyses_on_one_loop():
+        client = backend.async_client()
+        async def consume(profiles):
+            return [item async for item in analyzer.iter_analyses(profiles)]
+        await asyncio.gather(consume(PROFILES[:2]), consume(PROFILES[2:]))
+        # Uma análise terminar não fecha o cliente que a outra (ou quem criou o loop) ainda usa
+        assert backend._async_client is client
+
+    asyncio.run(two_analyses_on_one_loop())
+
+    analyzer.analyze_users_concurrently([{**PROFILES[0], "username": "outra"}])
+    assert backend._async_client is None
+
+@pytest.mark.parametrize("content, confidence", [('{"c": "OTHER", "i": 0, "p": "alta"}', 0.5),
+                                                 ('{"c": "OTHER", "i": 0, "p": null}', 0.5),
+                                                 ('{"c": "OTHER", "i": 0, "p": 7}', 1.0)])
+def test_parse_response_coerces_confidence(content, confidence):
+    result = make_analyzer()._parse_response(content)
+    assert result["immunity_status"] == "not_immune"
+    assert result["confidence"] == confidence
+
+def test_parse_response_rejects_unknown_status():
+    content = json.dumps({"category": "ENGINEER", "immunity_status": "maybe", "confidence": 0.9})
+    result = make_analyzer()._parse_response(content)
+    assert (result["immunity_status"], result["reasoning"]) == ("not_immune", "Resposta incompleta da IA")
+
+def malformed_fast_answer(analyzer):
+    """
+    O modelo rápido responde algo que o parser não aceita; o forte responde imune
+    """
+    parse = analyzer._parse_response
+    def parse_or_fail(content):
+        if content == "quebrado":
+            raise ValueError("resposta malformada")
+        return parse(content)
+    analyzer._parse_response = parse_or_fail
+    
+    def content(model):
+        return "quebrado" if model == "fast" else json.dumps({"c": "ENGINEER", "i": 1, "p": 0.95})
+    return content
+
+def test_malformed_answer_escalates_instead_of_aborting_the_run():
+    analyzer = make_analyzer(fast_model="fast", strong_model="strong")
+    content = malformed_fast_answer(analyzer)
+
+    async def create(**kwargs):
+        return response(content(kwargs["model"]))
+    analyzer._create_completion_async = create
+
+    [result] = analyzer.analyze_users_concurrently(PROFILES[:1])
+    assert (result["category"], result["immunity_status"]) == ("ENGINEER", "immune")
+    assert analyzer.routing_stats == {"routed": 1, "escalations": 1}
+
+def test_malformed_answer_escalates_in_the_sync_path():
+    analyzer = make_analyzer(fast_model="fast", strong_model="strong")
+    content = malformed_fast_answer(analyzer)
+    analyzer._create_completion = lambda **kwargs: response(content(kwargs["model"]))
+
+    result = analyzer.analyze_user_immunity(*analyzer._profile_fields(PROFILES[0]))
+    assert (result["category"], result["immunity_status"]) == ("ENGINEER", "immune")
+
+@pytest.mark.parametrize("batch_size", [1, 20])
+def test_unexpected_failure_only_affects_its_profile(batch_size):
+    analyzer = make_analyzer(batch_size=batch_size)
+
+    async def create(**kwargs):
+        return response(answer(kwargs["messages"]))
+    analyzer._create_completion_async = create
+
+    # Falha fora das chamadas à IA (ex: bug no parser) no lote inteiro e no perfil de bruno
+    analyze_one = analyzer._analyze_with_model_async
+    async def analyze_or_fail(username, *fields):
+        if username == "bruno":
+            raise TypeError("falha inesperada")
+        return await analyze_one(username, *fields)
+    async def failing_batch(profiles):
+        raise TypeError("falha inesperada no lote")
+    analyzer._analyze_with_model_async = analyze_or_fail
+    analyzer._analyze_batch_with_model_async = failing_batch
+
+    ana, bruno, carla = analyzer.analyze_users_concurrently(PROFILES)
+    assert (bruno["immunity_status"], bruno["tier"]) == ("immune", "error")
+    assert ana["immunity_status"] == carla["immunity_status"] == "not_immune"
+    assert "tier" not in ana and "tier" not in carla
+
+def test_cache_version_follows_response_mode_and_bio_budget(tmp_path):
+    path = str(tmp_path / "immunity_cache.db")
+    profile = PROFILES[0]
+    result = {"category": "OTHER", "immunity_status": "not_immune", "confidence": 0.9, "reasoning": ""}
+    make_analyzer(cache_path=path)._cache_set(profile["username"], "Ana", profile["bio"], "", result)
+
+    assert make_analyzer(cache_path=path, response_mode="compact")._cache_get(profile["username"], "Ana", profile["bio"]) == result
+    assert make_analyzer(cache_path=path, response_mode="full")._cache_get(profile["username"], "Ana", profile["bio"]) is None
+    assert make_analyzer(cache_path=path, bio_token_budget=40)._cache_get(profile["username"], "Ana", profile["bio"]) is None
+
+@pytest.mark.parametrize("entry, expanded", [
+    ({"u": "ana", "c": "ENGINEER", "i": 1, "p": 0.9},
+     {"username": "ana", "category": "ENGINEER", "immunity_status": "immune", "confidence": 0.9, "reasoning": ""}),
+    ({"c": "OTHER", "i": "false", "p": 0.8},
+     {"category": "OTHER", "immunity_status": "not_immune", "confidence": 0.8, "reasoning": ""}),
+    ({"c": "OTHER"}, {"category": "OTHER", "reasoning": ""}),
+    ({"category": "OTHER", "c": "x"}, {"category": "OTHER", "c": "x"}),
+    (["não", "é", "dict"], ["não", "é", "dict"]),
+])
+def test_expand_compact(entry, expanded):
+    assert make_analyzer()._expand_compact(entry) == expanded
+
+def test_parse_compact_single_response():
+    result = make_analyzer()._parse_response('```json\n{"c": "RESEARCHER", "i": 1, "p": 0.92}\n```')
+    assert result == {"category": "RESEARCHER", "immunity_status": "immune", "confidence": 0.92, "reasoning": ""}
+
+def test_parse_compact_batch_response():
+    content = json.dumps([{"u": "@Ana", "c": "ENGINEER", "i": 1, "p": 0.9},
+                          {"u": "bruno", "c": "OTHER", "i": 0, "p": "alta"},
+                          {"u": "carla", "c": "OTHER", "i": 0},
+                          {"u": "intrusa", "c": "OTHER", "i": 0, "p": 0.9}])
+    parsed = make_analyzer()._parse_batch_response(content, PROFILES)
+
+    assert parsed == {"ana": {"category": "ENGINEER", "immunity_status": "immune", "confidence": 0.9, "reasoning": ""}}
+
+def test_explain_rows_only_explains_low_confidence_rows():
+    analyzer = make_analyzer()
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return response("Bio sem nenhum sinal de trabalho com tecnologia.")
+    analyzer._create_completion = create
+
+    rows = [{**PROFILES[0], "category": "OTHER", "immunity_status": "not_immune", "confidence": 0.6, "reasoning": ""},
+            {**PROFILES[1], "category": "OTHER", "immunity_status": "not_immune", "confidence": 0.9, "reasoning": ""},
+            {**PROFILES[2], "category": "OTHER", "immunity_status": "not_immune", "confidence": 0.5, "reasoning": "já explicado"}]
+
+    assert analyzer.explain_rows(rows, confidence_below=0.75) == 1
+    assert rows[0]["reasoning"] == "Bio sem nenhum sinal de trabalho com tecnologia."
+    assert (rows[1]["reasoning"], rows[2]["reasoning"]) == ("", "já explicado")
+    assert len(calls) == 1 and calls[0]["model"] == analyzer.strong_model
+
+    # A explicação fica no cache: explicar de novo não chama a IA
+    assert analyzer.explain("ana", "Ana", PROFILES[0]["bio"]) == "Bio sem nenhum sinal de trabalho com tecnologia."
+    assert len(calls) == 1
+
+def routed_answers(fast: dict):
+    """
+    Completions falsas: o modelo rápido responde fast[username] (categoria, imune, confiança); o forte, ENGINEER/imune
+    """
+    calls = []
+
+    async def create(**kwargs):
+        text = "\n".join(message["content"] for message in kwargs["messages"])
+        usernames = re.findall(r"- Username: @(\S+)", text)
+        calls.append((kwargs["model"], usernames))
+        entries = [{"u": u, "c": "ENGINEER", "i": 1, "p": 0.95} if kwargs["model"] == "strong" else
+                   {"u": u, "c": fast[u][0], "i": fast[u][1], "p": fast[u][2]} for u in usernames]
+        batch = "ARRAY JSON" in text
+        return response(json.dumps(entries if batch else {k: v for k, v in entries[0].items() if k != "u"}))
+    return create, calls
+
+@pytest.mark.parametrize("fast_answer, escalated", [(("OTHER", 0, 0.5), True),
+                                                    (("OTHER", 1, 0.95), True),
+                                                    (("OTHER", 0, 0.95), False)])
+def test_fast_answer_escalates_only_when_doubtful(fast_answer, escalated):
+    analyzer = make_analyzer(fast_model="fast", strong_model="strong")
+    analyzer._create_completion_async, calls = routed_answers({"ana": fast_answer})
+
+    [result] = analyzer.analyze_users_concurrently(PROFILES[:1])
+
+    assert [model for model, _ in calls] == (["fast", "strong"] if escalated else ["fast"])
+    assert result["category"] == ("ENGINEER" if escalated else "OTHER")
+    stats = analyzer.get_routing_stats()
+    assert (stats["routed"], stats["escalations"]) == (1, int(escalated))
+
+def test_batch_escalates_only_doubtful_profiles():
+    analyzer = make_analyzer(fast_model="fast", strong_model="strong")
+    analyzer._create_completion_async, calls = routed_answers({"ana": ("OTHER", 0, 0.9), "bruno": ("OTHER", 0, 0.4),
+                                                               "carla": ("RESEARCHER", 1, 0.9)})
+
+    ana, bruno, carla = analyzer.analyze_users_concurrently(PROFILES)
+
+    assert calls == [("fast", ["ana", "bruno", "carla"]), ("strong", ["bruno"])]
+    assert (ana["category"], bruno["category"], carla["category"]) == ("OTHER", "ENGINEER", "RESEARCHER")
+    stats = analyzer.get_routing_stats()
+    assert (stats["routed"], stats["escalations"], stats["escalation_rate"]) == (3, 1, 0.333)
+
+def test_failed_strong_model_keeps_the_fast_answer():
+    analyzer = make_analyzer(fast_model="fast", strong_model="strong")
+    create, _ = routed_answers({"ana": ("OTHER", 0, 0.5)})
+
+    async def strong_fails(**kwargs):
+        if kwargs["model"] == "strong":
+            raise ValueError("modelo forte fora do ar")
+        return await create(**kwargs)
+    analyzer._create_completion_async = strong_fails
+
+    [result] = analyzer.analyze_users_concurrently(PROFILES[:1])
+    assert (result["category"], result["confidence"]) == ("OTHER", 0.5)
+    assert analyzer.routing_stats == {"routed": 1, "escalations": 1}
+
+def test_concurrent_async_calls_share_one_analysis():
+    analyzer = make_analyzer()
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.01)
+        return response(answer(kwargs["messages"]))
+    analyzer._create_completion_async = create
+
+    async def run():
+        fields = analyzer._profile_fields(PROFILES[0])
+        first = asyncio.ensure_future(analyzer.analyze_user_immunity_async(*fields))
+        await asyncio.sleep(0)
+        others = await asyncio.gather(analyzer.analyze_user_immunity_async(*fields),
+                                      analyzer.analyze_user_immunity_async(*fields),
+                                      collect(analyzer.iter_analyses(PROFILES[:1])))
+        return [await first] + others[:2], others[2]
+
+    async def collect(iterator):
+        return [item async for item in iterator]
+
+    results, listed = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results) and listed == [(0, results[0])]
+    assert analyzer.tier_hits["inflight"] == 3
+    assert analyzer._inflight_async == {}
+
+def test_async_follower_analyzes_alone_if_the_leader_is_cancelled():
+    analyzer = make_analyzer()
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+        return response(answer(kwargs["messages"]))
+    analyzer._create_completion_async = create
+
+    async def run():
+        fields = analyzer._profile_fields(PROFILES[0])
+        leader = asyncio.ensure_future(analyzer.analyze_user_immunity_async(*fields))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(analyzer.analyze_user_immunity_async(*fields))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run())["immunity_status"] == "not_immune"
+    assert len(calls) == 2
+
+def test_failover_is_not_counted_as_saved_calls():
+    analyzer = make_analyzer(batch_size=1)
+    analyzer.allowlist = {"ana"}
+
+    async def create(**kwargs):
+        if "@carla" in "\n".join(message["content"] for message in kwargs["messages"]):
+            raise CircuitOpenError("circuito aberto")
+        return response(answer(kwargs["messages"]))
+    analyzer._create_completion_async = create
+
+    ana, bruno, carla = analyzer.analyze_users_concurrently(PROFILES)
+    assert carla["tier"] == "failover"
+
+    stats = analyzer.get_tier_stats()
+    assert (stats["tier_hits"]["allowlist"], stats["tier_hits"]["llm"], stats["tier_hits"]["failover"]) == (1, 1, 1)
+    assert stats["llm_calls_saved_ratio"] == pytest.approx(1 / 3)
+    assert stats["failover_ratio"] == pytest.approx(1 / 3)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Testes do cache persistente de análises (ImmunityCache)
+"""
+
+import time
+
+from immunity_cache import ImmunityCache
+
+RESULT = {"category": "ENGINEER", "immunity_status": "immune", "confidence": 0.9, "reasoning": ""}
+
+def test_fingerprint_normalizes_case_and_whitespace():
+    assert ImmunityCache.fingerprint("Dev", "Ana  Dev", " Python\n dev ") == ImmunityCache.fingerprint("dev", "ana dev", "python dev")
+    assert ImmunityCache.fingerprint("dev", "Ana", "python") != ImmunityCache.fingerprint("dev", "Ana", "rust")
+
+def test_get_set_and_stats():
+    cache = ImmunityCache(path=":memory:")
+    key = ImmunityCache.fingerprint("dev", "Dev", "python")
+
+    assert cache.get(key) is None
+    cache.set(key, "dev", RESULT)
+    assert cache.get(key) == RESULT
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["writes"], stats["size"]) == (1, 1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert cache.usernames() == ["dev"]
+
+def test_expired_entries_are_misses():
+    cache = ImmunityCache(path=":memory:", ttl_seconds=0.05)
+    key = ImmunityCache.fingerprint("dev", "Dev", "python")
+    cache.set(key, "dev", RESULT)
+
+    time.sleep(0.1)
+    assert cache.get(key) is None
+    assert cache.stats["expired"] == 1
+    assert len(cache) == 0
+
+def test_other_version_is_discarded_on_open(tmp_path):
+    path = str(tmp_path / "cache.db")
+    old = ImmunityCache(path=path, version="v1")
+    old.set(ImmunityCache.fingerprint("dev", "Dev", "python"), "dev", RESULT)
+    old.close()
+
+    new = ImmunityCache(path=path, version="v2")
+    assert len(new) == 0
+    assert new.stats["expired"] == 1
+
+def test_persists_between_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    key = ImmunityCache.fingerprint("dev", "Dev", "python")
+    first = ImmunityCache(path=path, version="v1")
+    first.set(key, "dev", RESULT)
+    first.close()
+
+    assert ImmunityCache(path=path, version="v1").get(key) == RESULT
+
+def test_lru_eviction_keeps_recently_used():
+    cache = ImmunityCache(path=":memory:", max_entries=2)
+    keys = [ImmunityCache.fingerprint(f"user{i}", "", "") for i in range(3)]
+
+    cache.set(keys[0], "user0", RESULT)
+    time.sleep(0.01)
+    cache.set(keys[1], "user1", RESULT)
+    time.sleep(0.01)
+    cache.get(keys[0])
+    time.sleep(0.01)
+    cache.set(keys[2], "user2", RESULT)
+
+    assert cache._evict_if_needed() == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == RESULT
+    assert cache.get(keys[2]) == RESULT
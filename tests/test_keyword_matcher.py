@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Testes do matcher de palavras-chave (regex em forma de trie)
+"""
+
+from keyword_matcher import KeywordMatcher, TECH_KEYWORDS, load_keyword_file
+
+def test_matches_whole_words_only():
+    matcher = KeywordMatcher(["java", "node", "mit"])
+
+    assert matcher.search("Java developer")
+    assert not matcher.search("javanese cooking, submit nodes")
+    assert matcher.find_all("MIT alumni, node and java") == ["mit", "node", "java"]
+
+def test_shared_prefixes_prefer_longest_term():
+    matcher = KeywordMatcher(["data", "data scientist", "data engineer"])
+
+    assert matcher.find_all("Senior data   scientist") == ["data scientist"]
+    assert matcher.find_all("data engineer and data nerd") == ["data engineer", "data"]
+
+def test_terms_with_symbols():
+    matcher = KeywordMatcher(["c++", ".net"])
+
+    assert matcher.find_all("C++ e .NET") == ["c++", ".net"]
+    assert not matcher.search("abc++")
+
+def test_find_all_without_repetition():
+    matcher = KeywordMatcher(TECH_KEYWORDS)
+    assert matcher.find_all("Python developer, python teacher") == ["python", "developer"]
+
+def test_empty_matcher_and_text():
+    assert not KeywordMatcher([]).search("python")
+    assert KeywordMatcher(["python"]).find_all("") == []
+    assert len(KeywordMatcher(["Python", "python ", ""])) == 1
+
+def test_punctuation_is_a_word_boundary():
+    matcher = KeywordMatcher(TECH_KEYWORDS)
+
+    assert matcher.find_all("Ex-Google, agora na Stripe") == ["google", "stripe"]
+    assert matcher.find_all("ML engineer @ startup") == ["ml engineer"]
+    assert matcher.find_all("Fotógrafo e viajante") == []
+
+def test_from_file(tmp_path):
+    path = tmp_path / "keywords.txt"
+    path.write_text("# comentário\nrust\n\nzig\n", encoding="utf-8")
+
+    assert load_keyword_file(str(path)) == ["rust", "zig"]
+    assert load_keyword_file(str(tmp_path / "missing.txt")) == []
+    assert KeywordMatcher.from_file(str(path), ["python"]).find_all("python, rust e zig") == ["python", "rust", "zig"]
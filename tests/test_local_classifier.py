@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Testes da leitura dos CSVs de análise usados para treinar o classificador local
+"""
+
+import csv
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from local_classifier import load_training_data
+
+FIELDS = ['username', 'display_name', 'bio', 'location', 'category', 'immunity_status', 'confidence', 'reasoning', 'tier']
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+def row(username, category="OTHER", status="not_immune", reasoning="", tier=""):
+    return {'username': username, 'display_name': username, 'bio': f"bio de {username}", 'location': '',
+            'category': category, 'immunity_status': status, 'confidence': 0.9, 'reasoning': reasoning, 'tier': tier}
+
+def test_only_model_labels_are_used(tmp_path):
+    path = tmp_path / "hybrid_analysis_1.csv"
+    write_csv(path, [
+        row("modelo"),
+        row("engenheira", "ENGINEER", "immune"),
+        row("adiado", "DEFERRED", "immune", "Análise adiada para o próximo ciclo", "deferred"),
+        row("circuito", "OTHER", "not_immune", "Nenhuma palavra-chave técnica detectada", "failover"),
+        row("parecido", "OTHER", "not_immune", "Bio quase idêntica à de @modelo (similaridade 0.90): ", "similar"),
+        row("erro", "UNKNOWN", "immune", "Erro na análise: timeout", "error"),
+        row("lista", "ALLOWLIST", "immune"),
+    ])
+
+    profiles, labels = load_training_data([str(path)])
+    assert [p['display_name'] for p in profiles] == ["modelo", "engenheira"]
+    assert labels == [0, 1]
+
+def test_old_csv_without_tier_column(tmp_path):
+    path = tmp_path / "selenium_analysis_1.csv"
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS[:-1], extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows([row("modelo"), row("parecido", reasoning="Bio quase idêntica à de @modelo (similaridade 0.90): ")])
+
+    profiles, _ = load_training_data([str(path)])
+    assert [p['display_name'] for p in profiles] == ["modelo"]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Testes da leitura das contagens do perfil e da decisão de pular ciclos agendados sem mudanças
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from profile_counts import (LOGGED_IN_USERNAME_SCRIPT, PROFILE_COUNTS_SCRIPT, CycleChangeDetector,
+                            ProfileCounter, is_exact_count, parse_count)
+
+NOW = datetime(2026, 10, 16, 12, 0)
+COUNTS = {'following': 1234, 'followers': 567}
+
+class FakeDriver:
+    """
+    Responde aos scripts de profile_counts; as contagens só aparecem depois de loading_polls leituras
+    """
+    def __init__(self, texts, username="Dev_Ana", loading_polls=0):
+        self.texts = texts
+        self.username = username
+        self.loading_polls = loading_polls
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script):
+        if script == LOGGED_IN_USERNAME_SCRIPT:
+            return self.username
+        assert script == PROFILE_COUNTS_SCRIPT
+        if self.loading_polls:
+            self.loading_polls -= 1
+            return {'following': None, 'followers': None}
+        return self.texts
+
+@pytest.mark.parametrize("text, count", [("1,234", 1234), ("1.234", 1234), ("987", 987), ("1.2K", 1200),
+                                         ("1,2 mil", 1200), ("15K", 15000), ("3.5M", 3500000),
+                                         ("", 0), ("abc", 0), (None, 0)])
+def test_parse_count(text, count):
+    assert parse_count(text) == count
+
+def test_only_exact_counts_are_exact():
+    assert is_exact_count("1,234") and is_exact_count("12")
+    assert not is_exact_count("1.2K") and not is_exact_count("1,2 mil") and not is_exact_count(None)
+
+def test_reads_counts_of_the_logged_in_account():
+    driver = FakeDriver({'following': "1,234", 'followers': "567"}, loading_polls=2)
+    counter = ProfileCounter(driver, poll_interval=0)
+
+    assert counter.read() == COUNTS
+    assert counter.username == "dev_ana"
+    assert driver.visited == ["https://x.com/dev_ana"]
+
+def test_abbreviated_count_is_unknown():
+    counter = ProfileCounter(FakeDriver({'following': "1,234", 'followers': "12.5K"}), username="ana")
+    assert counter.read() == {'following': 1234, 'followers': None}
+
+def test_counts_that_never_load_are_unknown():
+    driver = FakeDriver({}, loading_polls=10 ** 6)
+    counter = ProfileCounter(driver, username="ana", timeout=0.01, poll_interval=0)
+    assert counter.read() == {'following': None, 'followers': None}
+
+def test_no_logged_in_account_reads_nothing():
+    driver = FakeDriver({'following': "1", 'followers': "1"}, username=None)
+    assert ProfileCounter(driver, username="unknown").read() == {'following': None, 'followers': None}
+    assert driver.visited == []
+
+def recorded_state(counts=COUNTS, hours_ago=1.0, pending_unfollows=()):
+    return {'profile_counts': dict(counts), 'pending_unfollows': list(pending_unfollows),
+            'counts_recorded_at': (NOW - timedelta(hours=hours_ago)).isoformat()}
+
+def test_unchanged_counts_skip_the_cycle():
+    reason = CycleChangeDetector(lambda: dict(COUNTS)).unchanged_reason(recorded_state(), now=NOW)
+    assert reason.startswith("Sem mudanças") and "1234 following" in reason
+
+@pytest.mark.parametrize("counts", [{'following': 1233, 'followers': 567},
+                                    {'following': 1234, 'followers': 568},
+                                    {'following': 1234, 'followers': None}])
+def test_changed_or_unknown_counts_run_the_cycle(counts):
+    assert CycleChangeDetector(lambda: counts).unchanged_reason(recorded_state(), now=NOW) is None
+
+@pytest.mark.parametrize("state, pending_analyses", [({}, 0),
+                                                     (recorded_state(pending_unfollows=["bruno"]), 0),
+                                                     (recorded_state(), 3),
+                                                     (recorded_state(hours_ago=6), 0)])
+def test_cycle_runs_without_reading_counts(state, pending_analyses):
+    def read_counts():
+        raise AssertionError("contagens não deviam ser lidas")
+    detector = CycleChangeDetector(read_counts, max_skip_hours=6)
+    assert detector.unchanged_reason(state, pending_analyses, now=NOW) is None
+
+def test_record_keeps_reference_and_pending_unfollows():
+    state = {'timestamp': "antes"}
+    CycleChangeDetector(lambda: dict(COUNTS)).record(state, ["bruno"], now=NOW)
+
+    assert state == {'timestamp': "antes", 'pending_unfollows': ["bruno"], 'profile_counts': COUNTS,
+                     'counts_recorded_at': NOW.isoformat()}
+    assert CycleChangeDetector(lambda: dict(COUNTS)).unchanged_reason(
+        {**state, 'pending_unfollows': []}, now=NOW + timedelta(hours=1)) is not None
+
+def test_record_without_exact_counts_drops_the_reference():
+    state = recorded_state()
+    CycleChangeDetector(lambda: {'following': None, 'followers': 567}).record(state, [], now=NOW)
+
+    assert state == {'pending_unfollows': []}
+    assert CycleChangeDetector(lambda: dict(COUNTS)).unchanged_reason(state, now=NOW) is None
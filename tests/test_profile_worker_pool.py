@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Testes do pool de navegadores da extração paralela (legacy) com navegadores falsos
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("selenium")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "legacy"))
+
+import profile_worker_pool
+from profile_worker_pool import ProfileWorkerPool
+
+COOKIES = [{"name": "auth_token", "value": "x", "domain": ".x.com", "sameSite": "Lax"}]
+
+class FakeDriver:
+    def __init__(self):
+        self.cookies = []
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+class FakeScraper:
+    """
+    Substitui TwitterSeleniumScraper; fail_setup faz o navegador não abrir
+    """
+    created = []
+    fail_setup = 0
+
+    def __init__(self, headless=True, use_existing_profile=False, browser="chrome"):
+        self.driver = FakeDriver()
+        self.closed = False
+        FakeScraper.created.append(self)
+
+    def setup_driver(self):
+        if FakeScraper.fail_setup:
+            FakeScraper.fail_setup -= 1
+            return False
+        return True
+
+    def close(self):
+        self.closed = True
+        if self is FakeScraper.created[0]:
+            raise RuntimeError("navegador já tinha caído")
+
+@pytest.fixture
+def pool(monkeypatch):
+    FakeScraper.created = []
+    FakeScraper.fail_setup = 0
+    monkeypatch.setattr(profile_worker_pool, "TwitterSeleniumScraper", FakeScraper)
+    pool = ProfileWorkerPool(COOKIES, size=3, min_interval=0, max_profiles_per_minute=60000)
+    yield pool
+    pool.close()
+
+def test_start_copies_session_cookies(pool):
+    assert pool.start() == 3
+    for scraper in FakeScraper.created:
+        assert scraper.driver.visited == ["https://x.com/robots.txt"]
+        assert scraper.driver.cookies == [{"name": "auth_token", "value": "x", "domain": ".x.com"}]
+
+def test_results_keep_input_order(pool):
+    pool.start()
+    usernames = [f"user{i:02d}" for i in range(30)]
+    drivers_used = set()
+    lock = threading.Lock()
+
+    def extract(username, driver):
+        # Perfis terminam fora de ordem
+        time.sleep(0.001 * (hash(username) % 5))
+        with lock:
+            drivers_used.add(id(driver))
+        return {"username": username, "bio": f"bio de {username}"}
+
+    done = []
+    results = pool.extract(usernames, extract, on_done=lambda position, username: done.append(position))
+
+    assert [result["username"] for result in results] == usernames
+    assert sorted(done) == list(range(30))
+    assert len(drivers_used) > 1
+    assert pool.stats["profiles"] == 30 and sum(pool.stats["per_worker"]) == 30
+
+def test_failed_profile_gets_an_empty_result_and_the_pool_continues(pool):
+    pool.start()
+
+    def extract(username, driver):
+        if username == "quebrado":
+            raise RuntimeError("página não carregou")
+        return {"username": username, "display_name": username.title(), "bio": "ok", "location": "",
+                "verified": False}
+
+    results = pool.extract(["ana", "quebrado", "bruno", "carla"], extract)
+
+    assert results[1] == {"username": "quebrado", "display_name": "", "bio": "", "location": "", "verified": False}
+    assert [result["display_name"] for result in results] == ["Ana", "", "Bruno", "Carla"]
+    assert pool.stats["errors"] == 1 and pool.stats["profiles"] == 4
+
+def test_close_closes_every_driver(pool):
+    FakeScraper.fail_setup = 1
+    assert pool.start() == 2
+
+    pool.close()
+
+    # Inclusive o que não iniciou e o que falhou ao fechar
+    assert len(FakeScraper.created) == 3
+    assert all(scraper.closed for scraper in FakeScraper.created)
+    assert pool.workers == []
+
+def test_extract_without_workers_fails(pool):
+    with pytest.raises(RuntimeError):
+        pool.extract(["ana"], lambda username, driver: {})
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Testes da normalização dos campos do perfil e do corte no orçamento de tokens
+"""
+
+import pytest
+
+from prompt_builder import PromptBuilder, estimate_tokens, normalize_field
+
+@pytest.mark.parametrize("text, tokens", [("", 0), ("abcd", 1), ("abcde", 2), ("ção", 2), ("🚀", 1), ("🚀🚀", 2)])
+def test_estimate_tokens_counts_utf8_bytes(text, tokens):
+    assert estimate_tokens(text) == tokens
+
+@pytest.mark.parametrize("text, normalized", [
+    ("  Dev   backend\n\nem  SP \t", "Dev backend em SP"),
+    ("Blog: https://exemplo.dev/posts?id=1 e www.site.com.br/x", "Blog: [link] e [link]"),
+    ("Python 🐍🐍🐍🐍 e café ☕☕", "Python 🐍 e café ☕"),
+    ("Família 👨‍👩‍👧 feliz", "Família 👨 feliz"),
+    ("Sextou!!!!!!!! kkkkkkkk", "Sextou!!! kkk"),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize_field(text, normalized):
+    assert normalize_field(text, token_budget=100) == normalized
+
+def test_text_within_budget_is_kept():
+    text = "dev de dados em são paulo"
+    assert estimate_tokens(text) == 7
+    assert normalize_field(text, token_budget=7) == text
+
+def test_long_text_is_cut_at_a_word_boundary():
+    text = "engenheira de software apaixonada por sistemas distribuídos e bancos de dados"
+    cut = normalize_field(text, token_budget=6)
+
+    assert cut == "engenheira de software…"
+    assert estimate_tokens(cut[:-1]) <= 6
+
+def test_cut_never_splits_a_multibyte_character():
+    cut = normalize_field("ação" * 20, token_budget=3)
+    assert cut.endswith("…")
+    assert len(cut[:-1].encode("utf-8")) <= 12
+    assert set(cut[:-1]) <= set("ação")
+
+def test_prompt_uses_normalized_fields_and_fixed_prefix():
+    builder = PromptBuilder("SISTEMA", "CRITÉRIOS", "FORMATO", "FORMATO LOTE", bio_token_budget=6)
+    messages = builder.single_messages("ana", "Ana   Dev", "engenheira de software apaixonada por https://x.com/ana")
+    other = builder.single_messages("bruno", "Bruno", "outra bio")
+
+    assert messages[0] == other[0] == {"role": "system", "content": "SISTEMA\n\nCRITÉRIOS\nFORMATO"}
+    assert "- Nome: Ana Dev\n- Bio: engenheira de software…\n" in messages[1]["content"]
+
+    batch = builder.batch_messages([{"username": "ana", "bio": "oi"}, {"username": "bruno", "display_name": "B"}])
+    assert batch[0]["content"].endswith("FORMATO LOTE")
+    assert "PERFIL 1:\n- Username: @ana\n- Nome: ana" in batch[1]["content"]
+    assert "PERFIL 2:\n- Username: @bruno\n- Nome: B" in batch[1]["content"]
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Testes do rate limiter adaptativo com um relógio falso (sem esperas reais)
+"""
+
+import email.utils
+
+import pytest
+
+import rate_limiter
+from rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+class FakeClock:
+    """
+    Substitui o módulo time do rate_limiter: sleep só avança o relógio e guarda as esperas
+    """
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", fake)
+    return fake
+
+def test_bucket_allows_burst_then_paces_requests(clock):
+    limiter = AdaptiveRateLimiter(rate=2.0, burst=3)
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.sleeps == []
+
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == [0.5, 0.5]
+
+def test_bucket_refills_up_to_burst(clock):
+    limiter = AdaptiveRateLimiter(rate=1.0, burst=2)
+    limiter.acquire()
+    limiter.acquire()
+
+    # Muito tempo parado não acumula mais que burst tokens
+    clock.advance(60)
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == []
+    limiter.acquire()
+    assert clock.sleeps == [1.0]
+
+def test_rate_limited_halves_rate_once_per_pause(clock):
+    limiter = AdaptiveRateLimiter(rate=8.0, min_rate=1.5, decrease_factor=0.5, base_backoff=2.0)
+
+    assert limiter.on_rate_limited({}) == 2.0
+    assert limiter.rate == 4.0
+    # Outro 429 da mesma rajada, ainda dentro da pausa
+    clock.advance(1)
+    limiter.on_rate_limited({})
+    assert limiter.rate == 4.0
+
+    clock.advance(5)
+    limiter.on_rate_limited({})
+    assert limiter.rate == 2.0
+    clock.advance(5)
+    limiter.on_rate_limited({})
+    assert limiter.rate == 1.5
+    assert limiter.stats["throttled"] == 4
+
+def test_rate_limited_pauses_every_request(clock):
+    limiter = AdaptiveRateLimiter(rate=10.0, burst=5)
+    limiter.on_rate_limited({"retry-after": "7"})
+
+    limiter.acquire()
+    assert clock.sleeps == [7.0]
+
+def test_success_recovers_rate_additively(clock):
+    limiter = AdaptiveRateLimiter(rate=1.0, max_rate=1.35, increase_step=0.1)
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(1.2)
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.rate == 1.35
+
+@pytest.mark.parametrize("value, seconds", [("7", 7.0), ("0.5", 0.5), ("-3", 0.0), (None, None), ("", None),
+                                            ("amanhã", None)])
+def test_parse_retry_after_seconds(clock, value, seconds):
+    assert parse_retry_after(value) == seconds
+
+def test_parse_retry_after_http_date(clock):
+    assert parse_retry_after(email.utils.formatdate(clock.now + 30, usegmt=True)) == pytest.approx(30.0)
+    assert parse_retry_after(email.utils.formatdate(clock.now - 30, usegmt=True)) == 0.0
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Testes do AdaptiveScroller com um driver falso (o script do passo roda no navegador)
+"""
+
+import pytest
+
+from scroll_engine import AdaptiveScroller, ScrollCollectError
+
+class FakeDriver:
+    def __init__(self, steps):
+        self.steps = list(steps)
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def execute_script(self, script, *args):
+        pass
+
+    def execute_async_script(self, script, *args):
+        return self.steps.pop(0)
+
+def test_end_of_list_needs_confirmed_stalls():
+    stall = {"progress": False, "reason": "idle", "newCells": 0}
+    driver = FakeDriver([stall, {"progress": True, "reason": "cells", "newCells": 5, "collected": ["a"]}, stall, stall])
+    scroller = AdaptiveScroller(driver, stall_confirmations=2)
+
+    scroller.step()
+    assert scroller.stalls == 1
+    assert scroller.step("buffer()")[1] == ["a"]
+    assert scroller.stalls == 0
+
+    scroller.step()
+    assert not scroller.at_end
+    scroller.step()
+    assert scroller.at_end
+    assert scroller.stats["steps"] == 4 and scroller.stats["new_cells"] == 5
+
+def test_collect_expression_errors_are_raised():
+    driver = FakeDriver([{"progress": True, "reason": "cells", "newCells": 2, "collected": None,
+                          "collectError": "TypeError: window.twitterHybrid.drain is not a function"}])
+    scroller = AdaptiveScroller(driver)
+
+    with pytest.raises(ScrollCollectError, match="drain is not a function"):
+        scroller.step("window.twitterHybrid.drain()")
+    # O passo de scroll em si foi contabilizado
+    assert scroller.stats["steps"] == 1 and scroller.stalls == 0
@@ -10,6 +10,7 @@ import os
 import schedule
 from datetime import datetime
 from dotenv import load_dotenv
+from immunity_analyzer import DEFAULT_EXPLAIN_BELOW
 from twitter_hybrid_unfollow import TwitterHybridUnfollower
 
 # Carregar variáveis de ambiente
@@ -41,13 +42,17 @@ def run_hybrid_cycle():
         # Inicializar sistema híbrido
         unfollower = TwitterHybridUnfollower(
             openrouter_api_key=openrouter_key,
-            headless=True  # Modo headless para execução automática
+            headless=True,  # Modo headless para execução automática
+            # Ciclos agendados sincronizam um snapshot em vez de recoletar o topo da lista
+            collection_mode=os.getenv('COLLECTION_MODE') or 'incremental',
+            explain_below=float(os.getenv('EXPLAIN_BELOW') or DEFAULT_EXPLAIN_BELOW)
         )
 
         # Executar processo com limites para ciclo automático
         results = unfollower.run_full_process(
             max_users=200,    # Processar menos usuários por ciclo
-            max_unfollows=15  # 15 unfollows por ciclo
+            max_unfollows=15, # 15 unfollows por ciclo
+            skip_unchanged=True  # Sem mudanças no perfil nem trabalho pendente: ciclo termina em segundos
         )
 
         if results['success']:
@@ -151,7 +156,9 @@ def main():
             # Inicializar sistema híbrido
             unfollower = TwitterHybridUnfollower(
                 openrouter_api_key=openrouter_key,
-                headless=False  # Interface visível para execução única
+                headless=False,  # Interface visível para execução única
+                collection_mode=os.getenv('COLLECTION_MODE') or 'dom',
+                explain_below=float(os.getenv('EXPLAIN_BELOW') or DEFAULT_EXPLAIN_BELOW)
             )
 
             # Executar processo completo
@@ -19,19 +19,40 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
-from immunity_analyzer import ImmunityAnalyzer
+from immunity_analyzer import DEFAULT_EXPLAIN_BELOW, ImmunityAnalyzer
+from scroll_engine import AdaptiveScroller
+from graph_capture import GraphQLCapture, enable_network_capture
+from graph_export import GraphExporter
+from following_snapshot import FollowingSnapshot
+from profile_counts import CycleChangeDetector, ProfileCounter
+
+# Avaliada no fim de cada passo do scroll (mesma chamada): entrega o buffer da extensão
+DRAIN_USERS_EXPRESSION = """(() => {
+    const hybrid = window.twitterHybrid;
+    return hybrid ? (hybrid.drainUserData ? hybrid.drainUserData() : hybrid.collectUserData()) : [];
+})()"""
 
 class TwitterHybridUnfollower:
-    def __init__(self, openrouter_api_key: str, headless: bool = False):
+    def __init__(self, openrouter_api_key: str, headless: bool = False, collection_mode: str = "dom",
+                 explain_below: Optional[float] = DEFAULT_EXPLAIN_BELOW):
         """
         Sistema híbrido que usa extensão Chrome + análise Python
         
         Args:
             openrouter_api_key: Chave da API do OpenRouter para análise de IA
             headless: Se True, executa navegador sem interface
+            collection_mode: "dom" (células lidas pela extensão), "network" (respostas GraphQL via DevTools)
+                "export" (páginas GraphQL pedidas direto da página, seguindo o cursor) ou "incremental"
+                (como export, mas sincronizando um snapshot: follows novos do topo + algumas páginas antigas por ciclo)
+            explain_below: No CSV, busca a explicação (modo compacto) das análises com confiança abaixo disso (None desativa)
         """
+        if collection_mode not in ("dom", "network", "export", "incremental"):
+            raise ValueError(f"collection_mode inválido: {collection_mode} (use dom, network, export ou incremental)")
+        
         self.openrouter_api_key = openrouter_api_key
         self.headless = headless
+        self.collection_mode = collection_mode
+        self.explain_below = explain_below
         self.state_file = 'hybrid_unfollow_state.json'
         self.extension_path = os.path.join(os.getcwd(), 'twitter-mass-unfollow', 'build')
         
@@ -48,7 +69,10 @@ class TwitterHybridUnfollower:
         
         # Inicializar componentes
         self.driver = None
+        # Conta logada, descoberta na primeira leitura das contagens do perfil
+        self.username = None
         self.immunity_analyzer = ImmunityAnalyzer(openrouter_api_key)
+        self.snapshot = FollowingSnapshot() if collection_mode == "incremental" else None
         
     def setup_chrome_with_extension(self) -> webdriver.Chrome:
         """
@@ -71,6 +95,10 @@ class TwitterHybridUnfollower:
             else:
                 chrome_options.add_argument("--headless")
             
+            # Eventos de rede do DevTools para os modos de coleta baseados no GraphQL
+            if self.collection_mode != "dom":
+                enable_network_capture(chrome_options)
+            
             # Carregar extensão
             chrome_options.add_argument(f"--load-extension={self.extension_path}")
             chrome_options.add_argument("--disable-web-security")
@@ -160,6 +188,14 @@ class TwitterHybridUnfollower:
 // Sistema híbrido de unfollow
 let unfollowedUsers = [];
 let analysisData = [];
+// Usernames já vistos: cada célula é lida e devolvida ao Python uma única vez
+let seenUsers = new Set();
+// Não-seguidores lidos pelo MutationObserver e ainda não entregues ao Python
+let userBuffer = [];
+let timelineObserver = null;
+let observedTimeline = null;
+
+const CELL_SELECTOR = '[data-testid="cellInnerDiv"]';
 
 const getFollowingButtons = () => {
     return Array.from(document.querySelectorAll('button[data-testid$="-unfollow"]'));
@@ -187,23 +223,90 @@ const getUserData = (followingBtn) => {
     };
 };
 
-const collectUserData = () => {
-    const buttons = getFollowingButtons();
-    const data = [];
+// Lê uma célula uma única vez; células ainda sem botão voltam numa mutação posterior
+const parseCell = (cell) => {
+    const button = cell.querySelector('button[data-testid$="-unfollow"]');
+    if (!button) return;
+    
+    const username = getUsername(button);
+    if (!username || seenUsers.has(username)) return;
+    
+    const userData = getUserData(button);
+    if (!userData) return;
+    
+    seenUsers.add(username);
+    if (!userData.follows_you) {
+        userBuffer.push(userData);
+    }
+};
+
+const onTimelineMutations = (mutations) => {
+    const cells = new Set();
     
-    buttons.forEach(button => {
-        const userData = getUserData(button);
-        if (userData && !userData.follows_you) {
-            data.push(userData);
+    mutations.forEach(mutation => {
+        // Conteúdo novo dentro de uma célula já existente (hidratação)
+        const insideCell = mutation.target.closest?.(CELL_SELECTOR);
+        if (insideCell) {
+            cells.add(insideCell);
+            return;
         }
+        
+        mutation.addedNodes.forEach(node => {
+            if (node.nodeType !== Node.ELEMENT_NODE) return;
+            if (node.matches(CELL_SELECTOR)) {
+                cells.add(node);
+            } else {
+                node.querySelectorAll(CELL_SELECTOR).forEach(cell => cells.add(cell));
+            }
+        });
     });
     
+    cells.forEach(parseCell);
+};
+
+// Observa a timeline de following (reinstala se a SPA trocar a timeline)
+const installObserver = () => {
+    const timeline = document.querySelector('[data-testid="primaryColumn"] section');
+    if (!timeline || timeline === observedTimeline) return;
+    
+    timelineObserver?.disconnect();
+    timelineObserver = new MutationObserver(onTimelineMutations);
+    timelineObserver.observe(timeline, { childList: true, subtree: true });
+    observedTimeline = timeline;
+    
+    // Células que já estavam na tela antes do observer
+    timeline.querySelectorAll(CELL_SELECTOR).forEach(parseCell);
+};
+
+// Entrega e esvazia o buffer (custo proporcional só ao que chegou desde a última chamada)
+const drainUserData = () => {
+    installObserver();
+    const data = userBuffer;
+    userBuffer = [];
     return data;
 };
 
+// Compatibilidade: lê as células visíveis e entrega o buffer
+const collectUserData = () => {
+    document.querySelectorAll(CELL_SELECTOR).forEach(parseCell);
+    return drainUserData();
+};
+
+const resetCollection = () => {
+    seenUsers = new Set();
+    userBuffer = [];
+    observedTimeline = null;
+    installObserver();
+};
+
+installObserver();
+setInterval(installObserver, 1000);
+
 // Expor funções para o Python
 window.twitterHybrid = {
     collectUserData: collectUserData,
+    drainUserData: drainUserData,
+    resetCollection: resetCollection,
     getFollowingButtons: getFollowingButtons,
     unfollowedUsers: unfollowedUsers
 };
@@ -249,100 +352,215 @@ console.log('Twitter Hybrid Extension carregada');
         """
         self.logger.info(f"📊 Coletando dados de até {max_users} não-seguidores...")
         
+        if self.collection_mode == "network":
+            return self.collect_non_followers_from_network(max_users)
+        if self.collection_mode == "export":
+            return self.collect_non_followers_from_export(max_users)
+        if self.collection_mode == "incremental":
+            return self.collect_non_followers_incremental(max_users)
+        
         all_data = []
-        last_height = 0
-        no_new_data_count = 0
+        seen_usernames = set()
+        
+        # A extensão só devolve células ainda não reportadas; recomeçar o registro a cada coleta
+        self.driver.execute_script("window.twitterHybrid?.resetCollection?.();")
         
-        while len(all_data) < max_users and no_new_data_count < 3:
+        # O MutationObserver da extensão não perde linhas, então dá para rolar duas telas por passo
+        scroller = AdaptiveScroller(self.driver, step_viewports=2.0)
+        
+        while len(all_data) < max_users and not scroller.at_end:
             try:
-                # Executar script de coleta
-                new_data = self.driver.execute_script("return window.twitterHybrid?.collectUserData() || [];")
+                # Rolar, esperar células novas (ou a rede parar) e receber o buffer da extensão
+                _, new_data = scroller.step(DRAIN_USERS_EXPRESSION)
                 
-                # Adicionar novos dados
-                for user_data in new_data:
-                    if not any(u['username'] == user_data['username'] for u in all_data):
+                # Adicionar novos dados (o set protege contra extensões antigas que devolvem tudo)
+                for user_data in new_data or []:
+                    if user_data['username'] not in seen_usernames:
+                        seen_usernames.add(user_data['username'])
                         all_data.append(user_data)
                         
                         if len(all_data) >= max_users:
                             break
                 
-                # Scroll para carregar mais
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                
-                # Verificar se há novos dados
-                current_height = self.driver.execute_script("return document.body.scrollHeight")
-                if current_height == last_height:
-                    no_new_data_count += 1
-                else:
-                    no_new_data_count = 0
-                    
-                last_height = current_height
-                
-                self.logger.info(f"📈 Coletados: {len(all_data)} usuários")
+                if new_data:
+                    self.logger.info(f"📈 Coletados: {len(all_data)} usuários")
                 
             except Exception as e:
                 self.logger.error(f"❌ Erro na coleta: {e}")
                 break
         
+        scroller.log_stats()
+        self.logger.info(f"✅ Coleta concluída: {len(all_data)} usuários")
+        return all_data
+    
+    def collect_non_followers_from_network(self, max_users: int = 1000) -> List[Dict]:
+        """
+        Coleta os não-seguidores pelas respostas GraphQL da timeline de following (modo "network")
+        
+        Cada resposta traz um lote inteiro de usuários, com user_id, bio, localização, contagens e follows_you.
+        """
+        self.logger.info(f"📡 Coletando até {max_users} não-seguidores pelas respostas de rede...")
+        
+        capture = GraphQLCapture(self.driver)
+        scroller = AdaptiveScroller(self.driver, step_viewports=3.0)
+        all_data = []
+        seen = 0
+        
+        # Respostas da navegação inicial já estão no log
+        new_users = capture.poll()
+        
+        while len(all_data) < max_users:
+            seen += len(new_users)
+            for user_data in new_users:
+                if not user_data['follows_you']:
+                    all_data.append(user_data)
+                    if len(all_data) >= max_users:
+                        break
+            
+            if new_users:
+                self.logger.info(f"📈 Coletados: {len(all_data)} não-seguidores em {seen} perfis")
+            if len(all_data) >= max_users or scroller.at_end:
+                break
+            
+            try:
+                scroller.step()
+                new_users = capture.poll()
+            except Exception as e:
+                self.logger.error(f"❌ Erro na coleta: {e}")
+                break
+        
+        scroller.log_stats()
+        self.logger.info(f"✅ Coleta concluída: {len(all_data)} usuários "
+                         f"({capture.stats['responses']} respostas GraphQL, {capture.stats['errors']} ilegíveis)")
+        return all_data
+    
+    def collect_non_followers_from_export(self, max_users: int = 1000) -> List[Dict]:
+        """
+        Coleta os não-seguidores paginando a timeline de following de dentro da página (modo "export")
+        
+        A requisição que a página fez para a primeira página vira o modelo; as seguintes seguem o cursor
+        sem rolar a lista. O cursor fica salvo: uma coleta interrompida (ou parada em max_users) continua
+        no próximo ciclo, e ao chegar ao fim da lista a exportação recomeça do topo.
+        """
+        self.logger.info(f"📤 Exportando following para até {max_users} não-seguidores...")
+        
+        exporter = GraphExporter(self.driver, operation="Following")
+        all_data = []
+        
+        try:
+            exporter.learn_template(GraphQLCapture(self.driver, operations=("Following",)))
+            for page_users in exporter.iter_pages():
+                all_data.extend(user for user in page_users if not user['follows_you'])
+                self.logger.info(f"📈 Coletados: {len(all_data)} não-seguidores")
+                if len(all_data) >= max_users:
+                    break
+        except Exception as e:
+            self.logger.error(f"❌ Erro na exportação: {e}")
+        
+        # Sem cortar a última página: o cursor já passou dela, e o que sobrasse só voltaria na próxima volta da lista
+        exporter.log_stats()
+        self.logger.info(f"✅ Coleta concluída: {len(all_data)} usuários")
+        return all_data
+    
+    def collect_non_followers_incremental(self, max_users: int = 1000) -> List[Dict]:
+        """
+        Sincroniza o snapshot de following e devolve os não-seguidores observados neste ciclo (modo "incremental")
+        
+        Só usuários vistos agora entram na análise (o follows_you guardado no snapshot pode estar velho), mais os
+        adiados por falta de orçamento em ciclos anteriores, que raramente caem nas páginas lidas no ciclo seguinte.
+        """
+        self.logger.info(f"🗂️ Sincronizando following ({len(self.snapshot)} contas no snapshot)...")
+        
+        exporter = GraphExporter(self.driver, operation="Following", state_path=None)
+        all_data = []
+        
+        try:
+            exporter.learn_template(GraphQLCapture(self.driver, operations=("Following",)))
+            observed = self.snapshot.sync(exporter.fetch_users, max_users=max_users)
+            all_data = [user for user in observed if not user['follows_you']]
+            
+            # Adiados que não apareceram neste ciclo entram pelo registro do snapshot (se ainda são não-seguidores)
+            budget = self.immunity_analyzer.budget
+            if budget is not None and budget.deferred:
+                collected = {user['username'] for user in all_data}
+                carried = [user for user in self.snapshot.find(budget.pending())
+                           if not user.get('follows_you') and user['username'] not in collected]
+                if carried:
+                    self.logger.info(f"📥 {len(carried)} perfis adiados em ciclos anteriores vêm do snapshot")
+                all_data += carried
+        except Exception as e:
+            self.logger.error(f"❌ Erro na sincronização: {e}")
+        
+        self.snapshot.log_stats()
         self.logger.info(f"✅ Coleta concluída: {len(all_data)} usuários")
         return all_data
     
     def analyze_users_with_ai(self, users_data: List[Dict]) -> List[Dict]:
         """
         Analisa usuários com IA para determinar imunidade
+        
+        As requisições são feitas em paralelo (limitadas por max_concurrency do analisador)
         """
         self.logger.info(f"🤖 Analisando {len(users_data)} usuários com IA...")
         
+        completed = 0
+        
+        def report_progress(index: int, user_data: Dict, immunity_result: Dict):
+            nonlocal completed
+            completed += 1
+            if completed % 10 == 0:
+                self.logger.info(f"🤖 Analisados: {completed}/{len(users_data)}")
+        
+        try:
+            results = self.immunity_analyzer.analyze_users_concurrently(users_data, on_result=report_progress)
+        except Exception as e:
+            self.logger.error(f"❌ Erro na análise concorrente: {e}")
+            results = [None] * len(users_data)
+        
         analyzed_users = []
         
-        for i, user_data in enumerate(users_data):
-            try:
-                # Análise de imunidade
-                immunity_result = self.immunity_analyzer.analyze_user_immunity(
-                    username=user_data['username'],
-                    display_name=user_data['display_name'],
-                    description=user_data['bio'],
-                    location=user_data['location']
-                )
-                
-                # Combinar dados
-                analyzed_user = {
-                    **user_data,
-                    'category': immunity_result['category'],
-                    'immunity_status': immunity_result['immunity_status'],
-                    'confidence': immunity_result['confidence'],
-                    'reasoning': immunity_result['reasoning']
-                }
-                
-                analyzed_users.append(analyzed_user)
-                
-                if (i + 1) % 10 == 0:
-                    self.logger.info(f"🤖 Analisados: {i + 1}/{len(users_data)}")
-                
-                # Rate limiting
-                time.sleep(0.5)
-                
-            except Exception as e:
-                self.logger.error(f"❌ Erro na análise de @{user_data['username']}: {e}")
-                
+        for user_data, immunity_result in zip(users_data, results):
+            if immunity_result is None:
                 # Adicionar com status de erro
-                analyzed_user = {
+                analyzed_users.append({
                     **user_data,
                     'category': 'ERROR',
                     'immunity_status': 'immune',  # Conservador
                     'confidence': 0.0,
-                    'reasoning': f'Erro na análise: {str(e)}'
-                }
-                analyzed_users.append(analyzed_user)
+                    'reasoning': 'Erro na análise: análise não concluída',
+                    'tier': 'error'
+                })
+                continue
+            
+            # Combinar dados
+            analyzed_users.append({
+                **user_data,
+                'category': immunity_result['category'],
+                'immunity_status': immunity_result['immunity_status'],
+                'confidence': immunity_result['confidence'],
+                'reasoning': immunity_result.get('reasoning', ''),
+                'tier': immunity_result.get('tier', '')
+            })
         
+        tier_stats = self.immunity_analyzer.get_tier_stats()
         self.logger.info(f"✅ Análise concluída: {len(analyzed_users)} usuários")
+        self.logger.info(f"🧮 Decisões por camada: {tier_stats['tier_hits']} "
+                         f"({tier_stats['llm_calls_saved_ratio']:.0%} sem chamar a IA, "
+                         f"{tier_stats['failover_ratio']:.0%} por failover)")
+        self.immunity_analyzer.log_routing_stats()
         return analyzed_users
     
-    def save_analysis_to_csv(self, analyzed_users: List[Dict]) -> str:
+    def save_analysis_to_csv(self, analyzed_users: List[Dict], explain_below: Optional[float] = None) -> str:
         """
         Salva análise em CSV
+        
+        Args:
+            explain_below: Busca a explicação (modo compacto) das linhas com confiança abaixo deste valor
         """
+        if explain_below is not None:
+            explained = self.immunity_analyzer.explain_rows(analyzed_users, explain_below)
+            self.logger.info(f"💬 Explicações buscadas para {explained} usuários limítrofes")
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"hybrid_analysis_{timestamp}.csv"
         
@@ -350,11 +568,11 @@ console.log('Twitter Hybrid Extension carregada');
         
         fieldnames = [
             'username', 'display_name', 'bio', 'location', 'follows_you',
-            'category', 'immunity_status', 'confidence', 'reasoning'
+            'category', 'immunity_status', 'confidence', 'reasoning', 'tier'
         ]
         
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
             writer.writeheader()
             writer.writerows(analyzed_users)
         
@@ -373,6 +591,18 @@ console.log('Twitter Hybrid Extension carregada');
         self.logger.info(f"🎯 Usuários elegíveis para unfollow: {len(eligible)}")
         return eligible
     
+    def _find_profile_unfollow_button(self, username: str):
+        """
+        Abre o perfil e devolve o botão de unfollow (None se não seguir mais ou a página não carregar)
+        """
+        self.driver.get(f"https://x.com/{username}")
+        try:
+            return WebDriverWait(self.driver, 10).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, '[data-testid="placementTracking"] [data-testid$="-unfollow"]'))
+            )
+        except Exception:
+            return None
+    
     def perform_unfollows(self, eligible_users: List[Dict], max_unfollows: int = 20) -> Dict:
         """
         Realiza unfollows dos usuários elegíveis
@@ -401,6 +631,10 @@ console.log('Twitter Hybrid Extension carregada');
                         user_button = button
                         break
                 
+                # Fora da parte renderizada da lista (coleta pela rede): usar a página do perfil
+                if not user_button and self.collection_mode != "dom":
+                    user_button = self._find_profile_unfollow_button(username)
+                
                 if user_button:
                     # Clicar no unfollow
                     user_button.click()
@@ -450,9 +684,66 @@ console.log('Twitter Hybrid Extension carregada');
         self.logger.info(f"✅ Unfollows concluídos: {results['successful']}/{results['attempted']}")
         return results
     
-    def run_full_process(self, max_users: int = 1000, max_unfollows: int = 20) -> Dict:
+    def save_state(self, state_data: Dict):
+        """
+        Salva o estado entre ciclos (contagens do perfil e unfollows pendentes)
+        """
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump(state_data, f, indent=2, default=str)
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao salvar estado: {e}")
+    
+    def load_state(self) -> Dict:
+        """
+        Carrega o estado salvo
+        """
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao carregar estado: {e}")
+        return {}
+    
+    def get_profile_counts(self) -> Dict[str, Optional[int]]:
+        """
+        Contagens de following e followers da conta logada, com um único carregamento de página
+        """
+        counter = ProfileCounter(self.driver, self.username)
+        counts = counter.read()
+        self.username = counter.username or self.username
+        return counts
+    
+    def check_unchanged_cycle(self, max_skip_hours: float = 6.0) -> Optional[str]:
+        """
+        Compara as contagens do perfil com as do último ciclo completo
+        
+        Returns:
+            Motivo para pular o ciclo, ou None se há mudança, trabalho pendente ou falta referência
+        """
+        pending_analyses = (self.immunity_analyzer.get_budget_stats() or {}).get('deferred', 0)
+        detector = CycleChangeDetector(self.get_profile_counts, max_skip_hours)
+        return detector.unchanged_reason(self.load_state(), pending_analyses)
+    
+    def record_cycle_counts(self, pending_unfollows: List[str]):
+        """
+        Guarda as contagens do perfil ao fim de um ciclo completo, com os unfollows que ficaram para depois
+        """
+        detector = CycleChangeDetector(self.get_profile_counts)
+        self.save_state(detector.record(self.load_state(), pending_unfollows))
+    
+    def run_full_process(self, max_users: int = 1000, max_unfollows: int = 20, skip_unchanged: bool = False,
+                         max_skip_hours: float = 6.0) -> Dict:
         """
         Executa o processo completo
+        
+        Args:
+            max_users: Máximo de não-seguidores coletados
+            max_unfollows: Máximo de unfollows por execução
+            skip_unchanged: Se True, pula coleta e análise quando as contagens do perfil não mudaram
+                desde o último ciclo e não há trabalho pendente (ciclos agendados)
+            max_skip_hours: Com skip_unchanged, executa o ciclo completo pelo menos a cada tantas horas
         """
         try:
             self.logger.info("🚀 Iniciando processo híbrido completo...")
@@ -467,24 +758,47 @@ console.log('Twitter Hybrid Extension carregada');
             # Aguardar usuário fazer login se necessário
             input("\n⚠️ Certifique-se de estar logado no X/Twitter e pressione ENTER para continuar...")
             
+            # Nada mudou desde o último ciclo: encerrar antes da coleta
+            if skip_unchanged:
+                skip_reason = self.check_unchanged_cycle(max_skip_hours)
+                if skip_reason:
+                    self.logger.info(f"⏭️ {skip_reason}")
+                    return {'success': True, 'message': skip_reason, 'stats': {'skipped': True}}
+                # A leitura das contagens abre o perfil: voltar à lista antes de coletar
+                if "/following" not in self.driver.current_url and not self.navigate_to_following_page(self.username):
+                    return {'success': False, 'message': 'Falha ao navegar para página de following'}
+            
             # Coletar dados
             users_data = self.collect_non_followers_data(max_users)
             if not users_data:
                 return {'success': False, 'message': 'Nenhum usuário coletado'}
             
+            # Perfis que ficaram sem orçamento no ciclo anterior vão primeiro
+            users_data = self.immunity_analyzer.prioritize_deferred(users_data)
+            
             # Analisar com IA
             analyzed_users = self.analyze_users_with_ai(users_data)
             
             # Salvar CSV
-            csv_file = self.save_analysis_to_csv(analyzed_users)
+            csv_file = self.save_analysis_to_csv(analyzed_users, self.explain_below)
             
             # Filtrar elegíveis
             eligible_users = self.get_eligible_for_unfollow(analyzed_users)
             
             # Realizar unfollows
             unfollow_results = None
+            unfollowed = set()
             if eligible_users and max_unfollows > 0:
                 unfollow_results = self.perform_unfollows(eligible_users, max_unfollows)
+                unfollowed = {d['username'] for d in unfollow_results['details'] if d['status'] == 'success'}
+                
+                # Quem deixou de ser seguido sai do snapshot
+                if self.snapshot is not None:
+                    self.snapshot.remove(unfollowed)
+                    self.snapshot.save()
+            
+            # Referência para o próximo ciclo agendado; elegíveis que não couberam ficam pendentes
+            self.record_cycle_counts([u['username'] for u in eligible_users if u['username'] not in unfollowed])
             
             # Preparar resultados
             results = {
@@ -495,10 +809,18 @@ console.log('Twitter Hybrid Extension carregada');
                     'total_analyzed': len(analyzed_users),
                     'eligible_count': len(eligible_users),
                     'immune_count': len([u for u in analyzed_users if u['immunity_status'] == 'immune']),
+                    'analysis_tiers': self.immunity_analyzer.get_tier_stats()['tier_hits'],
+                    'cache': self.immunity_analyzer.get_cache_stats(),
+                    'routing': self.immunity_analyzer.get_routing_stats(),
+                    'tokens': self.immunity_analyzer.get_token_stats(),
+                    'budget': self.immunity_analyzer.get_budget_stats(),
                     'unfollow_results': unfollow_results
                 }
             }
             
+            self.immunity_analyzer.log_cache_stats()
+            self.immunity_analyzer.log_token_stats()
+            self.immunity_analyzer.log_budget_stats()
             self.logger.info("✅ Processo híbrido concluído com sucesso!")
             return results
             
@@ -531,7 +853,9 @@ def main():
     
     unfollower = TwitterHybridUnfollower(
         openrouter_api_key=openrouter_key,
-        headless=False
+        headless=False,
+        collection_mode=os.getenv('COLLECTION_MODE') or 'dom',
+        explain_below=float(os.getenv('EXPLAIN_BELOW') or DEFAULT_EXPLAIN_BELOW)
     )
     
     results = unfollower.run_full_process(